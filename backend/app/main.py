@@ -1,6 +1,26 @@
+import os
+import asyncio
 from fastapi import FastAPI
 from app.routes.upload import router as upload_router
+from app.routes.jobs import router as jobs_router
+from app.services.jobs import get_job_manager
 
 app = FastAPI(title="QA AI Tool Backend")
 
-app.include_router(upload_router, prefix="/api")
\ No newline at end of file
+app.include_router(upload_router, prefix="/api")
+app.include_router(jobs_router, prefix="/api")
+
+@app.on_event("startup")
+async def start_job_workers():
+    await get_job_manager().start()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await get_job_manager().stop()
+
+@app.on_event("startup")
+async def warm_up_models():
+    # Opt-in so API-only workers start without loading torch or the Whisper weights
+    if os.getenv("WHISPER_WARMUP", "0") == "1":
+        from app.services.speech_to_text import warm_up
+        await asyncio.to_thread(warm_up, int(os.getenv("WHISPER_WARMUP_MODELS", "1")))
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_serializer
 
 class TextSegment(BaseModel):
     """Model for a text segment from speech-to-text processing"""
@@ -38,12 +38,35 @@ class FrameAnalysis(BaseModel):
     timestamp_formatted: str
     text_regions: List[TextRegion]
     ui_elements: List[UIElement]
+    carried_forward: bool = False  # results reused from the previous analyzed frame
 
 class UIAnalysisResult(BaseModel):
     """Model for UI analysis results"""
     frame_count: int
     results: List[FrameAnalysis]
 
+class PositionChange(BaseModel):
+    """Model for a move of a tracked element"""
+    timestamp: float
+    position: Position
+
+class ElementTrack(BaseModel):
+    """Model for a text region or UI element tracked across frames"""
+    id: int
+    kind: str  # text or ui_element
+    type: str  # "text", or the UI element type
+    text: Optional[str] = None
+    confidence: Optional[float] = None  # highest OCR confidence of text
+    first_seen: float
+    last_seen: float
+    position: Position  # position when first seen
+    position_changes: List[PositionChange] = []
+
+class ElementTrackingResult(BaseModel):
+    """Model for element lifetimes tracked over a video"""
+    frame_count: int
+    elements: List[ElementTrack]
+
 class TestStep(BaseModel):
     """Model for a test step"""
     step_number: int
@@ -77,10 +100,22 @@ class VideoAnalysisResult(BaseModel):
     """Model for complete video analysis result"""
     id: str = Field(default_factory=lambda: datetime.now().strftime("%Y%m%d%H%M%S"))
     video_url: str
+    content_hash: Optional[str] = None  # SHA-256 of the uploaded video, used for deduplication
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    status: str = "processing"  # processing, completed, failed
+    status: str = "processing"  # queued, processing, completed, failed
+    stage: Optional[str] = None  # stages currently running, or the stage that failed
+    progress: float = 0.0  # fraction of stages completed
+    stage_timings: Dict[str, float] = {}  # seconds taken by each completed stage
     transcript: Optional[TranscriptData] = None
-    ui_analysis: Optional[UIAnalysisResult] = None
+    ui_analysis: Optional[UIAnalysisResult] = None  # or columnar FrameResults until serialized
+    ui_tracking: Optional[ElementTrackingResult] = None
     test_case: Optional[TestCase] = None
     test_automation: Optional[TestAutomation] = None
-    error: Optional[str] = None 
\ No newline at end of file
+    error: Optional[str] = None 
+
+    @field_serializer("ui_analysis")
+    def serialize_ui_analysis(self, ui_analysis):
+        # Jobs keep FrameResults here, whose dict view is only built for the response
+        if ui_analysis is None or isinstance(ui_analysis, UIAnalysisResult):
+            return ui_analysis
+        return ui_analysis.to_dict()
@@ -0,0 +1,49 @@
+import uuid
+from fastapi import APIRouter, File, UploadFile, HTTPException
+from botocore.exceptions import NoCredentialsError
+from app.models import VideoAnalysisResult
+from app.routes.upload import s3_client, S3_BUCKET_NAME
+from app.services.ingest import ingest_upload
+from app.services.jobs import get_job_manager
+
+router = APIRouter()
+
+@router.post("/jobs/", response_model=VideoAnalysisResult, status_code=202)
+async def submit_job(file: UploadFile = File(...)):
+    try:
+        # Tee the upload to S3 (when configured) and to the local copy the job processes
+        if S3_BUCKET_NAME:
+            file_key = f"videos/{uuid.uuid4()}.{file.filename.split('.')[-1]}"
+            upload = await ingest_upload(file, s3_client, S3_BUCKET_NAME, file_key)
+        else:
+            upload = await ingest_upload(file)
+    except NoCredentialsError:
+        raise HTTPException(status_code=500, detail="AWS credentials not found")
+    
+    video_url = upload["url"] or f"file://{upload['spool_path']}"
+    return await get_job_manager().submit(upload["spool_path"], video_url=video_url, content_hash=upload["sha256"])
+
+@router.get("/jobs/{job_id}", response_model=VideoAnalysisResult)
+async def get_job(job_id: str):
+    result = get_job_manager().get(job_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return result
+
+@router.post("/jobs/{job_id}/resume", response_model=VideoAnalysisResult, status_code=202)
+async def resume_job(job_id: str):
+    try:
+        return await get_job_manager().resume(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Job not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/jobs/{job_id}/stages/{stage}/rerun", response_model=VideoAnalysisResult, status_code=202)
+async def rerun_job_stage(job_id: str, stage: str):
+    try:
+        return await get_job_manager().rerun_stage(job_id, stage)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Job not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
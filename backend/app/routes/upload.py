@@ -4,6 +4,7 @@ from fastapi import APIRouter, File, UploadFile, HTTPException
 from botocore.exceptions import NoCredentialsError
 import os
 from dotenv import load_dotenv
+from app.services.ingest import ingest_upload
 
 load_dotenv()
 
@@ -27,10 +28,9 @@ async def upload_video(file: UploadFile = File(...)):
         file_extension = file.filename.split(".")[-1]
         file_key = f"videos/{uuid.uuid4()}.{file_extension}"
 
-        s3_client.upload_fileobj(file.file, S3_BUCKET_NAME, file_key)
+        # Stream the upload to S3 in concurrent parts without blocking the event loop
+        upload = await ingest_upload(file, s3_client, S3_BUCKET_NAME, file_key, spool=False)
 
-        file_url = f"https://{S3_BUCKET_NAME}.s3.amazonaws.com/{file_key}"
-
-        return {"message": "Upload successful", "file_url": file_url}
+        return {"message": "Upload successful", "file_url": upload["url"], "sha256": upload["sha256"]}
     except NoCredentialsError:
         raise HTTPException(status_code=500, detail="AWS credentials not found")
\ No newline at end of file
@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import cv2
+import numpy as np
+from collections import OrderedDict
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("analysis_cache")
+
+# Size budget of the in-memory tier in bytes of serialized results
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Optional SQLite file shared by all workers, empty disables the on-disk tier
+ANALYSIS_CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH", "")
+
+# Maximum number of entries kept in the on-disk tier
+ANALYSIS_CACHE_DISK_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_DISK_MAX_ENTRIES", "100000"))
+
+# Width in pixels frames are downscaled to before they are binarized and hashed
+ANALYSIS_HASH_WIDTH = 640
+
+# Disk entries are only re-stamped as used when their last use is older than this,
+# so cache hits rarely write
+DISK_TOUCH_SECONDS = 3600
+
+# Disk size is checked every this many writes, and trimmed in one batch to this
+# fraction of its capacity when it is over
+DISK_EVICTION_CHECK_INTERVAL = 256
+DISK_EVICTION_TARGET = 0.9
+
+
+def frame_content_hash(frame, width=ANALYSIS_HASH_WIDTH):
+    """
+    Compute a content key for a frame that is stable across encodes
+
+    The frame is downscaled and Otsu-binarized before hashing, which removes the
+    codec noise that differs between recordings of the same screen while keeping
+    the glyphs, so frames that differ by a single word still get different keys.
+
+    Args:
+        frame: Frame image as numpy array
+        width: Width in pixels the frame is downscaled to
+
+    Returns:
+        str: Hex digest identifying the frame content
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    if gray.shape[1] > width:
+        height = max(1, int(round(gray.shape[0] * width / gray.shape[1])))
+        gray = cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{frame.shape}".encode())
+    digest.update(np.packbits(binary > 0).tobytes())
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Two-tier cache of frame detection results keyed by binarized frame content
+
+    The in-memory tier is an LRU bounded by the serialized size of its entries. The
+    optional on-disk tier is a SQLite database that worker processes and later runs
+    share, so recordings of an already analyzed app skip OCR for screens seen before.
+    """
+
+    def __init__(self, max_bytes=ANALYSIS_CACHE_MAX_BYTES, path=ANALYSIS_CACHE_PATH,
+                 disk_max_entries=ANALYSIS_CACHE_DISK_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.path = path or None
+        self.disk_max_entries = disk_max_entries
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._connection = None
+        self._connection_pid = None
+        self._disk_writes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk(self):
+        # SQLite connections cannot be shared across forked processes
+        if self.path is None:
+            return None
+        if self._connection is None or self._connection_pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS analysis_cache_accessed ON analysis_cache (accessed)"
+            )
+            self._connection.commit()
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def _remember(self, key, payload):
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = payload
+        self._memory_bytes += len(payload)
+
+        while self._memory_bytes > self.max_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def get(self, key):
+        """
+        Look up a cached result
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return json.loads(payload)
+
+            disk = self._disk()
+            if disk is not None:
+                try:
+                    row = disk.execute(
+                        "SELECT value, accessed FROM analysis_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        now = time.time()
+                        if now - row[1] > DISK_TOUCH_SECONDS:
+                            disk.execute("UPDATE analysis_cache SET accessed = ? WHERE key = ?", (now, key))
+                            disk.commit()
+                        self._remember(key, row[0])
+                        self.disk_hits += 1
+                        return json.loads(row[0])
+                except sqlite3.Error as e:
+                    logger.warning(f"Analysis cache read failed: {e}")
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """
+        Store a result in both tiers
+
+        Args:
+            key: Cache key
+            value: JSON-serializable result
+        """
+        payload = json.dumps(value, separators=(",", ":"))
+
+        with self._lock:
+            self._remember(key, payload)
+
+            disk = self._disk()
+            if disk is None:
+                return
+            try:
+                disk.execute(
+                    "INSERT OR REPLACE INTO analysis_cache (key, value, accessed) VALUES (?, ?, ?)",
+                    (key, payload, time.time())
+                )
+                disk.commit()
+
+                self._disk_writes += 1
+                if self._disk_writes >= DISK_EVICTION_CHECK_INTERVAL:
+                    self._disk_writes = 0
+                    self._evict_disk(disk)
+            except sqlite3.Error as e:
+                logger.warning(f"Analysis cache write failed: {e}")
+
+    def _evict_disk(self, disk):
+        # Drop the least recently used entries in one batch once over capacity
+        count = disk.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+        if count <= self.disk_max_entries:
+            return
+        excess = count - int(self.disk_max_entries * DISK_EVICTION_TARGET)
+        disk.execute(
+            "DELETE FROM analysis_cache WHERE key IN ("
+            "SELECT key FROM analysis_cache ORDER BY accessed LIMIT ?)",
+            (excess,)
+        )
+        disk.commit()
+
+    def stats(self):
+        """
+        Get hit and miss counters
+
+        Returns:
+            dict: Hit/miss counts, hit rate and memory tier usage
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes
+            }
+
+
+# Process-wide cache, created on first use
+_analysis_cache = None
+_analysis_cache_lock = threading.Lock()
+
+
+def get_analysis_cache():
+    """Get the process-wide analysis cache"""
+    global _analysis_cache
+
+    with _analysis_cache_lock:
+        if _analysis_cache is None:
+            _analysis_cache = AnalysisCache()
+        return _analysis_cache
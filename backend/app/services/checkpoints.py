@@ -0,0 +1,99 @@
+import os
+import gzip
+import json
+import shutil
+import logging
+import tempfile
+from app.services.frame_results import FrameResults
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("checkpoints")
+
+# Directory holding per-job stage checkpoints
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", os.path.join(tempfile.gettempdir(), "qa-ai-checkpoints"))
+
+
+class CheckpointStore:
+    """Persists stage outputs so jobs can resume from the first incomplete stage
+
+    Each output is stored as gzip-compressed compact JSON in one file per job and
+    stage, written atomically so a crash never leaves a truncated checkpoint.
+    Columnar FrameResults are stored as a directory of arrays that loads
+    memory-mapped.
+    """
+
+    SUFFIX = ".json.gz"
+    FRAMES_SUFFIX = ".frames"
+
+    def __init__(self, root=CHECKPOINT_DIR):
+        self.root = root
+
+    def _job_dir(self, job_id):
+        return os.path.join(self.root, job_id)
+
+    def save(self, job_id, stage, output):
+        """
+        Store the output of a completed stage
+
+        Args:
+            job_id: Job identifier
+            stage: Stage name
+            output: JSON-serializable stage output or FrameResults
+        """
+        job_dir = self._job_dir(job_id)
+        os.makedirs(job_dir, exist_ok=True)
+
+        if isinstance(output, FrameResults):
+            output.save(os.path.join(job_dir, stage + self.FRAMES_SUFFIX))
+            return
+
+        payload = json.dumps(output, separators=(",", ":")).encode("utf-8")
+        with tempfile.NamedTemporaryFile(dir=job_dir, delete=False) as temp:
+            temp.write(gzip.compress(payload))
+        os.replace(temp.name, os.path.join(job_dir, stage + self.SUFFIX))
+
+    def load(self, job_id):
+        """
+        Load all checkpointed stage outputs of a job
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            dict: Stage outputs keyed by stage name
+        """
+        job_dir = self._job_dir(job_id)
+        if not os.path.isdir(job_dir):
+            return {}
+
+        outputs = {}
+        for name in os.listdir(job_dir):
+            try:
+                if name.endswith(self.FRAMES_SUFFIX):
+                    outputs[name[:-len(self.FRAMES_SUFFIX)]] = FrameResults.load(os.path.join(job_dir, name))
+                elif name.endswith(self.SUFFIX):
+                    with open(os.path.join(job_dir, name), "rb") as f:
+                        outputs[name[:-len(self.SUFFIX)]] = json.loads(gzip.decompress(f.read()))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable checkpoint {name} of job {job_id}: {e}")
+        return outputs
+
+    def delete(self, job_id, stages=None):
+        """
+        Delete checkpoints of a job
+
+        Args:
+            job_id: Job identifier
+            stages: Stage names to delete, all of them if None
+        """
+        job_dir = self._job_dir(job_id)
+        if stages is None:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            return
+
+        for stage in stages:
+            path = os.path.join(job_dir, stage + self.SUFFIX)
+            if os.path.exists(path):
+                os.unlink(path)
+            shutil.rmtree(os.path.join(job_dir, stage + self.FRAMES_SUFFIX), ignore_errors=True)
@@ -0,0 +1,208 @@
+import os
+import logging
+from app.services.frame_results import FrameResults
+from app.services.spatial_index import GridIndex
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("element_tracking")
+
+# Minimum overlap (intersection over union) for a detection to continue a track
+TRACK_IOU_THRESHOLD = float(os.getenv("TRACK_IOU_THRESHOLD", "0.5"))
+
+# Seconds an element may be missing (e.g. an OCR miss) before its track ends, counted
+# up to the previous frame so sparsely sampled stretches do not end every track
+TRACK_MAX_GAP_SECONDS = float(os.getenv("TRACK_MAX_GAP_SECONDS", "2"))
+
+# Movements of at most this many pixels are not recorded as position changes
+TRACK_POSITION_TOLERANCE = int(os.getenv("TRACK_POSITION_TOLERANCE", "4"))
+
+# Cell size in pixels of the spatial index
+TRACK_GRID_CELL = 64
+
+
+def box_iou(a, b):
+    """Intersection over union of two (x, y, width, height) boxes"""
+    width = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    height = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    intersection = width * height
+    return intersection / (a[2] * a[3] + b[2] * b[3] - intersection)
+
+
+def _box(position):
+    return position["x"], position["y"], position["width"], position["height"]
+
+
+def _position(box):
+    return {"x": box[0], "y": box[1], "width": box[2], "height": box[3]}
+
+
+class ElementTracker:
+    """Links detections of the same text or UI element across frames into tracks
+
+    A detection continues an active track of the same kind and label (the OCR text,
+    or the element type) whose last box overlaps it by at least `iou_threshold`;
+    matches are assigned greedily by overlap. Each track records when the element
+    was first and last seen and every move larger than `position_tolerance`.
+    """
+
+    def __init__(self, iou_threshold=TRACK_IOU_THRESHOLD, max_gap_seconds=TRACK_MAX_GAP_SECONDS,
+                 position_tolerance=TRACK_POSITION_TOLERANCE):
+        self.iou_threshold = iou_threshold
+        self.max_gap_seconds = max_gap_seconds
+        self.position_tolerance = position_tolerance
+
+        self.frame_count = 0
+        self._last_timestamp = None
+        self._tracks = []
+        self._active = set()
+        self._visible = set()
+        self._index = GridIndex(TRACK_GRID_CELL)
+
+    def _detections(self, text_regions, ui_elements):
+        for region in text_regions:
+            yield "text", region["text"], float(region.get("confidence", 0.0)), _box(region["position"])
+        for element in ui_elements:
+            yield "ui_element", element["type"], None, _box(element["position"])
+
+    def update(self, timestamp, text_regions, ui_elements):
+        """
+        Match the detections of the next analyzed frame to the active tracks
+
+        Args:
+            timestamp: Frame time in seconds
+            text_regions: Text region dicts of the frame
+            ui_elements: UI element dicts of the frame
+        """
+        self.frame_count += 1
+        self._expire()
+        self._last_timestamp = timestamp
+        detections = list(self._detections(text_regions, ui_elements))
+
+        # Candidate pairs of detection and nearby track with the same kind and label
+        pairs = []
+        for index, (kind, label, _, box) in enumerate(detections):
+            for track_id in self._index.query(box):
+                track = self._tracks[track_id]
+                if track["kind"] == kind and track["label"] == label:
+                    iou = box_iou(box, track["box"])
+                    if iou >= self.iou_threshold:
+                        pairs.append((iou, index, track_id))
+
+        matched_detections = set()
+        matched_tracks = set()
+        for iou, index, track_id in sorted(pairs, reverse=True):
+            if index in matched_detections or track_id in matched_tracks:
+                continue
+            matched_detections.add(index)
+            matched_tracks.add(track_id)
+            self._continue(self._tracks[track_id], timestamp, detections[index])
+
+        for index, detection in enumerate(detections):
+            if index not in matched_detections:
+                matched_tracks.add(self._start(timestamp, detection))
+
+        self._visible = matched_tracks
+
+    def touch(self, timestamp):
+        """Extend the tracks visible in the last analyzed frame to a frame whose results were carried forward"""
+        self.frame_count += 1
+        self._last_timestamp = timestamp
+        for track_id in self._visible:
+            self._tracks[track_id]["last_seen"] = timestamp
+
+    def _start(self, timestamp, detection):
+        kind, label, confidence, box = detection
+        track_id = len(self._tracks)
+        self._tracks.append({
+            "id": track_id,
+            "kind": kind,
+            "label": label,
+            "confidence": confidence,
+            "first_seen": timestamp,
+            "last_seen": timestamp,
+            "position": box,
+            "box": box,
+            "position_changes": []
+        })
+        self._active.add(track_id)
+        self._index.insert(track_id, box)
+        return track_id
+
+    def _continue(self, track, timestamp, detection):
+        _, _, confidence, box = detection
+        track["last_seen"] = timestamp
+        if confidence is not None:
+            track["confidence"] = max(track["confidence"] or 0.0, confidence)
+
+        if max(abs(a - b) for a, b in zip(box, track["box"])) > self.position_tolerance:
+            track["position_changes"].append({"timestamp": timestamp, "position": _position(box)})
+            track["box"] = box
+            self._index.insert(track["id"], box)
+
+    def _expire(self):
+        # Tracks missing from the frames up to the previous one for too long have ended
+        if self._last_timestamp is None:
+            return
+        for track_id in list(self._active):
+            if self._last_timestamp - self._tracks[track_id]["last_seen"] > self.max_gap_seconds:
+                self._active.discard(track_id)
+                self._index.remove(track_id)
+
+    def result(self):
+        """
+        Get one record per tracked element
+
+        Returns:
+            dict: Frame count and element records ordered by first appearance
+        """
+        elements = []
+        for track in self._tracks:
+            elements.append({
+                "id": track["id"],
+                "kind": track["kind"],
+                "type": track["label"] if track["kind"] == "ui_element" else "text",
+                "text": track["label"] if track["kind"] == "text" else None,
+                "confidence": track["confidence"],
+                "first_seen": track["first_seen"],
+                "last_seen": track["last_seen"],
+                "position": _position(track["position"]),
+                "position_changes": track["position_changes"]
+            })
+        return {"frame_count": self.frame_count, "elements": elements}
+
+
+def track_elements(ui_data, **options):
+    """
+    Turn per-frame UI analysis results into element lifetimes
+
+    Args:
+        ui_data: UI analysis results, as a dict or FrameResults
+        **options: ElementTracker settings
+
+    Returns:
+        dict: Frame count and one record per element with first and last seen
+            timestamps and position changes
+    """
+    tracker = ElementTracker(**options)
+
+    if isinstance(ui_data, FrameResults):
+        # Carried-forward frames only extend tracks, so their views are never built
+        for index, row in enumerate(ui_data.frames):
+            if row["carried_forward"]:
+                tracker.touch(float(row["timestamp"]))
+            else:
+                frame = ui_data.frame(index)
+                tracker.update(frame["timestamp"], frame["text_regions"], frame["ui_elements"])
+    else:
+        for frame in ui_data.get("results", []):
+            if frame.get("carried_forward"):
+                tracker.touch(frame["timestamp"])
+            else:
+                tracker.update(frame["timestamp"], frame["text_regions"], frame["ui_elements"])
+
+    result = tracker.result()
+    logger.info(f"Tracked {len(result['elements'])} elements over {result['frame_count']} frames")
+    return result
@@ -0,0 +1,292 @@
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+
+# One row per sampled frame, pointing at its rows in the text and element tables.
+# Frames whose results were carried forward share the rows of the previous frame.
+FRAME_DTYPE = np.dtype([
+    ("timestamp", "f8"),
+    ("carried_forward", "?"),
+    ("text_start", "i4"),
+    ("text_count", "i4"),
+    ("element_start", "i4"),
+    ("element_count", "i4"),
+])
+
+# Detected text, with the OCR text as an index into the string table
+TEXT_DTYPE = np.dtype([
+    ("frame", "i4"),
+    ("string", "i4"),
+    ("confidence", "f4"),
+    ("x", "i4"),
+    ("y", "i4"),
+    ("width", "i4"),
+    ("height", "i4"),
+])
+
+# Detected UI elements, with the element type as an index into the string table
+ELEMENT_DTYPE = np.dtype([
+    ("frame", "i4"),
+    ("type", "i4"),
+    ("x", "i4"),
+    ("y", "i4"),
+    ("width", "i4"),
+    ("height", "i4"),
+])
+
+ARRAYS = ("frames", "texts", "elements", "string_data", "string_offsets")
+
+
+def _timestamp_formatted(timestamp):
+    return f"{int(timestamp // 60):02d}:{int(timestamp % 60):02d}"
+
+
+def _position(row):
+    return {"x": int(row["x"]), "y": int(row["y"]), "width": int(row["width"]), "height": int(row["height"])}
+
+
+class FrameResults:
+    """Columnar per-frame UI analysis results
+
+    Frames, text regions and UI elements are NumPy structured arrays and all
+    strings live in one UTF-8 string table, so a long video is a handful of
+    arrays instead of millions of small dicts. The arrays are saved as .npy files
+    that load memory-mapped, and dict or Pydantic views are only built on request.
+    """
+
+    def __init__(self, frames, texts, elements, string_data, string_offsets):
+        self.frames = frames
+        self.texts = texts
+        self.elements = elements
+        self.string_data = string_data
+        self.string_offsets = string_offsets
+        self._strings = {}
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def nbytes(self):
+        """Total size of the arrays in bytes"""
+        return sum(getattr(self, name).nbytes for name in ARRAYS)
+
+    def string(self, index):
+        """Get an entry of the string table"""
+        if index not in self._strings:
+            start, end = self.string_offsets[index], self.string_offsets[index + 1]
+            self._strings[index] = bytes(self.string_data[start:end]).decode("utf-8")
+        return self._strings[index]
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build columnar results from the dict format of analyze_video_ui
+
+        Args:
+            data: Dict with a "results" list of frame dicts
+
+        Returns:
+            FrameResults: The same results in columnar form
+        """
+        builder = FrameResultsBuilder()
+        for frame in data.get("results", []):
+            builder.add_frame(frame["timestamp"], frame["text_regions"], frame["ui_elements"],
+                              frame.get("carried_forward", False))
+        return builder.build()
+
+    def frame(self, index):
+        """
+        Get the dict view of a frame
+
+        Args:
+            index: Frame index
+
+        Returns:
+            dict: Frame result in the format of analyze_video_ui
+        """
+        row = self.frames[index]
+        texts = self.texts[row["text_start"]:row["text_start"] + row["text_count"]]
+        elements = self.elements[row["element_start"]:row["element_start"] + row["element_count"]]
+        timestamp = float(row["timestamp"])
+
+        return {
+            "timestamp": timestamp,
+            "timestamp_formatted": _timestamp_formatted(timestamp),
+            "text_regions": [
+                {"text": self.string(int(text["string"])), "confidence": float(text["confidence"]),
+                 "position": _position(text)}
+                for text in texts
+            ],
+            "ui_elements": [
+                {"type": self.string(int(element["type"])), "position": _position(element)}
+                for element in elements
+            ],
+            "carried_forward": bool(row["carried_forward"])
+        }
+
+    def iter_frames(self, include_carried_forward=True):
+        """Iterate over the dict views of the frames"""
+        for index in range(len(self.frames)):
+            if include_carried_forward or not self.frames[index]["carried_forward"]:
+                yield self.frame(index)
+
+    def between(self, start, end):
+        """
+        Get the frames with a timestamp in [start, end) as results sharing the same tables
+
+        Args:
+            start: Start time in seconds
+            end: End time in seconds
+
+        Returns:
+            FrameResults: The frames in the time range
+        """
+        timestamps = self.frames["timestamp"]
+        first, last = np.searchsorted(timestamps, [start, end], side="left")
+        return FrameResults(self.frames[first:last], self.texts, self.elements, self.string_data,
+                            self.string_offsets)
+
+    def to_dict(self):
+        """Get the dict format of analyze_video_ui"""
+        return {"frame_count": len(self.frames), "results": list(self.iter_frames())}
+
+    def to_model(self):
+        """Get the UIAnalysisResult view"""
+        from app.models import UIAnalysisResult
+
+        return UIAnalysisResult.model_validate(self.to_dict())
+
+    def save(self, path):
+        """
+        Write the arrays as .npy files into a directory, replacing any previous one
+
+        The new directory is written in full next to the old one, which is moved
+        aside before the new one takes its place and only deleted afterwards, so a
+        crash part way through leaves one of them on disk.
+
+        Args:
+            path: Directory to write
+        """
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(dir=parent)
+        for name in ARRAYS:
+            np.save(os.path.join(temp_dir, name + ".npy"), np.ascontiguousarray(getattr(self, name)))
+        with open(os.path.join(temp_dir, "meta.json"), "w") as f:
+            json.dump({"frame_count": len(self.frames)}, f)
+
+        previous_dir = None
+        if os.path.isdir(path):
+            previous_dir = temp_dir + ".old"
+            os.replace(path, previous_dir)
+        os.replace(temp_dir, path)
+        if previous_dir:
+            shutil.rmtree(previous_dir, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load results written by save
+
+        Args:
+            path: Directory written by save
+            mmap: Memory-map the arrays instead of reading them
+
+        Returns:
+            FrameResults: The loaded results
+        """
+        mode = "r" if mmap else None
+        return cls(*(np.load(os.path.join(path, name + ".npy"), mmap_mode=mode) for name in ARRAYS))
+
+
+class FrameResultsBuilder:
+    """Appends frame results row by row and packs them into FrameResults"""
+
+    def __init__(self):
+        self._frames = []
+        self._texts = []
+        self._elements = []
+        self._string_index = {}
+        self._previous = None
+
+    def _intern(self, text):
+        index = self._string_index.get(text)
+        if index is None:
+            index = self._string_index[text] = len(self._string_index)
+        return index
+
+    def add_frame(self, timestamp, text_regions, ui_elements, carried_forward=False):
+        """
+        Append the results of a frame
+
+        Lists that are the same objects as those of the previous frame, as for
+        carried-forward frames, reuse its rows instead of being stored again.
+
+        Args:
+            timestamp: Frame time in seconds
+            text_regions: Text region dicts
+            ui_elements: UI element dicts
+            carried_forward: Whether the results were reused from the previous analyzed frame
+        """
+        frame = len(self._frames)
+        previous = self._previous
+
+        if previous is not None and text_regions is previous[0]:
+            text_start, text_count = previous[2], previous[3]
+        else:
+            text_start, text_count = len(self._texts), len(text_regions)
+            for region in text_regions:
+                position = region["position"]
+                self._texts.append((
+                    frame, self._intern(region["text"]), float(region["confidence"]),
+                    position["x"], position["y"], position["width"], position["height"]
+                ))
+
+        if previous is not None and ui_elements is previous[1]:
+            element_start, element_count = previous[4], previous[5]
+        else:
+            element_start, element_count = len(self._elements), len(ui_elements)
+            for element in ui_elements:
+                position = element["position"]
+                self._elements.append((
+                    frame, self._intern(element["type"]),
+                    position["x"], position["y"], position["width"], position["height"]
+                ))
+
+        self._frames.append((timestamp, carried_forward, text_start, text_count, element_start, element_count))
+        self._previous = (text_regions, ui_elements, text_start, text_count, element_start, element_count)
+
+    def build(self):
+        """Pack the appended frames into FrameResults"""
+        encoded = [text.encode("utf-8") for text in self._string_index]
+        string_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        string_offsets[1:] = np.cumsum([len(data) for data in encoded])
+
+        return FrameResults(
+            np.array(self._frames, dtype=FRAME_DTYPE),
+            np.array(self._texts, dtype=TEXT_DTYPE),
+            np.array(self._elements, dtype=ELEMENT_DTYPE),
+            np.frombuffer(b"".join(encoded), dtype=np.uint8).copy(),
+            string_offsets
+        )
+
+
+def iter_frame_dicts(ui_data, include_carried_forward=True):
+    """
+    Iterate over the frame dicts of UI analysis results in either format
+
+    Args:
+        ui_data: FrameResults or the dict format of analyze_video_ui
+        include_carried_forward: Whether to include frames carried forward
+
+    Returns:
+        iterator: Frame dicts
+    """
+    if isinstance(ui_data, FrameResults):
+        return ui_data.iter_frames(include_carried_forward)
+    return (
+        frame for frame in ui_data.get("results", [])
+        if include_carried_forward or not frame.get("carried_forward")
+    )
@@ -0,0 +1,227 @@
+import os
+import logging
+import cv2
+import numpy as np
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("frame_sampling")
+
+# Sample frames around narration and visual changes instead of at a fixed rate.
+# Off by default, so frames are sampled once per second unless enabled
+ADAPTIVE_SAMPLING = os.getenv("ADAPTIVE_SAMPLING", "0") == "1"
+
+# Maximum number of frames sampled from one video
+SAMPLING_FRAME_BUDGET = int(os.getenv("SAMPLING_FRAME_BUDGET", "900"))
+
+# Average frames per second the budget allows, so shorter videos get fewer frames
+SAMPLING_BUDGET_RATE = float(os.getenv("SAMPLING_BUDGET_RATE", "0.75"))
+
+# Frames per second sampled while an action is narrated, and elsewhere
+SAMPLING_SPEECH_RATE = float(os.getenv("SAMPLING_SPEECH_RATE", "2"))
+SAMPLING_IDLE_RATE = float(os.getenv("SAMPLING_IDLE_RATE", "0.2"))
+
+# Seconds before and after a transcript segment sampled at the speech rate, since
+# testers often click just before or just after saying what they do
+SAMPLING_SPEECH_LEAD_SECONDS = float(os.getenv("SAMPLING_SPEECH_LEAD_SECONDS", "1"))
+SAMPLING_SPEECH_TAIL_SECONDS = float(os.getenv("SAMPLING_SPEECH_TAIL_SECONDS", "2"))
+
+# Frames per second checked for visual changes between the scheduled samples
+SAMPLING_PROBE_RATE = float(os.getenv("SAMPLING_PROBE_RATE", "4"))
+
+# Share of the frame budget reserved for frames sampled on a visual change
+SAMPLING_CHANGE_SHARE = float(os.getenv("SAMPLING_CHANGE_SHARE", "0.3"))
+
+# Fraction of probe signature pixels that must change for a probed frame to be sampled
+SAMPLING_CHANGE_THRESHOLD = float(os.getenv("SAMPLING_CHANGE_THRESHOLD", "0.001"))
+
+# Change samples that may be taken in a burst, e.g. a quick sequence of clicks
+SAMPLING_CHANGE_BURST = 8
+
+# Size of the downscaled grayscale signature of probed frames
+PROBE_SIGNATURE_SIZE = (160, 90)
+
+# Minimum grayscale difference for a signature pixel to count as changed
+PROBE_PIXEL_DELTA = 12
+
+
+def frame_budget(duration, max_frames=SAMPLING_FRAME_BUDGET, rate=SAMPLING_BUDGET_RATE):
+    """Number of frames that may be sampled from a video of the given length"""
+    return max(1, min(max_frames, int(duration * rate)))
+
+
+def speech_windows(segments, duration, lead=SAMPLING_SPEECH_LEAD_SECONDS, tail=SAMPLING_SPEECH_TAIL_SECONDS):
+    """
+    Merge padded transcript segments into sorted, non-overlapping time windows
+
+    Args:
+        segments: Transcript segment dicts with start and end times in seconds
+        duration: Video length in seconds
+        lead: Seconds added before each segment
+        tail: Seconds added after each segment
+
+    Returns:
+        list: (start, end) windows in seconds, clipped to the video
+    """
+    padded = sorted(
+        (max(0.0, float(segment["start"]) - lead), min(duration, float(segment["end"]) + tail))
+        for segment in segments
+    )
+
+    windows = []
+    for start, end in padded:
+        if end <= start:
+            continue
+        if windows and start <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], end)
+        else:
+            windows.append([start, end])
+    return [tuple(window) for window in windows]
+
+
+def _rate_pieces(duration, windows, speech_rate, idle_rate):
+    # Piecewise-constant sampling rate over the whole video
+    cursor = 0.0
+    for start, end in windows:
+        if start > cursor:
+            yield cursor, start, idle_rate
+        yield start, end, speech_rate
+        cursor = end
+    if duration > cursor:
+        yield cursor, duration, idle_rate
+
+
+def plan_sample_times(duration, segments, budget, speech_rate=SAMPLING_SPEECH_RATE,
+                      idle_rate=SAMPLING_IDLE_RATE, lead=SAMPLING_SPEECH_LEAD_SECONDS,
+                      tail=SAMPLING_SPEECH_TAIL_SECONDS):
+    """
+    Schedule sample times that are dense while actions are narrated and sparse elsewhere
+
+    Both rates are scaled down together when the video would need more frames than
+    the budget. Samples are placed where the integral of the rate crosses a whole
+    number, so short windows still get their share and the total stays in budget.
+
+    Args:
+        duration: Video length in seconds
+        segments: Transcript segment dicts with start and end times in seconds
+        budget: Maximum number of sample times
+        speech_rate: Frames per second inside speech windows
+        idle_rate: Frames per second outside them
+        lead: Seconds sampled densely before each segment
+        tail: Seconds sampled densely after each segment
+
+    Returns:
+        list: Sorted sample times in seconds, starting with 0
+    """
+    if duration <= 0 or budget <= 0:
+        return []
+
+    windows = speech_windows(segments, duration, lead, tail)
+    speech_seconds = sum(end - start for start, end in windows)
+    wanted = speech_seconds * speech_rate + (duration - speech_seconds) * idle_rate
+    scale = min(1.0, (budget - 1) / wanted) if wanted > 0 else 0.0
+
+    times = [0.0]
+    owed = 0.0
+    for start, end, rate in _rate_pieces(duration, windows, speech_rate * scale, idle_rate * scale):
+        t = start
+        while rate > 0:
+            t_next = t + (1.0 - owed) / rate
+            if t_next >= end:
+                owed += (end - t) * rate
+                break
+            times.append(t_next)
+            t, owed = t_next, 0.0
+    return times[:budget]
+
+
+class AdaptiveFrameSampler:
+    """Chooses which decoded frames of a video to sample
+
+    Most of the budget goes to a schedule from plan_sample_times. Between scheduled
+    samples, frames are probed at `probe_rate` through a tiny grayscale signature,
+    and a probe that differs from the last sampled frame is sampled too. Change
+    samples come from a token bucket refilled evenly over the video, so a long
+    animation cannot spend the whole reserve in its first seconds. Without transcript
+    segments, the budget the sparse idle schedule leaves unused is kept for changes.
+    """
+
+    def __init__(self, fps, duration, segments=(), budget=None, change_share=SAMPLING_CHANGE_SHARE,
+                 probe_rate=SAMPLING_PROBE_RATE, change_threshold=SAMPLING_CHANGE_THRESHOLD, **schedule):
+        self.fps = fps
+        self.duration = duration
+        self.budget = frame_budget(duration) if budget is None else budget
+        self.change_threshold = change_threshold
+        self.stats = {"scheduled": 0, "changes": 0, "probes": 0}
+
+        change_budget = int(self.budget * change_share) if probe_rate > 0 else 0
+        times = plan_sample_times(duration, segments or (), self.budget - change_budget, **schedule)
+        if not segments and probe_rate > 0:
+            # Without narration to schedule around, what the idle schedule leaves goes to changes
+            change_budget = self.budget - len(times)
+        self._scheduled = {int(round(t * fps)) for t in times}
+        self._probe_interval = max(1, int(round(fps / probe_rate))) if probe_rate > 0 else 0
+
+        self._changes_left = change_budget
+        self._change_rate = change_budget / duration if duration > 0 else 0.0
+        self._tokens = float(min(SAMPLING_CHANGE_BURST, change_budget))
+        self._last_probe_time = 0.0
+        self._reference = None
+
+        logger.info(f"Sampling up to {self.budget} frames: {len(self._scheduled)} scheduled around "
+                    f"{len(speech_windows(segments or (), duration))} speech windows, {change_budget} on visual change")
+
+    def action(self, position):
+        """
+        Decide what to do with a decoded frame
+
+        Args:
+            position: Frame index in the video
+
+        Returns:
+            str: "sample" for a scheduled frame, "probe" to check it for a change, or None to skip it
+        """
+        if position in self._scheduled:
+            return "sample"
+        if self._changes_left > 0 and self._probe_interval and position % self._probe_interval == 0:
+            return "probe"
+        return None
+
+    def _signature(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, PROBE_SIGNATURE_SIZE, interpolation=cv2.INTER_AREA)
+
+    def accept(self, position, frame, action):
+        """
+        Decide whether a retrieved frame is sampled
+
+        Args:
+            position: Frame index in the video
+            frame: Frame image as numpy array
+            action: Result of action() for the frame
+
+        Returns:
+            bool: True if the frame should be analyzed
+        """
+        signature = self._signature(frame)
+        if action == "sample":
+            self._reference = signature
+            self.stats["scheduled"] += 1
+            return True
+
+        self.stats["probes"] += 1
+        timestamp = position / self.fps
+        self._tokens = min(SAMPLING_CHANGE_BURST, self._tokens + (timestamp - self._last_probe_time) * self._change_rate)
+        self._last_probe_time = timestamp
+        if self._tokens < 1 or self._reference is None:
+            return False
+
+        changed = cv2.absdiff(signature, self._reference) > PROBE_PIXEL_DELTA
+        if float(np.count_nonzero(changed)) / changed.size <= self.change_threshold:
+            return False
+
+        self._reference = signature
+        self._tokens -= 1
+        self._changes_left -= 1
+        self.stats["changes"] += 1
+        return True
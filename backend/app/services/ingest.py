@@ -0,0 +1,174 @@
+import os
+import asyncio
+import hashlib
+import logging
+import tempfile
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("ingest")
+
+# Bytes read from the request per iteration
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", str(1024 * 1024)))
+
+# Size of each S3 multipart part (S3 requires at least 5 MiB for all but the last part)
+S3_PART_SIZE = max(5 * 1024 * 1024, int(os.getenv("S3_PART_SIZE", str(8 * 1024 * 1024))))
+
+# Parts uploaded concurrently, which bounds the memory used per upload
+S3_MAX_CONCURRENT_PARTS = int(os.getenv("S3_MAX_CONCURRENT_PARTS", "4"))
+
+# Local directory holding spooled copies of uploads for processing
+SPOOL_DIR = os.getenv("SPOOL_DIR", tempfile.gettempdir())
+
+
+class _MultipartUpload:
+    """S3 multipart upload whose parts are sent from worker threads
+
+    A part that fails is recorded as soon as its task finishes and raised from the
+    next add_part or complete, so the object is never completed with a part missing.
+    """
+
+    def __init__(self, s3_client, bucket, key):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.upload_id = None
+        self.parts = []
+        self._tasks = set()
+        self._errors = []
+        self._next_part = 1
+
+    async def start(self):
+        response = await asyncio.to_thread(self.s3_client.create_multipart_upload, Bucket=self.bucket, Key=self.key)
+        self.upload_id = response["UploadId"]
+
+    async def _upload_part(self, number, data):
+        response = await asyncio.to_thread(
+            self.s3_client.upload_part,
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, PartNumber=number, Body=data
+        )
+        self.parts.append({"ETag": response["ETag"], "PartNumber": number})
+
+    def _part_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._errors.append(task.exception())
+
+    def _raise_failed_part(self):
+        if self._errors:
+            raise self._errors[0]
+
+    async def add_part(self, data):
+        # Wait for a slot so at most S3_MAX_CONCURRENT_PARTS parts are held in memory
+        while len(self._tasks) >= S3_MAX_CONCURRENT_PARTS:
+            await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+        self._raise_failed_part()
+
+        task = asyncio.create_task(self._upload_part(self._next_part, data))
+        self._tasks.add(task)
+        task.add_done_callback(self._part_done)
+        self._next_part += 1
+
+    async def complete(self):
+        if self._tasks:
+            await asyncio.wait(self._tasks)
+        self._raise_failed_part()
+        if len(self.parts) != self._next_part - 1:
+            raise RuntimeError(f"Uploaded {len(self.parts)} of {self._next_part - 1} parts of {self.key}")
+
+        if not self.parts:
+            # A multipart upload needs at least one part, store empty files directly
+            await self.abort()
+            await asyncio.to_thread(self.s3_client.put_object, Bucket=self.bucket, Key=self.key, Body=b"")
+            return
+
+        parts = sorted(self.parts, key=lambda part: part["PartNumber"])
+        await asyncio.to_thread(
+            self.s3_client.complete_multipart_upload,
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, MultipartUpload={"Parts": parts}
+        )
+
+    async def abort(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        if self.upload_id is not None:
+            try:
+                await asyncio.to_thread(
+                    self.s3_client.abort_multipart_upload, Bucket=self.bucket, Key=self.key, UploadId=self.upload_id
+                )
+            except Exception as e:
+                logger.warning(f"Failed to abort multipart upload of {self.key}: {e}")
+
+
+async def ingest_upload(file, s3_client=None, bucket=None, key=None, spool=True, spool_dir=SPOOL_DIR):
+    """
+    Stream an upload to local spool storage and S3 while hashing it
+
+    The request body is read in fixed-size chunks, written to a local spool file and
+    uploaded to S3 as concurrent multipart parts off the event loop, so memory per
+    upload stays bounded and the local copy is ready for processing without
+    downloading the object back.
+
+    Args:
+        file: The uploaded file
+        s3_client: Optional boto3 S3 client, the upload is only spooled locally without it
+        bucket: S3 bucket name
+        key: S3 object key
+        spool: Whether to write a local copy for processing
+        spool_dir: Directory for the local copy
+
+    Returns:
+        dict: Spool path (None without a local copy), SHA-256 content hash, size in bytes, and S3 key and URL
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    suffix = os.path.splitext(file.filename or "")[1]
+    spool_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=spool_dir) if spool else None
+    multipart = _MultipartUpload(s3_client, bucket, key) if s3_client is not None else None
+
+    try:
+        if multipart is not None:
+            await multipart.start()
+
+        part = bytearray()
+        while True:
+            chunk = await file.read(INGEST_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            hasher.update(chunk)
+            size += len(chunk)
+            if spool_file is not None:
+                await asyncio.to_thread(spool_file.write, chunk)
+
+            if multipart is not None:
+                part += chunk
+                if len(part) >= S3_PART_SIZE:
+                    await multipart.add_part(bytes(part))
+                    part = bytearray()
+
+        if spool_file is not None:
+            spool_file.close()
+
+        if multipart is not None:
+            if part:
+                await multipart.add_part(bytes(part))
+            await multipart.complete()
+
+    except BaseException:
+        if multipart is not None:
+            await multipart.abort()
+        if spool_file is not None:
+            spool_file.close()
+            os.unlink(spool_file.name)
+        raise
+
+    return {
+        "spool_path": spool_file.name if spool_file is not None else None,
+        "sha256": hasher.hexdigest(),
+        "size": size,
+        "key": key,
+        "url": f"https://{bucket}.s3.amazonaws.com/{key}" if multipart is not None else None
+    }
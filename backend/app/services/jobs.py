@@ -0,0 +1,526 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import logging
+from app.services.pipeline import Stage, StageGraph, StageError
+from app.services.results_store import ResultsStore
+from app.services.checkpoints import CheckpointStore
+from app.services.frame_results import FrameResults
+from app.models import (
+    VideoAnalysisResult,
+    TranscriptData,
+    UIAnalysisResult,
+    ElementTrackingResult,
+    TestCase,
+    TestAutomation,
+)
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("jobs")
+
+# Queue implementation: "memory" (in-process) or "sqlite" (survives restarts, shared by processes)
+JOB_QUEUE = os.getenv("JOB_QUEUE", "memory")
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "jobs.sqlite3")
+
+# Number of jobs processed concurrently by the local worker pool
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+# Seconds between polls of the SQLite queue when it is empty
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+
+# Seconds after which a claimed job whose worker stopped renewing the claim is handed out again
+JOB_VISIBILITY_TIMEOUT = float(os.getenv("JOB_VISIBILITY_TIMEOUT", "300"))
+
+# Number of finished jobs kept in memory, older ones are only found through the results store
+JOB_RESULTS_MAX_ENTRIES = int(os.getenv("JOB_RESULTS_MAX_ENTRIES", "1000"))
+
+# Number of failed jobs whose checkpoints and video are kept so they can be resumed
+JOB_FAILED_MAX_ENTRIES = int(os.getenv("JOB_FAILED_MAX_ENTRIES", "100"))
+
+# Start UI analysis after transcription so frames are sampled around narrated actions,
+# at the cost of no longer running the two stages concurrently. Off by default, so
+# UI analysis samples on visual changes while the transcript is produced
+SPEECH_GUIDED_SAMPLING = os.getenv("SPEECH_GUIDED_SAMPLING", "0") == "1"
+
+
+class JobQueue:
+    """Interface of the queue feeding video analysis jobs to workers
+
+    Jobs are plain JSON-serializable dicts, so a real broker can stand in for the
+    local implementations by providing put() and get(). Workers renew() the jobs
+    they are running and ack() them once done, for queues that redeliver jobs
+    whose worker disappeared.
+    """
+
+    async def put(self, job):
+        raise NotImplementedError
+
+    async def get(self):
+        raise NotImplementedError
+
+    async def renew(self, job):
+        pass
+
+    async def ack(self, job):
+        pass
+
+
+class InMemoryJobQueue(JobQueue):
+    """Job queue living in the current process"""
+
+    def __init__(self):
+        self._queue = asyncio.Queue()
+
+    async def put(self, job):
+        await self._queue.put(job)
+
+    async def get(self):
+        return await self._queue.get()
+
+
+class SQLiteJobQueue(JobQueue):
+    """Job queue persisted in a SQLite database
+
+    A claimed job stays in the table with its claim time until it is acknowledged.
+    Claims not renewed within `visibility_timeout` seconds, e.g. after a worker
+    crash, expire and the job is handed to another worker.
+    """
+
+    def __init__(self, path=JOB_QUEUE_PATH, poll_interval=JOB_POLL_INTERVAL,
+                 visibility_timeout=JOB_VISIBILITY_TIMEOUT):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.visibility_timeout = visibility_timeout
+
+        # claimed holds the time of the last claim or renewal, 0 while the job waits
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS job_queue "
+                "(id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL, "
+                "claimed REAL NOT NULL DEFAULT 0, created REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _put(self, job):
+        payload = {key: value for key, value in job.items() if key != "queue_id"}
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO job_queue (payload, created) VALUES (?, ?)",
+                (json.dumps(payload), time.time())
+            )
+
+    def _claim(self):
+        connection = self._connect()
+        try:
+            # Claim atomically so concurrent workers never take the same job
+            now = time.time()
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT id, payload FROM job_queue WHERE claimed = 0 OR claimed < ? ORDER BY id LIMIT 1",
+                (now - self.visibility_timeout,)
+            ).fetchone()
+            if row is not None:
+                connection.execute("UPDATE job_queue SET claimed = ? WHERE id = ?", (now, row[0]))
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+        if row is None:
+            return None
+        job = json.loads(row[1])
+        job["queue_id"] = row[0]
+        return job
+
+    def _execute(self, query, params):
+        with self._connect() as connection:
+            connection.execute(query, params)
+
+    async def put(self, job):
+        await asyncio.to_thread(self._put, job)
+
+    async def get(self):
+        while True:
+            job = await asyncio.to_thread(self._claim)
+            if job is not None:
+                return job
+            await asyncio.sleep(self.poll_interval)
+
+    async def renew(self, job):
+        if job.get("queue_id") is not None:
+            await asyncio.to_thread(self._execute, "UPDATE job_queue SET claimed = ? WHERE id = ?",
+                                    (time.time(), job["queue_id"]))
+
+    async def ack(self, job):
+        if job.get("queue_id") is not None:
+            await asyncio.to_thread(self._execute, "DELETE FROM job_queue WHERE id = ?", (job["queue_id"],))
+
+
+def create_job_queue(kind=JOB_QUEUE):
+    """
+    Create the configured job queue
+
+    Args:
+        kind: Queue implementation ("memory" or "sqlite")
+
+    Returns:
+        JobQueue: The created queue
+    """
+    if kind == "memory":
+        return InMemoryJobQueue()
+    if kind == "sqlite":
+        return SQLiteJobQueue()
+    raise ValueError(f"Unknown job queue: {kind}")
+
+
+async def _run_transcript(inputs, context):
+    from app.services.speech_to_text import process_video_to_text
+
+    return await process_video_to_text(context["video_path"])
+
+
+async def _run_ui_analysis(inputs, context):
+    from app.services.ui_detection import analyze_video_ui
+
+    transcript = inputs.get("transcript")
+    segments = transcript.get("segments") if transcript else None
+    return await analyze_video_ui(context["video_path"], columnar=True, speech_segments=segments)
+
+
+async def _run_ui_tracking(inputs, context):
+    from app.services.element_tracking import track_elements
+
+    return track_elements(inputs["ui_analysis"])
+
+
+async def _run_test_case(inputs, context):
+    from app.services.test_extractor import extract_test_cases
+
+    return await extract_test_cases(inputs["transcript"], inputs["ui_analysis"])
+
+
+async def _run_test_automation(inputs, context):
+    from app.services.test_generator import generate_test_automation
+
+    return await generate_test_automation(inputs["test_case"])
+
+
+# Transcription and UI analysis run on their own executors, concurrently unless UI
+# analysis waits for the transcript to guide frame sampling. Test extraction starts
+# once both are done, while element tracking runs on the UI analysis executor as
+# soon as its input is ready
+VIDEO_PIPELINE = StageGraph([
+    Stage("transcript", _run_transcript, executor="transcription"),
+    Stage("ui_analysis", _run_ui_analysis, depends_on=("transcript",) if SPEECH_GUIDED_SAMPLING else (),
+          executor="ui_analysis"),
+    Stage("ui_tracking", _run_ui_tracking, depends_on=("ui_analysis",), executor="ui_analysis"),
+    Stage("test_case", _run_test_case, depends_on=("transcript", "ui_analysis")),
+    Stage("test_automation", _run_test_automation, depends_on=("test_case",)),
+])
+
+# Result field and model filled by each stage's output
+STAGE_RESULTS = {
+    "transcript": TranscriptData,
+    "ui_analysis": UIAnalysisResult,
+    "ui_tracking": ElementTrackingResult,
+    "test_case": TestCase,
+    "test_automation": TestAutomation,
+}
+
+# Stages that read the video file rather than earlier stage outputs
+VIDEO_STAGES = {"transcript", "ui_analysis"}
+
+
+class JobManager:
+    """Runs end-to-end video analysis jobs on a pool of local workers
+
+    Each job owns a VideoAnalysisResult that is updated as stages complete, so
+    clients can poll its status, running stages, progress and stage timings. Stage
+    outputs are checkpointed until the job completes, so a failed job resumes from
+    its first incomplete stage and a single stage can be re-run without redoing the
+    ones before it. Only the latest `JOB_FAILED_MAX_ENTRIES` failed jobs keep their
+    checkpoints and video.
+    """
+
+    def __init__(self, job_queue=None, workers=JOB_WORKERS, pipeline=VIDEO_PIPELINE, results_store=None,
+                 checkpoints=None):
+        self.queue = job_queue or create_job_queue()
+        self.workers = workers
+        self.pipeline = pipeline
+        self.results_store = results_store or ResultsStore()
+        self.checkpoints = checkpoints or CheckpointStore()
+        self.results = {}
+        self._jobs = {}
+        self._in_flight = {}
+        self._tasks = []
+
+    async def submit(self, video_path, video_url, cleanup=True, content_hash=None):
+        """
+        Queue a video for analysis
+
+        A video whose content hash matches a completed analysis gets that result back,
+        and one matching a queued or running job is attached to it instead of being
+        processed again.
+
+        Args:
+            video_path: Local path of the video to analyze
+            video_url: URL the video is stored at
+            cleanup: Whether to delete the local file once the job finishes
+            content_hash: Optional SHA-256 of the video content used for deduplication
+
+        Returns:
+            VideoAnalysisResult: The job's result, updated as it runs
+        """
+        if content_hash is not None:
+            existing = self._find_existing(content_hash)
+            if existing is not None:
+                logger.info(f"Video {content_hash[:12]} already analyzed or in progress as job {existing.id}")
+                if cleanup and os.path.exists(video_path):
+                    os.unlink(video_path)
+                return existing
+
+        result = VideoAnalysisResult(id=uuid.uuid4().hex, video_url=video_url, status="queued",
+                                     content_hash=content_hash)
+        self.results[result.id] = result
+        if content_hash is not None:
+            self._in_flight[content_hash] = result.id
+
+        job = {
+            "job_id": result.id,
+            "video_path": video_path,
+            "video_url": video_url,
+            "cleanup": cleanup,
+            "content_hash": content_hash
+        }
+        self._jobs[result.id] = job
+        await self.queue.put(job)
+        return result
+
+    async def resume(self, job_id):
+        """
+        Queue a job again, running only the stages without a checkpoint
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            VideoAnalysisResult: The job's result, updated as it runs
+        """
+        return await self.rerun_stage(job_id, None)
+
+    async def rerun_stage(self, job_id, stage):
+        """
+        Re-run one stage of a job and every stage that depends on it
+
+        Args:
+            job_id: Job identifier
+            stage: Stage name, or None to only run the stages without a checkpoint
+
+        Returns:
+            VideoAnalysisResult: The job's result, updated as it runs
+        """
+        result = self.results.get(job_id)
+        job = self._jobs.get(job_id)
+        if result is None or job is None:
+            raise KeyError(job_id)
+        if result.status in ("queued", "processing"):
+            raise ValueError(f"Job {job_id} is already {result.status}")
+        if stage is not None and stage not in self.pipeline.stages:
+            raise ValueError(f"Unknown stage: {stage}")
+
+        stale = {stage} | self.pipeline.dependents(stage) if stage is not None else set()
+        pending = (set(self.pipeline.stages) - set(self.checkpoints.load(job_id))) | stale
+        if pending & VIDEO_STAGES and not os.path.exists(job["video_path"]):
+            raise ValueError(f"Video of job {job_id} is no longer available to re-run {', '.join(sorted(pending))}")
+
+        self.checkpoints.delete(job_id, stale)
+        for name in stale:
+            result.stage_timings.pop(name, None)
+            if name in STAGE_RESULTS:
+                setattr(result, name, None)
+
+        result.status = "queued"
+        result.error = None
+        if result.content_hash is not None:
+            self._in_flight[result.content_hash] = job_id
+        await self.queue.put(job)
+        return result
+
+    def _find_existing(self, content_hash):
+        job_id = self._in_flight.get(content_hash)
+        if job_id is not None:
+            return self.results[job_id]
+
+        stored = self.results_store.get(content_hash)
+        if stored is not None:
+            self.results.setdefault(stored.id, stored)
+        return stored
+
+    def get(self, job_id):
+        """Get the result of a job, or None if it is unknown"""
+        result = self.results.get(job_id)
+        if result is None:
+            result = self.results_store.get_job(job_id)
+        return result
+
+    def _evict_finished(self):
+        # Completed results live on in the results store, failed ones can no longer be resumed
+        finished = [
+            job_id for job_id, result in self.results.items()
+            if result.status in ("completed", "failed")
+        ]
+        failed = [job_id for job_id in finished if self.results[job_id].status == "failed"]
+        evicted = failed[:max(len(failed) - JOB_FAILED_MAX_ENTRIES, 0)]
+        excess = len(self.results) - len(evicted) - JOB_RESULTS_MAX_ENTRIES
+        if excess > 0:
+            evicted += [job_id for job_id in finished if job_id not in evicted][:excess]
+
+        for job_id in evicted:
+            del self.results[job_id]
+            job = self._jobs.pop(job_id, None)
+            self.checkpoints.delete(job_id)
+            if job is not None and job.get("cleanup") and os.path.exists(job["video_path"]):
+                os.unlink(job["video_path"])
+
+    async def start(self):
+        """Start the worker tasks"""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Started {self.workers} job workers")
+
+    async def stop(self):
+        """Cancel the worker tasks"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, index):
+        while True:
+            job = await self.queue.get()
+            renewal = asyncio.create_task(self._renew_claim(job))
+            try:
+                await self.run(job)
+            except Exception as e:
+                logger.error(f"Job worker {index} failed on {job.get('job_id')}: {e}")
+            finally:
+                renewal.cancel()
+                await asyncio.gather(renewal, return_exceptions=True)
+            await self.queue.ack(job)
+
+    async def _renew_claim(self, job):
+        # Keep the claim alive while the job runs, so it is only redelivered if this worker dies
+        while True:
+            await asyncio.sleep(JOB_VISIBILITY_TIMEOUT / 3)
+            try:
+                await self.queue.renew(job)
+            except Exception as e:
+                logger.warning(f"Failed to renew the claim on job {job.get('job_id')}: {e}")
+
+    async def run(self, job):
+        """
+        Run the pipeline of a job, recording outputs and failures on its result
+
+        Args:
+            job: Job dict taken from the queue
+
+        Returns:
+            VideoAnalysisResult: The job's final result
+        """
+        result = self.results.get(job["job_id"])
+        if result is None:
+            # Jobs from a persistent queue may outlive the process that submitted them
+            result = VideoAnalysisResult(id=job["job_id"], video_url=job["video_url"],
+                                         content_hash=job.get("content_hash"))
+            self.results[result.id] = result
+
+        video_path = job["video_path"]
+        result.status = "processing"
+        running = []
+        finished = set()
+
+        def on_start(stage):
+            running.append(stage)
+            result.stage = ", ".join(running)
+
+        def on_finish(stage, seconds, output):
+            # Only checkpoint outputs that fit the result, so a resume never loads one that does not
+            try:
+                self._apply_output(result, stage, output)
+            except Exception as e:
+                raise StageError(stage, e) from e
+            self.checkpoints.save(result.id, stage, output)
+            running.remove(stage)
+            result.stage = ", ".join(running) or None
+            result.stage_timings[stage] = round(seconds, 3)
+            finished.add(stage)
+            result.progress = len(finished) / len(self.pipeline.stages)
+
+        try:
+            # Start from the stages completed by earlier attempts
+            completed = {
+                stage: output for stage, output in self.checkpoints.load(result.id).items()
+                if stage in self.pipeline.stages
+            }
+            for stage, output in completed.items():
+                try:
+                    self._apply_output(result, stage, output)
+                except Exception as e:
+                    # Drop the unusable checkpoint so resuming runs the stage again
+                    self.checkpoints.delete(result.id, {stage} | self.pipeline.dependents(stage))
+                    raise StageError(stage, e) from e
+            finished.update(completed)
+            result.progress = len(finished) / len(self.pipeline.stages)
+
+            await self.pipeline.run({"video_path": video_path, "result": result}, outputs=completed,
+                                    on_start=on_start, on_finish=on_finish)
+            result.stage = None
+            result.progress = 1.0
+            result.status = "completed"
+            if result.content_hash is not None:
+                self.results_store.put(result.content_hash, result)
+            self.checkpoints.delete(result.id)
+        except StageError as e:
+            logger.error(f"Job {result.id} failed: {e}")
+            result.stage = e.stage
+            result.status = "failed"
+            result.error = str(e.error)
+        except Exception as e:
+            logger.error(f"Job {result.id} failed: {e}")
+            result.status = "failed"
+            result.error = str(e)
+        finally:
+            if result.content_hash is not None:
+                self._in_flight.pop(result.content_hash, None)
+            # Failed jobs keep their video so they can be resumed
+            if job.get("cleanup") and result.status == "completed" and os.path.exists(video_path):
+                os.unlink(video_path)
+            self._evict_finished()
+
+        return result
+
+    def _apply_output(self, result, stage, output):
+        if isinstance(output, FrameResults):
+            # Kept columnar, VideoAnalysisResult converts it when a response is serialized
+            setattr(result, stage, output)
+        elif stage in STAGE_RESULTS:
+            setattr(result, stage, STAGE_RESULTS[stage].model_validate(output))
+
+
+# Process-wide job manager, created on first use
+_job_manager = None
+
+
+def get_job_manager():
+    """Get the process-wide job manager"""
+    global _job_manager
+
+    if _job_manager is None:
+        _job_manager = JobManager()
+    return _job_manager
@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("llm_cache")
+
+# SQLite file holding cached LLM responses, next to the other stores rather than in the working directory
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "qa-ai-llm-cache.sqlite3"))
+
+# Eviction policy: entries older than the TTL (0 = never) and beyond the size limit are dropped
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+# Skip cache lookups (responses are still stored) when set
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "0") == "1"
+
+
+def _normalize(value):
+    # Whitespace-only differences in prompt inputs must not change the key
+    if isinstance(value, str):
+        return "\n".join(line.rstrip() for line in value.strip().splitlines())
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def prompt_cache_key(model_name, temperature, template, inputs):
+    """
+    Build the cache key of an LLM call
+
+    Args:
+        model_name: Name of the LLM model
+        temperature: Sampling temperature
+        template: Prompt template text
+        inputs: Dict of template input values
+
+    Returns:
+        str: Hex digest identifying the call
+    """
+    payload = json.dumps({
+        "model": model_name,
+        "temperature": temperature,
+        "template": template,
+        "inputs": _normalize(inputs)
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Persistent cache of LLM responses keyed by model, temperature, template and inputs"""
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS, max_entries=LLM_CACHE_MAX_ENTRIES,
+                 bypass=LLM_CACHE_BYPASS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.bypass = bypass
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache "
+            "(key TEXT PRIMARY KEY, response TEXT NOT NULL, stored REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def get(self, key, bypass=None):
+        """
+        Look up a cached response
+
+        Args:
+            key: Key from prompt_cache_key
+            bypass: Override of the cache's bypass flag for this call
+
+        Returns:
+            str: The cached response, or None on a miss or when bypassed
+        """
+        if self.bypass if bypass is None else bypass:
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute("SELECT response, stored FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds > 0 and now - row[1] > self.ttl_seconds:
+                self._connection.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._connection.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._connection.execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (now, key))
+            self._connection.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, response):
+        """
+        Store a response, evicting expired and least recently used entries
+
+        Args:
+            key: Key from prompt_cache_key
+            response: Raw LLM response text
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, stored, accessed) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            if self.ttl_seconds > 0:
+                self._connection.execute("DELETE FROM llm_cache WHERE stored < ?", (now - self.ttl_seconds,))
+            self._connection.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._connection.commit()
+
+    def invalidate(self, key):
+        """Remove a cached response, e.g. one that could not be parsed"""
+        with self._lock:
+            self._connection.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._connection.commit()
+
+    def stats(self):
+        """
+        Get hit-rate metrics
+
+        Returns:
+            dict: Hit and miss counts and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# Process-wide cache, created on first use
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Get the process-wide LLM response cache"""
+    global _llm_cache
+
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache()
+        return _llm_cache
+
+
+async def run_cached_completion(service, prompt, inputs, parse, cache=None, bypass=None):
+    """
+    Get a prompt completion through the response cache
+
+    Only responses that parse successfully are stored, and a cached response that
+    no longer parses is dropped and fetched again.
+
+    Args:
+        service: LLMService running the prompt on a miss
+        prompt: PromptTemplate to fill
+        inputs: Dict of prompt input values
+        parse: Function turning the raw response into the caller's result
+        cache: Optional LLMResponseCache
+        bypass: Override of the cache's bypass flag for this call
+
+    Returns:
+        The parsed response
+    """
+    if cache is None:
+        return parse(await service.complete(prompt, inputs))
+
+    key = prompt_cache_key(service.model_name, service.temperature, prompt.template, inputs)
+
+    cached = cache.get(key, bypass=bypass)
+    if cached is not None:
+        try:
+            return parse(cached)
+        except Exception as e:
+            logger.warning(f"Dropping unparseable cached LLM response: {e}")
+            cache.invalidate(key)
+
+    response = await service.complete(prompt, inputs)
+    result = parse(response)
+    cache.put(key, response)
+    return result
@@ -0,0 +1,240 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("llm_service")
+
+# LLM setup
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Optional OpenAI-compatible endpoint, e.g. a proxy or a local stub server
+LLM_API_BASE = os.getenv("LLM_API_BASE", "")
+
+# Completion model and sampling temperature shared by all prompts
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-3.5-turbo-instruct")
+LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.2"))
+
+# Tokens reserved for each completion, out of the model's context window
+LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "1024"))
+
+# Context window of the model in tokens, 0 looks it up in MODEL_CONTEXT_TOKENS
+LLM_CONTEXT_TOKENS = int(os.getenv("LLM_CONTEXT_TOKENS", "0"))
+
+# Context windows of known completion models, others are assumed to have the smallest
+MODEL_CONTEXT_TOKENS = {
+    "gpt-3.5-turbo-instruct": 4096,
+    "davinci-002": 16384,
+    "babbage-002": 16384,
+}
+DEFAULT_CONTEXT_TOKENS = 4096
+
+# Maximum number of LLM requests in flight across the whole process
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+
+# Retries of failed requests, waiting LLM_RETRY_BACKOFF_SECONDS * 2^attempt (plus jitter) in between
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "1.0"))
+LLM_RETRY_MAX_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_MAX_BACKOFF_SECONDS", "30"))
+
+# Seconds before a single request times out
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "120"))
+
+# Client errors that will not succeed on retry (timeouts, conflicts and rate limits will)
+NON_RETRYABLE_STATUS = set(range(400, 500)) - {408, 409, 429}
+
+
+class LLMService:
+    """Process-wide gateway for LLM completions
+
+    One LLM client is reused for every call so its HTTP connections are kept alive,
+    requests from all callers share one concurrency limit, failed requests are
+    retried with exponential backoff, and latency and token usage are accounted.
+
+    The client and limiter belong to the event loop of the first call. Calls from
+    other loops (e.g. stages on executor threads) are run on that loop, and a new
+    client is created if it has been closed.
+    """
+
+    def __init__(self, llm=None, max_concurrency=LLM_MAX_CONCURRENCY, max_retries=LLM_MAX_RETRIES,
+                 backoff_seconds=LLM_RETRY_BACKOFF_SECONDS, max_backoff_seconds=LLM_RETRY_MAX_BACKOFF_SECONDS):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+        self._injected_llm = llm
+        self._llm = None
+        self._loop = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+        self._stats = {
+            "calls": 0,
+            "failures": 0,
+            "retries": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_seconds": 0.0
+        }
+
+        if llm is None and not OPENAI_API_KEY:
+            logger.warning("OpenAI API key not found. LLM calls will not work.")
+
+    @property
+    def available(self):
+        """Whether an LLM is configured"""
+        return self._injected_llm is not None or bool(OPENAI_API_KEY)
+
+    @property
+    def model_name(self):
+        if self._injected_llm is None:
+            return LLM_MODEL
+        return getattr(self._injected_llm, "model_name", type(self._injected_llm).__name__)
+
+    @property
+    def temperature(self):
+        return getattr(self._injected_llm, "temperature", LLM_TEMPERATURE)
+
+    @property
+    def max_tokens(self):
+        """Tokens reserved for a completion"""
+        return getattr(self._injected_llm, "max_tokens", LLM_MAX_TOKENS)
+
+    @property
+    def context_tokens(self):
+        """Tokens the model reads and writes per request"""
+        return LLM_CONTEXT_TOKENS or MODEL_CONTEXT_TOKENS.get(self.model_name, DEFAULT_CONTEXT_TOKENS)
+
+    def _create_llm(self):
+        if self._injected_llm is not None:
+            return self._injected_llm
+
+        from langchain.llms import OpenAI
+
+        # Retries are handled here so they share the backoff policy and accounting
+        return OpenAI(
+            model_name=LLM_MODEL,
+            temperature=LLM_TEMPERATURE,
+            max_tokens=LLM_MAX_TOKENS,
+            api_key=OPENAI_API_KEY,
+            openai_api_base=LLM_API_BASE or None,
+            max_retries=0,
+            request_timeout=LLM_REQUEST_TIMEOUT
+        )
+
+    def _bind(self, loop):
+        # Attach the client and limiter to a loop, replacing those of a loop that stopped
+        with self._lock:
+            if self._loop is None or self._loop.is_closed() or not self._loop.is_running():
+                self._loop = loop
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._llm = self._create_llm()
+            return self._loop
+
+    def _retryable(self, error):
+        status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+        return status not in NON_RETRYABLE_STATUS
+
+    async def complete(self, prompt, inputs):
+        """
+        Fill a prompt template and get its completion
+
+        Args:
+            prompt: PromptTemplate to format
+            inputs: Dict of template input values
+
+        Returns:
+            str: The completion text
+        """
+        if not self.available:
+            raise RuntimeError("LLM not initialized. Check OpenAI API key.")
+
+        loop = asyncio.get_running_loop()
+        owner = self._bind(loop)
+        if owner is not loop:
+            future = asyncio.run_coroutine_threadsafe(self._complete(prompt.format(**inputs)), owner)
+            return await asyncio.wrap_future(future)
+        return await self._complete(prompt.format(**inputs))
+
+    async def _complete(self, text):
+        # The semaphore is held only while a request is in flight, so a call backing
+        # off after a rate limit does not keep other calls waiting
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                started = time.perf_counter()
+                try:
+                    result = await self._llm.agenerate([text])
+                    error = None
+                except Exception as e:
+                    error = e
+                elapsed = time.perf_counter() - started
+            
+            if error is None:
+                usage = (result.llm_output or {}).get("token_usage", {})
+                self._record(elapsed, usage=usage)
+                logger.info(
+                    f"LLM request took {elapsed:.2f}s, {usage.get('prompt_tokens', 0)} prompt and "
+                    f"{usage.get('completion_tokens', 0)} completion tokens"
+                )
+                return result.generations[0][0].text
+            
+            if attempt >= self.max_retries or not self._retryable(error):
+                self._record(elapsed, failed=True)
+                logger.error(f"LLM request failed after {attempt + 1} attempts: {error}")
+                raise error
+            
+            delay = min(self.backoff_seconds * 2 ** attempt, self.max_backoff_seconds)
+            delay *= random.uniform(0.5, 1.0)
+            logger.warning(f"LLM request failed ({error}), retrying in {delay:.1f}s")
+            self._record(elapsed, retried=True)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _record(self, seconds, usage=None, failed=False, retried=False):
+        with self._lock:
+            self._stats["total_seconds"] += seconds
+            if retried:
+                self._stats["retries"] += 1
+                return
+            self._stats["calls"] += 1
+            if failed:
+                self._stats["failures"] += 1
+            for name in ("prompt_tokens", "completion_tokens"):
+                self._stats[name] += (usage or {}).get(name, 0)
+
+    def stats(self):
+        """
+        Get latency and token accounting of all calls so far
+
+        Returns:
+            dict: Call, failure and retry counts, token totals and latency in seconds
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["average_seconds"] = stats["total_seconds"] / stats["calls"] if stats["calls"] else 0.0
+        return stats
+
+
+# Process-wide service, created on first use
+_llm_service = None
+_llm_service_lock = threading.Lock()
+
+
+def get_llm_service():
+    """Get the process-wide LLM service"""
+    global _llm_service
+
+    with _llm_service_lock:
+        if _llm_service is None:
+            _llm_service = LLMService()
+        return _llm_service
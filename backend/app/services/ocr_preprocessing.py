@@ -0,0 +1,340 @@
+import os
+import sys
+import time
+import logging
+import threading
+import cv2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from app.services.ocr_backends import OCR_BACKEND, get_ocr_backend
+from app.services.spatial_index import GridIndex
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("ocr_preprocessing")
+
+# Resize frames so their text is normalized to a resolution-independent size before OCR.
+# Off until it is benchmarked against full-frame OCR with Tesseract.
+OCR_ADAPTIVE_PREPROCESSING = os.getenv("OCR_ADAPTIVE_PREPROCESSING", "0") == "1"
+
+# Text x-height in pixels that frames are resized to, near what Tesseract reads best
+OCR_TARGET_X_HEIGHT = float(os.getenv("OCR_TARGET_X_HEIGHT", "20"))
+
+# Limits of the resize factor, so a bad x-height estimate cannot blow a frame up or erase it
+OCR_MIN_SCALE = float(os.getenv("OCR_MIN_SCALE", "0.35"))
+OCR_MAX_SCALE = float(os.getenv("OCR_MAX_SCALE", "2.5"))
+
+# Frames are never upscaled past this many pixels, so frames of 1080p or more keep their size
+OCR_MAX_UPSCALED_PIXELS = int(os.getenv("OCR_MAX_UPSCALED_PIXELS", str(1920 * 1080)))
+
+# Resize factors this close to 1 are not applied
+OCR_SCALE_TOLERANCE = 0.15
+
+# Normalized frames longer than this many pixels on a side are split into tiles
+OCR_TILE_SIZE = int(os.getenv("OCR_TILE_SIZE", "1600"))
+
+# Overlap in pixels between neighbouring tiles, a few text lines so every word is whole in some tile
+OCR_TILE_OVERLAP = int(os.getenv("OCR_TILE_OVERLAP", "96"))
+
+# Threads OCR'ing the tiles of one frame. Frames are already spread over the analysis
+# workers, so raise this when there are more cores than workers. With one thread
+# frames are not tiled, as OCR'ing tiles one after another is no faster.
+OCR_TILE_WORKERS = int(os.getenv("OCR_TILE_WORKERS", "1"))
+
+# Words from different tiles overlapping by more than this fraction of the smaller box are duplicates
+OCR_SEAM_OVERLAP = 0.5
+
+# Connected components of this height range and shape are counted as glyphs
+GLYPH_MIN_HEIGHT = 4
+GLYPH_MAX_HEIGHT = 200
+GLYPH_MIN_COUNT = 10
+
+
+def binarize(gray):
+    """Blur and Otsu-threshold a grayscale image into the binary image passed to the OCR engine"""
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+    _, binary = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    return binary
+
+
+def _glyph_heights(binary):
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    widths, heights = stats[1:, cv2.CC_STAT_WIDTH], stats[1:, cv2.CC_STAT_HEIGHT]
+    glyphs = ((heights >= GLYPH_MIN_HEIGHT) & (heights <= GLYPH_MAX_HEIGHT)
+              & (widths <= 2 * heights) & (heights <= 8 * widths))
+    return heights[glyphs]
+
+
+def estimate_x_height(gray):
+    """
+    Estimate the x-height of the text in a grayscale image
+
+    The image is thresholded both ways round, so dark and light themes both work,
+    and the median height of glyph-sized connected components is taken. Lowercase
+    letters dominate UI text, so the median lands close to the x-height.
+
+    Args:
+        gray: Grayscale image as numpy array
+
+    Returns:
+        float: Estimated x-height in pixels, or None if too few glyphs were found
+    """
+    _, dark_text = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    heights = _glyph_heights(dark_text)
+    if len(heights) < GLYPH_MIN_COUNT:
+        heights = _glyph_heights(cv2.bitwise_not(dark_text))
+    if len(heights) < GLYPH_MIN_COUNT:
+        return None
+    return float(np.median(heights))
+
+
+def ocr_scale(gray, target_x_height=OCR_TARGET_X_HEIGHT, min_scale=OCR_MIN_SCALE, max_scale=OCR_MAX_SCALE,
+              max_pixels=OCR_MAX_UPSCALED_PIXELS, default=1.0):
+    """
+    Get the resize factor that brings the text of an image to the target x-height
+
+    Args:
+        gray: Grayscale image as numpy array
+        target_x_height: Wanted x-height in pixels
+        min_scale: Smallest resize factor
+        max_scale: Largest resize factor
+        max_pixels: Pixel count an upscaled image may not exceed
+        default: Value returned when no text was found
+
+    Returns:
+        float: Resize factor, 1.0 when the text is already close to the target
+    """
+    x_height = estimate_x_height(gray)
+    if x_height is None:
+        return default
+    scale = min(max_scale, max(min_scale, target_x_height / x_height))
+    if scale > 1.0:
+        height, width = gray.shape[:2]
+        scale = min(scale, max(1.0, (max_pixels / (width * height)) ** 0.5))
+    return 1.0 if abs(scale - 1.0) <= OCR_SCALE_TOLERANCE else scale
+
+
+def _tile_starts(length, tile_size, overlap):
+    if length <= tile_size:
+        return [0]
+    step = max(1, tile_size - overlap)
+    return list(range(0, length - tile_size, step)) + [length - tile_size]
+
+
+def tile_grid(width, height, tile_size=OCR_TILE_SIZE, overlap=OCR_TILE_OVERLAP):
+    """
+    Split an image into overlapping tiles
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        tile_size: Maximum tile side in pixels
+        overlap: Overlap in pixels between neighbouring tiles
+
+    Returns:
+        list: (x, y, width, height) tiles covering the image, one tile if it is small enough
+    """
+    return [
+        (x, y, min(tile_size, width), min(tile_size, height))
+        for y in _tile_starts(height, tile_size, overlap)
+        for x in _tile_starts(width, tile_size, overlap)
+    ]
+
+
+def _tile_words(backend_name, binary, tile, index):
+    x, y, w, h = tile
+    image_height, image_width = binary.shape[:2]
+    data = get_ocr_backend(backend_name).image_to_data(np.ascontiguousarray(binary[y:y + h, x:x + w]))
+
+    words = []
+    for i in range(len(data["text"])):
+        if not str(data["text"][i]).strip():
+            continue
+        left, top, width, height = data["left"][i], data["top"][i], data["width"][i], data["height"][i]
+
+        # A word touching a tile edge inside the image may be cut in half
+        clipped = ((left <= 1 and x > 0) or (top <= 1 and y > 0)
+                   or (left + width >= w - 1 and x + w < image_width)
+                   or (top + height >= h - 1 and y + h < image_height))
+        words.append({
+            "text": data["text"][i],
+            "conf": data["conf"][i],
+            "box": (x + left, y + top, width, height),
+            "tile": index,
+            "clipped": clipped
+        })
+    return words
+
+
+def _overlap_fraction(a, b):
+    width = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    height = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    return width * height / max(1, min(a[2] * a[3], b[2] * b[3]))
+
+
+def merge_tile_words(words, overlap=OCR_SEAM_OVERLAP):
+    """
+    Remove the duplicate words read twice where tiles overlap
+
+    Whole words are preferred over words cut by a tile edge, then higher confidence.
+    A word is dropped when it overlaps an already kept word from another tile.
+
+    Args:
+        words: Word dicts from all tiles, with box, conf, tile and clipped
+        overlap: Overlap fraction of the smaller box above which two words are the same
+
+    Returns:
+        list: The kept words in reading order
+    """
+    index = GridIndex()
+    kept = []
+    for word in sorted(words, key=lambda word: (word["clipped"], -float(word["conf"]))):
+        duplicate = any(
+            kept[key]["tile"] != word["tile"] and _overlap_fraction(kept[key]["box"], word["box"]) > overlap
+            for key in index.query(word["box"])
+        )
+        if not duplicate:
+            index.insert(len(kept), word["box"])
+            kept.append(word)
+    return sorted(kept, key=lambda word: (word["box"][1], word["box"][0]))
+
+
+# Process-wide pool OCR'ing tiles, created on first use
+_tile_executor = None
+_tile_executor_lock = threading.Lock()
+
+
+def get_tile_executor(workers=OCR_TILE_WORKERS):
+    """Get the shared thread pool OCR'ing tiles, or None when tiles are OCR'd in the calling thread"""
+    global _tile_executor
+
+    if workers <= 1:
+        return None
+    with _tile_executor_lock:
+        if _tile_executor is None:
+            _tile_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-tile")
+        return _tile_executor
+
+
+def adaptive_image_to_data(frame, backend_name=OCR_BACKEND, scale=None, tile_size=OCR_TILE_SIZE,
+                           overlap=OCR_TILE_OVERLAP, workers=OCR_TILE_WORKERS):
+    """
+    OCR a frame after normalizing its text size, in overlapping tiles if it is large
+
+    The frame is resized to the target x-height and binarized. When tile workers
+    are configured, large results are OCR'd in parallel tiles and the words read
+    twice at tile seams are merged. Boxes are mapped back to frame coordinates.
+
+    Args:
+        frame: Frame image as numpy array
+        backend_name: OCR backend name
+        scale: Resize factor, None estimates it from the frame
+        tile_size: Maximum tile side in pixels of the normalized frame
+        overlap: Overlap in pixels between neighbouring tiles
+        workers: Number of threads OCR'ing the tiles
+
+    Returns:
+        dict: Words in the image_to_data layout, with positions in frame coordinates
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    if scale is None:
+        scale = ocr_scale(gray)
+    if scale != 1.0:
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=interpolation)
+    binary = binarize(gray)
+
+    if workers > 1:
+        tiles = tile_grid(binary.shape[1], binary.shape[0], tile_size, overlap)
+    else:
+        tiles = [(0, 0, binary.shape[1], binary.shape[0])]
+    executor = get_tile_executor(workers) if len(tiles) > 1 else None
+    if executor is None:
+        tile_words = [_tile_words(backend_name, binary, tile, i) for i, tile in enumerate(tiles)]
+    else:
+        futures = [executor.submit(_tile_words, backend_name, binary, tile, i) for i, tile in enumerate(tiles)]
+        tile_words = [future.result() for future in futures]
+
+    words = [word for words in tile_words for word in words]
+    if len(tiles) > 1:
+        words = merge_tile_words(words)
+
+    height, width = frame.shape[:2]
+    data = {"text": [], "conf": [], "left": [], "top": [], "width": [], "height": []}
+    for word in words:
+        x, y, w, h = word["box"]
+        left, top = min(width, int(round(x / scale))), min(height, int(round(y / scale)))
+        right, bottom = min(width, int(round((x + w) / scale))), min(height, int(round((y + h) / scale)))
+        data["text"].append(word["text"])
+        data["conf"].append(word["conf"])
+        data["left"].append(left)
+        data["top"].append(top)
+        data["width"].append(right - left)
+        data["height"].append(bottom - top)
+    return data
+
+
+def _full_frame_image_to_data(frame, backend_name=OCR_BACKEND):
+    # Reference path: the whole frame at its own resolution
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return get_ocr_backend(backend_name).image_to_data(binarize(gray))
+
+
+def benchmark_ocr_preprocessing(frames, configs=None, backend_name=OCR_BACKEND, repeat=1):
+    """
+    Compare full-frame OCR with adaptive preprocessing under several settings
+
+    Args:
+        frames: Frame images as numpy arrays
+        configs: Dict of name to adaptive_image_to_data keyword arguments
+        backend_name: OCR backend name
+        repeat: Number of passes over the frames per configuration
+
+    Returns:
+        dict: Per-configuration ms per frame and words found, plus the full-frame baseline
+    """
+    if configs is None:
+        workers = max(2, os.cpu_count() or 1)
+        configs = {
+            "adaptive": {},
+            "adaptive_parallel": {"workers": workers},
+            "adaptive_parallel_tiles_800": {"tile_size": 800, "workers": workers},
+        }
+
+    runs = {"full_frame": lambda frame: _full_frame_image_to_data(frame, backend_name)}
+    for name, options in configs.items():
+        runs[name] = lambda frame, options=options: adaptive_image_to_data(frame, backend_name, **options)
+
+    report = {}
+    for name, run in runs.items():
+        words = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            words = 0
+            for frame in frames:
+                data = run(frame)
+                words += sum(1 for text in data["text"] if str(text).strip())
+        elapsed = time.perf_counter() - start
+        report[name] = {
+            "ms_per_frame": round(elapsed * 1000 / max(1, repeat * len(frames)), 2),
+            "words": words
+        }
+    return report
+
+
+if __name__ == "__main__":
+    # Usage: python -m app.services.ocr_preprocessing [frames] [upscale]
+    from app.services.ui_elements import synthetic_ui_frame
+
+    frame_count = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    upscale = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+
+    # Upscaled synthetic screenshots stand in for Retina/4K captures
+    frames = [
+        cv2.resize(synthetic_ui_frame(seed), None, fx=upscale, fy=upscale, interpolation=cv2.INTER_CUBIC)
+        for seed in range(frame_count)
+    ]
+    for name, stats in benchmark_ocr_preprocessing(frames).items():
+        print(f"{name}: {stats}")
@@ -0,0 +1,187 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("pipeline")
+
+# Threads per named stage executor
+STAGE_EXECUTOR_WORKERS = int(os.getenv("STAGE_EXECUTOR_WORKERS", "2"))
+
+# Seconds between checks of whether a stage running on an executor was cancelled
+STAGE_CANCEL_POLL_SECONDS = 0.1
+
+
+class StageError(Exception):
+    """Raised when a pipeline stage fails, carrying the stage name"""
+
+    def __init__(self, stage, error):
+        super().__init__(f"Stage {stage} failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class Stage:
+    """A named step of a pipeline graph
+
+    The stage function is awaited with a dict of its dependencies' outputs and the
+    run context. Stages naming an executor run on their own event loop in that
+    executor's threads, so blocking work in one stage does not hold up the others.
+    When the run is cancelled, such a stage is cancelled at its next await; work
+    it has already handed to a thread or process runs to completion.
+    """
+
+    def __init__(self, name, func, depends_on=(), executor=None):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.executor = executor
+
+
+# Process-wide named executors, created on first use
+_stage_executors = {}
+_stage_executors_lock = threading.Lock()
+
+
+def get_stage_executor(name):
+    """Get the shared thread pool of a named stage executor"""
+    with _stage_executors_lock:
+        if name not in _stage_executors:
+            _stage_executors[name] = ThreadPoolExecutor(
+                max_workers=STAGE_EXECUTOR_WORKERS, thread_name_prefix=f"stage-{name}"
+            )
+        return _stage_executors[name]
+
+
+async def _run_until_cancelled(func, inputs, context, cancelled):
+    # The caller's cancellation cannot reach a stage on another thread's loop, so the
+    # stage task is cancelled from its own loop once the run sets the event
+    task = asyncio.ensure_future(func(inputs, context))
+    while True:
+        done, _ = await asyncio.wait([task], timeout=STAGE_CANCEL_POLL_SECONDS)
+        if done:
+            return task.result()
+        if cancelled.is_set():
+            task.cancel()
+            return await task
+
+
+class StageGraph:
+    """Declarative DAG of stages, run with maximum concurrency
+
+    Every stage starts as soon as all of its dependencies have finished, so adding a
+    stage only requires declaring what it depends on.
+    """
+
+    def __init__(self, stages):
+        self.stages = {stage.name: stage for stage in stages}
+
+        for stage in stages:
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dependency}")
+        self.order = self._topological_order()
+
+    def dependents(self, name):
+        """Get the names of all stages that directly or transitively depend on a stage"""
+        found = set()
+        pending = [name]
+        while pending:
+            current = pending.pop()
+            for stage in self.stages.values():
+                if current in stage.depends_on and stage.name not in found:
+                    found.add(stage.name)
+                    pending.append(stage.name)
+        return found
+
+    def _topological_order(self):
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a dependency cycle through {name}")
+            visiting.add(name)
+            for dependency in self.stages[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    async def _run_stage(self, stage, inputs, context, cancelled):
+        if stage.executor is None:
+            return await stage.func(inputs, context)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_stage_executor(stage.executor),
+            lambda: asyncio.run(_run_until_cancelled(stage.func, inputs, context, cancelled))
+        )
+
+    async def run(self, context, outputs=None, on_start=None, on_finish=None):
+        """
+        Run all stages, each as soon as its dependencies are done
+
+        When a stage fails or the run is cancelled, the stages still running are
+        cancelled, including those on executors.
+
+        Args:
+            context: Object passed to every stage function
+            outputs: Optional outputs of stages that already completed, which are skipped
+            on_start: Optional callback(stage_name) when a stage starts
+            on_finish: Optional callback(stage_name, seconds, output) when a stage completes
+
+        Returns:
+            tuple: Outputs keyed by stage name and stage durations in seconds
+        """
+        outputs = dict(outputs or {})
+        timings = {}
+        running = {}
+        cancelled = threading.Event()
+
+        try:
+            while len(outputs) < len(self.stages):
+                for name in self.order:
+                    stage = self.stages[name]
+                    if name in outputs or name in running:
+                        continue
+                    if all(dependency in outputs for dependency in stage.depends_on):
+                        inputs = {dependency: outputs[dependency] for dependency in stage.depends_on}
+                        if on_start is not None:
+                            on_start(name)
+                        task = asyncio.create_task(self._run_stage(stage, inputs, context, cancelled))
+                        running[name] = (task, time.perf_counter())
+
+                if not running:
+                    raise RuntimeError("Pipeline cannot make progress")
+
+                done, _ = await asyncio.wait(
+                    [task for task, _ in running.values()], return_when=asyncio.FIRST_COMPLETED
+                )
+                for name, (task, started) in list(running.items()):
+                    if task not in done:
+                        continue
+                    del running[name]
+                    if task.exception() is not None:
+                        raise StageError(name, task.exception()) from task.exception()
+
+                    outputs[name] = task.result()
+                    timings[name] = time.perf_counter() - started
+                    logger.info(f"Stage {name} finished in {timings[name]:.2f}s")
+                    if on_finish is not None:
+                        on_finish(name, timings[name], outputs[name])
+        finally:
+            cancelled.set()
+            for task, _ in running.values():
+                task.cancel()
+
+        return outputs, timings
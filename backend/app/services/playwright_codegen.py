@@ -0,0 +1,255 @@
+import re
+import logging
+import textwrap
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("playwright_codegen")
+
+INDENT = "  "
+
+# Targets that describe more than one element are left to the LLM
+MAX_TARGET_WORDS = 5
+
+# Role of the element a click names, e.g. "Click the Save button"
+CLICK_ROLES = {
+    "button": "button",
+    "link": "link",
+    "tab": "tab",
+    "checkbox": "checkbox",
+    "menu item": "menuitem",
+    "option": "option",
+}
+
+# Playwright names of keys a step may press, e.g. "Press Enter" or "Hit the Escape key"
+KEYS = {
+    "enter": "Enter",
+    "return": "Enter",
+    "escape": "Escape",
+    "esc": "Escape",
+    "tab": "Tab",
+    "backspace": "Backspace",
+    "delete": "Delete",
+    "del": "Delete",
+    "space": "Space",
+    "spacebar": "Space",
+    "home": "Home",
+    "end": "End",
+    "page up": "PageUp",
+    "page down": "PageDown",
+    "up arrow": "ArrowUp",
+    "down arrow": "ArrowDown",
+    "left arrow": "ArrowLeft",
+    "right arrow": "ArrowRight",
+    "arrow up": "ArrowUp",
+    "arrow down": "ArrowDown",
+    "arrow left": "ArrowLeft",
+    "arrow right": "ArrowRight",
+}
+
+# Modifiers of a key combination, e.g. "Press Ctrl+S"
+MODIFIERS = {
+    "ctrl": "Control",
+    "control": "Control",
+    "shift": "Shift",
+    "alt": "Alt",
+    "option": "Alt",
+    "cmd": "Meta",
+    "command": "Meta",
+    "meta": "Meta",
+}
+
+# Text in matching single or double quotes
+_QUOTED = r"(?P<q_{name}>['\"])(?P<{name}>.+?)(?P=q_{name})"
+
+NAVIGATE = re.compile(
+    r"^(?:navigate|go|open|visit|browse|load)\s+(?:to\s+)?(?:the\s+)?(?P<target>\S+|(?:home|main|start|landing)\s+page|app(?:lication)?|website|site)$",
+    re.IGNORECASE
+)
+CLICK = re.compile(
+    r"^(?:click|tap)\s+(?:on\s+)?(?:the\s+)?(?P<target>.+?)"
+    r"(?:\s+(?P<role>" + "|".join(CLICK_ROLES) + r"))?$",
+    re.IGNORECASE
+)
+FILL_VALUE_FIRST = re.compile(
+    r"^(?:enter|type|input|fill\s+in)\s+" + _QUOTED.format(name="value") +
+    r"\s+(?:in|into)\s+(?:the\s+)?(?P<target>.+?)(?:\s+(?:field|input|box|textbox|text\s+field))?$",
+    re.IGNORECASE
+)
+FILL_TARGET_FIRST = re.compile(
+    r"^(?:fill(?:\s+in)?|enter|set)\s+(?:the\s+)?(?P<target>.+?)(?:\s+(?:field|input|box|textbox|text\s+field))?"
+    r"\s+(?:with|to|as)\s+" + _QUOTED.format(name="value") + r"$",
+    re.IGNORECASE
+)
+PRESS_KEY = re.compile(
+    r"^(?:press|hit)\s+(?:the\s+)?(?P<modifiers>(?:(?:" + "|".join(MODIFIERS) + r")\s*\+\s*)*)"
+    r"(?P<key>" + "|".join(sorted(KEYS, key=len, reverse=True)) + r"|[a-z0-9])(?:\s+key)?$",
+    re.IGNORECASE
+)
+ASSERT_TEXT = re.compile(
+    r"^(?:verify|check|assert|confirm|ensure|expect|see)\s+(?:that\s+)?(?:the\s+)?(?:text\s+|message\s+)?" +
+    _QUOTED.format(name="text") + r"(?:\s+(?:is|are))?(?:\s+(?:displayed|visible|shown|present|appears))?$",
+    re.IGNORECASE
+)
+EXPECTED_TEXT = re.compile(
+    _QUOTED.format(name="text") + r"\s+(?:is\s+|are\s+)?(?:displayed|visible|shown|present|appears)",
+    re.IGNORECASE
+)
+
+
+def ts_string(value):
+    """Quote a value as a TypeScript string literal"""
+    escaped = value.replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n")
+    return f"'{escaped}'"
+
+
+def _clean_target(target):
+    target = target.strip().strip("'\"").strip()
+    if not target or len(target.split()) > MAX_TARGET_WORDS or re.search(r"\b(?:and|then)\b|[,;]", target):
+        return None
+    return target
+
+
+def _navigate_code(target, app_url):
+    if re.match(r"^https?://", target):
+        return f"await page.goto({ts_string(target)});"
+    if target.startswith("/"):
+        return f"await page.goto(new URL({ts_string(target)}, {ts_string(app_url)}).toString());"
+    if re.match(r"^(?:(?:home|main|start|landing)\s+page|app(?:lication)?|website|site)$", target, re.IGNORECASE):
+        return f"await page.goto({ts_string(app_url)});"
+    return None
+
+
+def _key_combination(match):
+    # Playwright key string of a PRESS_KEY match, single characters only with a modifier
+    modifiers = [MODIFIERS[name.lower()] for name in re.findall(r"\w+", match.group("modifiers"))]
+    key = match.group("key")
+    if key.lower() in KEYS:
+        key = KEYS[key.lower()]
+    elif not modifiers:
+        return None
+    return "+".join(modifiers + [key])
+
+
+def _normalize_quotes(text):
+    return text.replace("\u201c", '"').replace("\u201d", '"').replace("\u2018", "'").replace("\u2019", "'")
+
+
+def map_step(step, app_url):
+    """
+    Translate a recognized test step action into Playwright statements
+
+    Args:
+        step: Test step dict
+        app_url: URL of the app under test
+
+    Returns:
+        list: TypeScript statements, or None if the action is not recognized
+    """
+    action = _normalize_quotes(" ".join(str(step.get("action", "")).split()).rstrip("."))
+    lines = None
+
+    match = NAVIGATE.match(action)
+    if match and _clean_target(match.group("target")):
+        code = _navigate_code(_clean_target(match.group("target")), app_url)
+        lines = [code] if code else None
+
+    if lines is None:
+        match = FILL_VALUE_FIRST.match(action) or FILL_TARGET_FIRST.match(action)
+        if match and _clean_target(match.group("target")):
+            target = _clean_target(match.group("target"))
+            lines = [f"await page.getByLabel({ts_string(target)}).fill({ts_string(match.group('value'))});"]
+
+    if lines is None:
+        match = ASSERT_TEXT.match(action)
+        if match:
+            lines = [f"await expect(page.getByText({ts_string(match.group('text'))})).toBeVisible();"]
+
+    if lines is None:
+        match = PRESS_KEY.match(action)
+        if match and _key_combination(match):
+            lines = [f"await page.keyboard.press({ts_string(_key_combination(match))});"]
+
+    if lines is None:
+        match = CLICK.match(action)
+        if match and _clean_target(match.group("target")):
+            target = _clean_target(match.group("target"))
+            role = match.group("role")
+            if role:
+                locator = f"page.getByRole({ts_string(CLICK_ROLES[role.lower()])}, {{ name: {ts_string(target)} }})"
+            else:
+                locator = f"page.getByText({ts_string(target)})"
+            lines = [f"await {locator}.click();"]
+
+    if lines is None:
+        return None
+
+    expected = _normalize_quotes(step.get("expected_result") or "")
+    match = EXPECTED_TEXT.search(expected)
+    if match:
+        lines.append(f"await expect(page.getByText({ts_string(match.group('text'))})).toBeVisible();")
+    elif expected:
+        lines.append(f"// Expected: {' '.join(expected.split())}")
+    return lines
+
+
+def render_test(test_data, step_code):
+    """
+    Assemble a Playwright test file from per-step statements
+
+    Args:
+        test_data: Extracted test steps data
+        step_code: Dict of step number to its list of TypeScript statements
+
+    Returns:
+        str: Playwright test code
+    """
+    app_url = test_data.get("app_url") or "https://example.com"
+    steps = test_data.get("steps", [])
+
+    lines = [
+        "import { test, expect } from '@playwright/test';",
+        "",
+        "test.use({ screenshot: 'only-on-failure' });",
+        "",
+        f"test({ts_string(test_data.get('test_name') or 'Recorded test')}, async ({{ page }}) => {{",
+    ]
+
+    first = step_code.get(steps[0].get("step_number")) if steps else None
+    if not first or not first[0].startswith("await page.goto("):
+        lines.append(f"{INDENT}await page.goto({ts_string(app_url)});")
+
+    for step in steps:
+        lines.append("")
+        lines.append(f"{INDENT}// Step {step.get('step_number')}: {' '.join(str(step.get('action', '')).split())}")
+        for statement in step_code.get(step.get("step_number"), []):
+            lines.extend(f"{INDENT}{line}" if line else "" for line in statement.splitlines())
+
+    lines.append("});")
+    return "\n".join(lines) + "\n"
+
+
+def split_step_snippets(code, step_numbers):
+    """
+    Split generated statements at their "// Step N" marker comments
+
+    Args:
+        code: TypeScript statements for several steps
+        step_numbers: Step numbers the code must cover
+
+    Returns:
+        dict: Step number to its list of statements, or None if a step is missing
+    """
+    blocks = {}
+    current = None
+    for line in code.splitlines():
+        marker = re.match(r"^\s*//\s*Step\s+(\d+)\b", line)
+        if marker:
+            current = int(marker.group(1))
+            blocks[current] = []
+        elif current is not None and line.strip():
+            blocks[current].append(line.rstrip())
+
+    if any(number not in blocks for number in step_numbers):
+        return None
+    return {number: [textwrap.dedent("\n".join(lines))] for number, lines in blocks.items()}
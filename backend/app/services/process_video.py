@@ -1,6 +1,6 @@
 import os
-import tempfile
 from fastapi import UploadFile
+from app.services.ingest import ingest_upload
 
 async def process_video(file: UploadFile):
     """
@@ -13,12 +13,9 @@ async def process_video(file: UploadFile):
     Returns:
         dict: Analysis results from the video
     """
-    # Create a temporary file to store the uploaded video
-    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as temp:
-        # Read the uploaded file in chunks and write to the temporary file
-        content = await file.read()
-        temp.write(content)
-        temp_path = temp.name
+    # Stream the uploaded video to a temporary file in fixed-size chunks
+    upload = await ingest_upload(file)
+    temp_path = upload["spool_path"]
     
     try:
         # This is where you would implement video analysis logic
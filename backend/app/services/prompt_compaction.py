@@ -0,0 +1,270 @@
+import os
+import re
+import json
+import logging
+from functools import lru_cache
+from app.services.frame_results import FrameResults, iter_frame_dicts
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("prompt_compaction")
+
+# Token budget of the transcript and UI sections of a prompt, 0 derives it from the
+# model's context window minus the completion and the prompt template
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "0"))
+
+# Tokens kept free for estimation error
+PROMPT_TOKEN_MARGIN = 64
+
+# Budget used when none is given, which fits the default 4k model with its completion and template
+DEFAULT_PROMPT_TOKEN_BUDGET = 2500
+
+# Largest share of the budget the transcript may take, the UI data gets the rest
+PROMPT_TRANSCRIPT_SHARE = float(os.getenv("PROMPT_TRANSCRIPT_SHARE", "0.6"))
+
+# Contours smaller than this many pixels are dropped from prompts
+PROMPT_MIN_ELEMENT_AREA = int(os.getenv("PROMPT_MIN_ELEMENT_AREA", "400"))
+
+# Positions are rounded to this grid so jitter between frames does not defeat deduplication
+POSITION_GRID = 8
+
+# Without tiktoken, letter runs are counted as one token per this many characters and
+# digit runs as one per this many, while every other symbol is a token of its own, which
+# overestimates English a little and matches numeric markup like B@1040,520,96,32
+CHARS_PER_TOKEN = 4
+DIGITS_PER_TOKEN = 3
+_TOKEN_PIECES = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_")
+
+# Short codes of the element types kept in prompts, generic rectangles are dropped
+ELEMENT_CODES = {"button": "B", "text_field": "F"}
+
+UI_LEGEND = (
+    "One line per frame: mm:ss, then the elements first seen in that frame as "
+    "T\"text\", B (button) or F (text field) with @x,y,width,height in pixels."
+)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.info(f"tiktoken unavailable, estimating token counts conservatively: {e}")
+        return None
+
+
+def estimate_tokens(text):
+    """Count the LLM tokens of a text with tiktoken, or estimate them conservatively"""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+
+    tokens = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        if piece[0].isdigit():
+            tokens += -(-len(piece) // DIGITS_PER_TOKEN)
+        elif piece[0].isalpha():
+            tokens += -(-len(piece) // CHARS_PER_TOKEN)
+        else:
+            tokens += 1
+    return tokens
+
+
+def prompt_token_budget(service, template):
+    """
+    Get the tokens left for prompt inputs once the template and the completion fit
+
+    Args:
+        service: LLMService with the model's context_tokens and max_tokens
+        template: Prompt template text
+
+    Returns:
+        int: Token budget of the inputs
+    """
+    if PROMPT_TOKEN_BUDGET > 0:
+        return PROMPT_TOKEN_BUDGET
+    return max(0, service.context_tokens - service.max_tokens - estimate_tokens(template) - PROMPT_TOKEN_MARGIN)
+
+
+def _format_timestamp(seconds):
+    return f"{int(seconds // 60):02d}:{int(seconds % 60):02d}"
+
+
+def _snap(position):
+    return tuple(int(round(position[name] / POSITION_GRID)) * POSITION_GRID
+                 for name in ("x", "y", "width", "height"))
+
+
+def _inside(inner, outer):
+    x, y, w, h = inner
+    ox, oy, ow, oh = outer
+    return x >= ox and y >= oy and x + w <= ox + ow and y + h <= oy + oh
+
+
+def _frame_elements(frame, min_area):
+    # Text first, then the shape contours that are not just the outlines of that text
+    elements = []
+    text_boxes = []
+    for region in frame.get("text_regions", []):
+        text = region.get("text", "").strip()
+        if not any(char.isalnum() for char in text):
+            continue
+        box = _snap(region["position"])
+        text_boxes.append(box)
+        elements.append((f"T{json.dumps(text, ensure_ascii=False)}",) + box)
+
+    for element in frame.get("ui_elements", []):
+        code = ELEMENT_CODES.get(element.get("type"))
+        position = element["position"]
+        if code is None or position["width"] * position["height"] < min_area:
+            continue
+        box = _snap(position)
+        if any(_inside(box, text_box) for text_box in text_boxes):
+            continue
+        elements.append((code,) + box)
+
+    return list(dict.fromkeys(elements))
+
+
+def _encode_element(element):
+    code, x, y, w, h = element
+    return f"{code}@{x},{y},{w},{h}"
+
+
+def _speech_distance(timestamp, segments):
+    # Seconds between a frame and the closest transcript segment, 0 while someone speaks
+    if not segments:
+        return float("inf")
+    return min(
+        max(segment.get("start", 0.0) - timestamp, timestamp - segment.get("end", segment.get("start", 0.0)), 0.0)
+        for segment in segments
+    )
+
+
+def compact_transcript(transcript, token_budget=None):
+    """
+    Format a transcript for a prompt
+
+    The segments already contain the full text, so it is only included when there are
+    no segments. A transcript over the budget keeps its earliest segments and notes
+    how many were left out.
+
+    Args:
+        transcript: Transcript data from speech-to-text
+        token_budget: Optional number of tokens the transcript may use
+
+    Returns:
+        str: One timestamped line per segment
+    """
+    segments = transcript.get("segments", [])
+    if not segments:
+        text = transcript.get("full_text", "").strip()
+        if token_budget is not None and estimate_tokens(text) > token_budget:
+            text = text[:token_budget * CHARS_PER_TOKEN // 2].rsplit(" ", 1)[0] + " [...]"
+        return text
+
+    lines = [f"{segment.get('timestamp', '00:00')}: {segment.get('text', '').strip()}" for segment in segments]
+    if token_budget is None:
+        return "\n".join(lines)
+
+    # Leave room for the note on omitted segments
+    remaining = token_budget - estimate_tokens("[999 later segments omitted]")
+    kept = []
+    for line in lines:
+        cost = estimate_tokens(line + "\n")
+        if cost > remaining:
+            break
+        remaining -= cost
+        kept.append(line)
+
+    if len(kept) < len(lines):
+        logger.warning(f"Transcript over its {token_budget} token budget, omitting {len(lines) - len(kept)} segments")
+        kept.append(f"[{len(lines) - len(kept)} later segments omitted]")
+    return "\n".join(kept)
+
+
+def compact_ui_elements(ui_data, segments=(), token_budget=None, min_area=PROMPT_MIN_ELEMENT_AREA):
+    """
+    Encode UI analysis results for a prompt within a token budget
+
+    Every element is listed once, in the first kept frame showing it. Frames are kept
+    in order of their distance to the nearest transcript segment until the budget is
+    spent, and then written out in timestamp order.
+
+    Args:
+        ui_data: UI analysis data from analyze_video_ui, as a dict or FrameResults
+        segments: Transcript segments with start and end times in seconds
+        token_budget: Number of tokens the encoding may use, None for the default budget
+        min_area: Minimum area in pixels of shape elements to keep
+
+    Returns:
+        str: Compact line-per-frame encoding of the UI elements
+    """
+    if token_budget is None:
+        token_budget = PROMPT_TOKEN_BUDGET or DEFAULT_PROMPT_TOKEN_BUDGET
+    frames = list(iter_frame_dicts(ui_data, include_carried_forward=False))
+
+    candidates = []
+    for index, frame in enumerate(frames):
+        elements = _frame_elements(frame, min_area)
+        if elements:
+            timestamp = frame.get("timestamp", 0.0)
+            candidates.append((_speech_distance(timestamp, segments), timestamp, index, elements))
+
+    remaining = token_budget - estimate_tokens(UI_LEGEND)
+    seen = set()
+    kept = []
+    for distance, timestamp, index, elements in sorted(candidates, key=lambda candidate: candidate[:3]):
+        new = [element for element in elements if element not in seen]
+        if not new:
+            continue
+        cost = estimate_tokens(_format_timestamp(timestamp) + " " + " ".join(map(_encode_element, new)) + "\n")
+        if cost > remaining:
+            continue
+        remaining -= cost
+        seen.update(new)
+        kept.append((timestamp, index, elements))
+
+    # Assign each kept element to the earliest kept frame showing it
+    lines = [UI_LEGEND]
+    listed = set()
+    for timestamp, index, elements in sorted(kept, key=lambda frame: frame[:2]):
+        new = [element for element in elements if element not in listed]
+        if new:
+            listed.update(new)
+            lines.append(_format_timestamp(timestamp) + " " + " ".join(map(_encode_element, new)))
+
+    logger.info(
+        f"Compacted UI data of {len(frames)} frames to {len(lines) - 1} frames and {len(listed)} unique elements "
+        f"(~{token_budget - remaining} tokens)"
+    )
+    return "\n".join(lines)
+
+
+def compact_prompt_inputs(transcript, ui_data, token_budget=None):
+    """
+    Compact transcript and UI analysis data into prompt sections within a token budget
+
+    The transcript takes at most PROMPT_TRANSCRIPT_SHARE of the budget, and is cut
+    short beyond it, and the UI elements get the rest.
+
+    Args:
+        transcript: Transcript data from speech-to-text
+        ui_data: UI analysis data from analyze_video_ui, as a dict or FrameResults
+        token_budget: Number of tokens both sections may use, None for the default budget
+
+    Returns:
+        tuple: Formatted transcript and UI elements text
+    """
+    if token_budget is None:
+        token_budget = PROMPT_TOKEN_BUDGET or DEFAULT_PROMPT_TOKEN_BUDGET
+    formatted_transcript = compact_transcript(transcript, int(token_budget * PROMPT_TRANSCRIPT_SHARE))
+    ui_budget = token_budget - estimate_tokens(formatted_transcript)
+
+    if not isinstance(ui_data, FrameResults) and (not isinstance(ui_data, dict) or "results" not in ui_data):
+        return formatted_transcript, json.dumps(ui_data, separators=(",", ":"))
+
+    formatted_ui = compact_ui_elements(ui_data, transcript.get("segments", []), max(ui_budget, 0))
+    return formatted_transcript, formatted_ui
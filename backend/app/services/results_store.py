@@ -0,0 +1,142 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from app.models import VideoAnalysisResult
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("results_store")
+
+# Retention policy: completed results are kept for at most this many videos and seconds (0 = no age limit)
+RESULTS_STORE_MAX_ENTRIES = int(os.getenv("RESULTS_STORE_MAX_ENTRIES", "1000"))
+RESULTS_STORE_TTL_SECONDS = float(os.getenv("RESULTS_STORE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Optional SQLite file persisting results across restarts, empty keeps them in memory only
+RESULTS_STORE_PATH = os.getenv("RESULTS_STORE_PATH", "")
+
+
+class ResultsStore:
+    """Completed video analysis results keyed by the video's content hash
+
+    Entries are evicted least recently used first once there are more than
+    `max_entries`, and expire `ttl_seconds` after they were stored.
+    """
+
+    def __init__(self, max_entries=RESULTS_STORE_MAX_ENTRIES, ttl_seconds=RESULTS_STORE_TTL_SECONDS,
+                 path=RESULTS_STORE_PATH):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path or None
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+
+        if self.path is not None:
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_results "
+                "(content_hash TEXT PRIMARY KEY, result TEXT NOT NULL, stored REAL NOT NULL, accessed REAL NOT NULL, "
+                "job_id TEXT)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS analysis_results_job_id ON analysis_results (job_id)"
+            )
+            self._connection.commit()
+
+    def _expired(self, stored):
+        return self.ttl_seconds > 0 and time.time() - stored > self.ttl_seconds
+
+    def get(self, content_hash):
+        """
+        Look up the completed result of a video
+
+        Args:
+            content_hash: SHA-256 of the video content
+
+        Returns:
+            VideoAnalysisResult: The stored result, or None if there is none or it expired
+        """
+        with self._lock:
+            if self._connection is None:
+                entry = self._memory.get(content_hash)
+                if entry is None:
+                    return None
+                result, stored = entry
+                if self._expired(stored):
+                    del self._memory[content_hash]
+                    return None
+                self._memory.move_to_end(content_hash)
+                return result.model_copy(deep=True)
+
+            row = self._connection.execute(
+                "SELECT result, stored FROM analysis_results WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1]):
+                self._connection.execute("DELETE FROM analysis_results WHERE content_hash = ?", (content_hash,))
+                self._connection.commit()
+                return None
+            self._connection.execute(
+                "UPDATE analysis_results SET accessed = ? WHERE content_hash = ?", (time.time(), content_hash)
+            )
+            self._connection.commit()
+            return VideoAnalysisResult.model_validate_json(row[0])
+
+    def get_job(self, job_id):
+        """
+        Look up a stored result by the id of the job that produced it
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            VideoAnalysisResult: The stored result, or None if there is none or it expired
+        """
+        with self._lock:
+            if self._connection is None:
+                content_hash = next(
+                    (key for key, (result, _) in self._memory.items() if result.id == job_id), None
+                )
+            else:
+                row = self._connection.execute(
+                    "SELECT content_hash FROM analysis_results WHERE job_id = ?", (job_id,)
+                ).fetchone()
+                content_hash = row[0] if row is not None else None
+        return self.get(content_hash) if content_hash is not None else None
+
+    def put(self, content_hash, result):
+        """
+        Store the completed result of a video, applying the retention policy
+
+        Args:
+            content_hash: SHA-256 of the video content
+            result: Completed VideoAnalysisResult
+        """
+        now = time.time()
+        with self._lock:
+            if self._connection is None:
+                # Copies keep later changes to the job's live result, e.g. a re-run, out of the store
+                self._memory[content_hash] = (result.model_copy(deep=True), now)
+                self._memory.move_to_end(content_hash)
+                while len(self._memory) > self.max_entries:
+                    self._memory.popitem(last=False)
+                return
+
+            self._connection.execute(
+                "INSERT OR REPLACE INTO analysis_results (content_hash, result, stored, accessed, job_id) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (content_hash, result.model_dump_json(), now, now, result.id)
+            )
+            if self.ttl_seconds > 0:
+                self._connection.execute("DELETE FROM analysis_results WHERE stored < ?", (now - self.ttl_seconds,))
+            self._connection.execute(
+                "DELETE FROM analysis_results WHERE content_hash IN ("
+                "SELECT content_hash FROM analysis_results ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._connection.commit()
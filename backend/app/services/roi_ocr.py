@@ -0,0 +1,210 @@
+import os
+import cv2
+import numpy as np
+import logging
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("roi_ocr")
+
+# Padding in pixels added around each changed region before OCR
+OCR_ROI_PADDING = int(os.getenv("OCR_ROI_PADDING", "16"))
+
+# Above this fraction of changed frame area, differential OCR falls back to the full frame
+OCR_ROI_MAX_FRACTION = float(os.getenv("OCR_ROI_MAX_FRACTION", "0.5"))
+
+# Minimum grayscale difference for a pixel to count as changed
+ROI_PIXEL_DELTA = 12
+
+# Changes closer than this are grouped into one region, so words are not cut apart
+ROI_MERGE_KERNEL = (25, 9)
+
+# Ink closer than this horizontally is joined into one text line
+ROI_LINE_KERNEL = (31, 3)
+
+# Taller ink blobs are panels or images rather than text lines, and are not expanded to
+ROI_LINE_MAX_HEIGHT = 64
+
+
+def boxes_intersect(a, b):
+    """Check whether two (x, y, width, height) boxes overlap"""
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+def _position_box(region):
+    position = region["position"]
+    return (position["x"], position["y"], position["width"], position["height"])
+
+
+def _merge_overlapping(boxes):
+    merged = True
+    while merged:
+        merged = False
+        result = []
+        for box in boxes:
+            for i, other in enumerate(result):
+                if boxes_intersect(box, other):
+                    x1, y1 = min(box[0], other[0]), min(box[1], other[1])
+                    x2 = max(box[0] + box[2], other[0] + other[2])
+                    y2 = max(box[1] + box[3], other[1] + other[3])
+                    result[i] = (x1, y1, x2 - x1, y2 - y1)
+                    merged = True
+                    break
+            else:
+                result.append(box)
+        boxes = result
+    return boxes
+
+
+def _union(a, b):
+    x1, y1 = min(a[0], b[0]), min(a[1], b[1])
+    x2, y2 = max(a[0] + a[2], b[0] + b[2]), max(a[1] + a[3], b[1] + b[3])
+    return (x1, y1, x2 - x1, y2 - y1)
+
+
+def text_line_boxes(previous_gray, gray):
+    """
+    Find the boxes of the text lines in either of two grayscale frames
+
+    Strong local contrast marks ink of either polarity, and ink is joined
+    horizontally into lines. Blobs too tall to be a line are left out.
+
+    Args:
+        previous_gray: Previous analyzed frame in grayscale
+        gray: Current frame in grayscale
+
+    Returns:
+        list: (x, y, width, height) line boxes
+    """
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+    gradient = cv2.max(cv2.morphologyEx(previous_gray, cv2.MORPH_GRADIENT, kernel),
+                       cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, kernel))
+    ink = (gradient > 64).astype(np.uint8)
+    ink = cv2.dilate(ink, cv2.getStructuringElement(cv2.MORPH_RECT, ROI_LINE_KERNEL))
+
+    _, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    return [
+        (int(x), int(y), int(w), int(h))
+        for x, y, w, h, _ in stats[1:]
+        if h <= ROI_LINE_MAX_HEIGHT
+    ]
+
+
+def _contains(outer, inner):
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and inner[0] + inner[2] <= outer[0] + outer[2] and inner[1] + inner[3] <= outer[1] + outer[3])
+
+
+def expand_to_text(boxes, text_boxes):
+    """
+    Grow changed boxes until every text box they intersect is inside them
+
+    A crop that cuts a word or line in half OCRs a truncated text, which would then
+    replace the intact text of the previous frame. Growing a box can make it reach
+    further text, so boxes are grown until no text box is cut.
+
+    Args:
+        boxes: Changed (x, y, width, height) boxes
+        text_boxes: Boxes of previous words or text lines
+
+    Returns:
+        list: Expanded boxes, merged where they overlap
+    """
+    boxes = _merge_overlapping(list(boxes))
+    while True:
+        expanded = []
+        for box in boxes:
+            grown = box
+            for text_box in text_boxes:
+                if boxes_intersect(box, text_box):
+                    grown = _union(grown, text_box)
+            expanded.append(grown)
+        expanded = _merge_overlapping(expanded)
+        if expanded == boxes:
+            return boxes
+        boxes = expanded
+
+
+def compute_changed_regions(previous_frame, frame, padding=OCR_ROI_PADDING, max_fraction=OCR_ROI_MAX_FRACTION,
+                            previous_regions=None):
+    """
+    Find the regions of a frame that changed since the previous analyzed frame
+
+    Each region is padded and then expanded to the whole text lines it touches in
+    either frame, and to the previous text regions it intersects when they are
+    known, so no word is cut at the edge of a crop.
+
+    Args:
+        previous_frame: Previous analyzed frame image as numpy array
+        frame: Current frame image as numpy array
+        padding: Padding in pixels added around each changed region
+        max_fraction: Changed area fraction above which the whole frame should be OCR'd
+        previous_regions: Optional text regions of the previous analyzed frame
+
+    Returns:
+        list: Padded (x, y, width, height) boxes, or None if the full frame should be OCR'd
+    """
+    if previous_frame is None or previous_frame.shape != frame.shape:
+        return None
+
+    height, width = frame.shape[:2]
+    previous_gray = cv2.cvtColor(previous_frame, cv2.COLOR_BGR2GRAY)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    # Group nearby changed pixels into blobs
+    changed = (cv2.absdiff(previous_gray, gray) > ROI_PIXEL_DELTA).astype(np.uint8)
+    changed = cv2.dilate(changed, cv2.getStructuringElement(cv2.MORPH_RECT, ROI_MERGE_KERNEL))
+    contours, _ = cv2.findContours(changed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    padded = []
+    for x, y, w, h in (cv2.boundingRect(contour) for contour in contours):
+        x1, y1 = max(0, x - padding), max(0, y - padding)
+        x2, y2 = min(width, x + w + padding), min(height, y + h + padding)
+        padded.append((x1, y1, x2 - x1, y2 - y1))
+
+    # Cover the whole lines and previous words each padded blob touches, so no word is cut
+    text_boxes = text_line_boxes(previous_gray, gray)
+    if previous_regions:
+        text_boxes += [_position_box(region) for region in previous_regions]
+    boxes = expand_to_text(padded, text_boxes)
+
+    if sum(w * h for _, _, w, h in boxes) > max_fraction * width * height:
+        return None
+
+    return boxes
+
+
+def offset_text_regions(text_regions, x, y):
+    """Shift text regions detected in a crop back into frame coordinates"""
+    for region in text_regions:
+        region["position"]["x"] += x
+        region["position"]["y"] += y
+    return text_regions
+
+
+def merge_text_regions(previous_regions, new_regions, changed_boxes):
+    """
+    Combine text re-detected in changed regions with the unchanged previous text
+
+    Previous text is only replaced when a re-OCR'd box contains all of it. Text a
+    box merely clips is kept, and new text overlapping it is dropped as a read of
+    its truncated glyphs.
+
+    Args:
+        previous_regions: Text regions of the previous analyzed frame
+        new_regions: Text regions detected in the changed regions, in frame coordinates
+        changed_boxes: (x, y, width, height) boxes that were re-OCR'd
+
+    Returns:
+        list: Text regions for the current frame
+    """
+    kept = [
+        region for region in previous_regions
+        if not any(_contains(box, _position_box(region)) for box in changed_boxes)
+    ]
+    clipped = [_position_box(region) for region in kept
+               if any(boxes_intersect(_position_box(region), box) for box in changed_boxes)]
+    return kept + [
+        region for region in new_regions
+        if not any(boxes_intersect(_position_box(region), box) for box in clipped)
+    ]
@@ -0,0 +1,41 @@
+from collections import defaultdict
+
+# Default cell size in pixels, a few UI text lines or controls per cell
+GRID_CELL = 64
+
+
+class GridIndex:
+    """Uniform grid over box positions, to find the boxes near a box without scanning all of them"""
+
+    def __init__(self, cell=GRID_CELL):
+        self.cell = cell
+        self._cells = defaultdict(set)
+        self._boxes = {}
+
+    def _cells_of(self, box):
+        x, y, w, h = box
+        for cx in range(x // self.cell, (x + max(w, 1) - 1) // self.cell + 1):
+            for cy in range(y // self.cell, (y + max(h, 1) - 1) // self.cell + 1):
+                yield cx, cy
+
+    def insert(self, key, box):
+        self.remove(key)
+        self._boxes[key] = box
+        for cell in self._cells_of(box):
+            self._cells[cell].add(key)
+
+    def remove(self, key):
+        box = self._boxes.pop(key, None)
+        if box is None:
+            return
+        for cell in self._cells_of(box):
+            self._cells[cell].discard(key)
+            if not self._cells[cell]:
+                del self._cells[cell]
+
+    def query(self, box):
+        """Get the keys of the boxes sharing a grid cell with a box"""
+        found = set()
+        for cell in self._cells_of(box):
+            found.update(self._cells.get(cell, ()))
+        return found
@@ -1,82 +1,392 @@
 import os
-import tempfile
-import whisper
+import sys
+import time
+import queue
+import asyncio
 import ffmpeg
 import logging
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("speech_to_text")
 
-# Load the Whisper model once when the module is imported
+# Whisper model size, loaded lazily on first use
 # Default to using the "base" model, which is smaller and faster
 # Options include: "tiny", "base", "small", "medium", "large"
-try:
-    model = whisper.load_model("base")
-    logger.info("Whisper model loaded successfully")
-except Exception as e:
-    logger.error(f"Failed to load Whisper model: {e}")
-    model = None
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+
+# Maximum number of model instances, one per concurrent transcription
+WHISPER_MODEL_POOL_SIZE = int(os.getenv("WHISPER_MODEL_POOL_SIZE", "1"))
+
+# Inference backend: "whisper" (fp32 torch), "whisper-int8" (dynamically quantized torch)
+# or "faster-whisper" (CTranslate2 int8, needs the optional faster-whisper package)
+TRANSCRIBE_BACKEND = os.getenv("TRANSCRIBE_BACKEND", "whisper")
+
+# Whisper expects 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+# Audio longer than this (seconds) is transcribed in parallel chunks
+LONGFORM_MIN_SECONDS = float(os.getenv("LONGFORM_MIN_SECONDS", "600"))
+
+# Maximum length of a long-form chunk in seconds
+LONGFORM_CHUNK_SECONDS = float(os.getenv("LONGFORM_CHUNK_SECONDS", "120"))
+
+# Number of worker processes used for long-form transcription
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", str(max(1, (os.cpu_count() or 1) // 2))))
+
+# Energy VAD settings: analysis frame length, minimum pause to split on and padding kept around speech
+VAD_FRAME_SECONDS = 0.03
+VAD_MIN_SILENCE_SECONDS = 0.5
+VAD_PADDING_SECONDS = 0.2
+
+# Speech separated by a longer pause is never put in the same chunk, so silence is skipped
+VAD_MAX_MERGE_GAP_SECONDS = 2.0
+
+# A frame is voiced when its RMS exceeds this fraction of the loud (95th percentile) level
+VAD_ENERGY_RATIO = 0.1
+VAD_MIN_ENERGY = 1e-3
+
+def _load_whisper(model_name):
+    import whisper
+    
+    return whisper.load_model(model_name)
+
+class QuantizedWhisperModel:
+    """Whisper with its linear layers dynamically quantized to int8 for CPU inference"""
+    
+    def __init__(self, model_name):
+        import torch
+        import whisper
+        
+        model = whisper.load_model(model_name, device="cpu")
+        
+        # Whisper's Linear only overrides forward() to cast weights, turn it back into
+        # nn.Linear so quantize_dynamic recognizes and replaces it
+        for module in model.modules():
+            if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+                module.__class__ = torch.nn.Linear
+        
+        self.model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    
+    def transcribe(self, audio):
+        return self.model.transcribe(audio, fp16=False)
+
+class FasterWhisperModel:
+    """CTranslate2 Whisper runtime with int8 weights, returning Whisper's result format"""
+    
+    def __init__(self, model_name):
+        from faster_whisper import WhisperModel
+        
+        self.model = WhisperModel(model_name, device="cpu", compute_type="int8")
+    
+    def transcribe(self, audio):
+        segments, _ = self.model.transcribe(audio)
+        segments = [{"text": segment.text, "start": segment.start, "end": segment.end} for segment in segments]
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments
+        }
+
+TRANSCRIPTION_BACKENDS = {
+    "whisper": _load_whisper,
+    "whisper-int8": QuantizedWhisperModel,
+    "faster-whisper": FasterWhisperModel,
+}
+
+class WhisperModelPool:
+    """Lazily loaded pool of Whisper model instances
+    
+    Models are loaded on first use rather than at import, so processes that never
+    transcribe do not pay for torch and the weights. Each transcription borrows its
+    own instance, up to `size` instances, and further callers wait for one to be
+    returned instead of sharing a model concurrently.
+    """
+    
+    def __init__(self, model_name=WHISPER_MODEL, size=WHISPER_MODEL_POOL_SIZE, backend=TRANSCRIBE_BACKEND):
+        if backend not in TRANSCRIPTION_BACKENDS:
+            raise ValueError(f"Unknown transcription backend: {backend}")
+        
+        self.model_name = model_name
+        self.backend = backend
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        model = TRANSCRIPTION_BACKENDS[self.backend](self.model_name)
+        logger.info(f"Whisper model {self.model_name} loaded successfully with the {self.backend} backend")
+        return model
+    
+    def _create(self):
+        try:
+            return self._load()
+        except Exception as e:
+            with self._lock:
+                self._created -= 1
+            logger.error(f"Failed to load Whisper model: {e}")
+            raise RuntimeError("Whisper model not loaded") from e
+    
+    @contextmanager
+    def acquire(self, timeout=None):
+        """
+        Borrow a model instance for the duration of a transcription
+        
+        Args:
+            timeout: Seconds to wait for a free instance when the pool is exhausted
+            
+        Returns:
+            Context manager yielding a loaded Whisper model
+        """
+        try:
+            model = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            model = self._create() if create else self._idle.get(timeout=timeout)
+        
+        try:
+            yield model
+        finally:
+            self._idle.put(model)
+    
+    def warm_up(self, count=1):
+        """Load up to `count` model instances ahead of the first transcription"""
+        models = []
+        for _ in range(min(count, self.size)):
+            with self._lock:
+                if self._created >= self.size:
+                    break
+                self._created += 1
+            models.append(self._create())
+        for model in models:
+            self._idle.put(model)
+
+# Process-wide model pool, created on first use
+_model_pool = None
+_model_pool_lock = threading.Lock()
+
+def get_model_pool():
+    """Get the process-wide Whisper model pool"""
+    global _model_pool
+    
+    with _model_pool_lock:
+        if _model_pool is None:
+            _model_pool = WhisperModelPool()
+        return _model_pool
+
+def warm_up(count=1):
+    """
+    Load Whisper models ahead of time, intended for worker startup
+    
+    Args:
+        count: Number of model instances to load
+    """
+    get_model_pool().warm_up(count)
 
 async def extract_audio_from_video(video_path):
     """
     Extract audio from a video file
     
+    ffmpeg decodes the audio track once and writes raw 16 kHz mono PCM to stdout,
+    so no intermediate file is encoded, written or decoded again.
+    
     Args:
         video_path: Path to the video file
         
     Returns:
-        Path to the extracted audio file
+        numpy.ndarray: Mono float32 waveform in [-1, 1] sampled at 16 kHz
     """
-    # Create a temporary file for the audio
-    audio_path = tempfile.mktemp(suffix=".mp3")
-    
     try:
         # Extract audio using ffmpeg
-        (
+        out, _ = (
             ffmpeg
             .input(video_path)
-            .output(audio_path, acodec='libmp3lame', ac=1, ar='16k')
-            .run(quiet=True, overwrite_output=True)
+            .output('pipe:', format='s16le', acodec='pcm_s16le', ac=1, ar=SAMPLE_RATE)
+            .run(capture_stdout=True, capture_stderr=True)
         )
-        return audio_path
+    except ffmpeg.Error as e:
+        logger.error(f"Failed to extract audio: {e.stderr.decode(errors='ignore') if e.stderr else e}")
+        raise
     except Exception as e:
         logger.error(f"Failed to extract audio: {e}")
-        if os.path.exists(audio_path):
-            os.unlink(audio_path)
         raise
+    
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
 
-async def transcribe_audio(audio_path):
+def _format_segments(segments, offset=0.0):
+    # Format the segments with timestamps on the global timeline
+    formatted_segments = []
+    for segment in segments:
+        start = segment["start"] + offset
+        formatted_segments.append({
+            "text": segment["text"],
+            "start": start,
+            "end": segment["end"] + offset,
+            "timestamp": f"{int(start // 60):02d}:{int(start % 60):02d}"
+        })
+    return formatted_segments
+
+def find_speech_chunks(audio, max_chunk_seconds=LONGFORM_CHUNK_SECONDS, min_silence_seconds=VAD_MIN_SILENCE_SECONDS):
+    """
+    Split audio into speech chunks at silences using a simple energy VAD
+    
+    Args:
+        audio: 16 kHz mono float32 waveform
+        max_chunk_seconds: Maximum chunk length in seconds
+        min_silence_seconds: Minimum pause length that may separate chunks
+        
+    Returns:
+        list: (start_sample, end_sample) tuples, fully silent stretches are left out
+    """
+    frame_length = int(SAMPLE_RATE * VAD_FRAME_SECONDS)
+    n_frames = len(audio) // frame_length
+    if n_frames == 0:
+        return []
+    
+    # RMS energy per analysis frame
+    frames = audio[:n_frames * frame_length].reshape(n_frames, frame_length)
+    energy = np.sqrt(np.mean(np.square(frames), axis=1))
+    threshold = max(VAD_MIN_ENERGY, VAD_ENERGY_RATIO * float(np.percentile(energy, 95)))
+    voiced = np.concatenate(([0], (energy > threshold).astype(np.int8), [0]))
+    
+    # Voiced runs as [start, end) frame ranges
+    edges = np.diff(voiced)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return []
+    
+    # Bridge pauses too short to split on, then pad the remaining runs
+    min_silence = int(min_silence_seconds / VAD_FRAME_SECONDS)
+    padding = int(VAD_PADDING_SECONDS / VAD_FRAME_SECONDS)
+    runs = []
+    for start, end in zip(starts, ends):
+        if runs and start - runs[-1][1] < min_silence:
+            runs[-1][1] = end
+        else:
+            runs.append([start, end])
+    runs = [(max(0, start - padding), min(n_frames, end + padding)) for start, end in runs]
+    
+    # Group runs into chunks no longer than the maximum, cutting inside silences
+    max_frames = max(1, int(max_chunk_seconds / VAD_FRAME_SECONDS))
+    max_gap = int(VAD_MAX_MERGE_GAP_SECONDS / VAD_FRAME_SECONDS)
+    chunks = []
+    for start, end in runs:
+        if chunks and end - chunks[-1][0] <= max_frames and start - chunks[-1][1] <= max_gap:
+            chunks[-1][1] = end
+            continue
+        while end - start > max_frames:
+            chunks.append([start, start + max_frames])
+            start += max_frames
+        chunks.append([start, end])
+    
+    chunk_samples = [(start * frame_length, end * frame_length) for start, end in chunks]
+    
+    # Keep the tail that did not fill a whole analysis frame
+    if chunks[-1][1] == n_frames:
+        chunk_samples[-1] = (chunk_samples[-1][0], len(audio))
+    
+    return chunk_samples
+
+def _transcribe(audio):
+    with get_model_pool().acquire() as model:
+        return model.transcribe(audio)
+
+def _transcribe_chunk(audio, offset):
+    result = _transcribe(audio)
+    return {
+        "text": result["text"],
+        "segments": _format_segments(result["segments"], offset)
+    }
+
+def _init_transcription_worker(threads):
+    # Split the cores between the workers instead of each using all of them
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    if TRANSCRIBE_BACKEND != "faster-whisper":
+        import torch
+        
+        torch.set_num_threads(threads)
+    warm_up()
+
+# Process-wide pool for long-form transcription, created on first use
+_transcription_executor = None
+_transcription_executor_lock = threading.Lock()
+
+def get_transcription_executor():
+    """Get the shared long-form transcription process pool, creating it on first use"""
+    global _transcription_executor
+    
+    with _transcription_executor_lock:
+        if _transcription_executor is None:
+            _transcription_executor = ProcessPoolExecutor(
+                max_workers=TRANSCRIBE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_transcription_worker,
+                initargs=(max(1, (os.cpu_count() or 1) // TRANSCRIBE_WORKERS),)
+            )
+            logger.info(f"Started transcription executor with {TRANSCRIBE_WORKERS} workers")
+        return _transcription_executor
+
+async def transcribe_long_form(audio, max_chunk_seconds=LONGFORM_CHUNK_SECONDS):
+    """
+    Transcribe long audio as silence-separated chunks in parallel
+    
+    Args:
+        audio: 16 kHz mono float32 waveform
+        max_chunk_seconds: Maximum chunk length in seconds
+        
+    Returns:
+        dict: Transcription result with text and segments on the global timeline
+    """
+    chunks = find_speech_chunks(audio, max_chunk_seconds=max_chunk_seconds)
+    logger.info(f"Transcribing {len(chunks)} speech chunks of {len(audio) / SAMPLE_RATE:.1f} seconds of audio")
+    
+    loop = asyncio.get_running_loop()
+    executor = get_transcription_executor()
+    results = await asyncio.gather(*[
+        loop.run_in_executor(executor, _transcribe_chunk, audio[start:end], start / SAMPLE_RATE)
+        for start, end in chunks
+    ])
+    
+    return {
+        "full_text": "".join(result["text"] for result in results),
+        "segments": [segment for result in results for segment in result["segments"]]
+    }
+
+async def transcribe_audio(audio, long_form=None):
     """
     Transcribe the audio using Whisper AI
     
     Args:
-        audio_path: Path to the audio file
+        audio: 16 kHz mono float32 waveform, or a path to an audio file
+        long_form: Force (True) or disable (False) chunked parallel transcription,
+            by default it is used for waveforms longer than LONGFORM_MIN_SECONDS
         
     Returns:
         dict: Transcription result with text and segments
     """
-    if model is None:
-        raise RuntimeError("Whisper model not loaded")
+    if long_form is None:
+        long_form = isinstance(audio, np.ndarray) and len(audio) > LONGFORM_MIN_SECONDS * SAMPLE_RATE
     
     try:
-        # Transcribe the audio
-        result = model.transcribe(audio_path)
-        
-        # Format the segments with timestamps
-        formatted_segments = []
-        for segment in result["segments"]:
-            formatted_segments.append({
-                "text": segment["text"],
-                "start": segment["start"],
-                "end": segment["end"],
-                "timestamp": f"{int(segment['start'] // 60):02d}:{int(segment['start'] % 60):02d}"
-            })
+        if long_form:
+            return await transcribe_long_form(audio)
+        
+        # Transcribe the audio off the event loop with a pooled model
+        result = await asyncio.to_thread(_transcribe, audio)
         
         return {
             "full_text": result["text"],
-            "segments": formatted_segments
+            "segments": _format_segments(result["segments"])
         }
     except Exception as e:
         logger.error(f"Failed to transcribe audio: {e}")
@@ -92,16 +402,76 @@ async def process_video_to_text(video_path):
     Returns:
         dict: Transcription result
     """
-    audio_path = None
-    try:
-        # Extract audio from video
-        audio_path = await extract_audio_from_video(video_path)
+    # Extract audio from video straight into memory
+    audio = await extract_audio_from_video(video_path)
+    
+    # Transcribe the audio
+    return await transcribe_audio(audio)
+
+def _word_errors(reference, hypothesis):
+    # Word-level Levenshtein distance
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1]
+
+def _normalize_words(text):
+    return "".join(c if c.isalnum() or c.isspace() else " " for c in text.lower()).split()
+
+async def benchmark_transcription_backends(audio_path, backends=("whisper", "whisper-int8", "faster-whisper"),
+                                           reference="whisper", model_name=WHISPER_MODEL):
+    """
+    Compare transcription backends on the same audio
+    
+    Args:
+        audio_path: Path to a local audio or video fixture
+        backends: Names of the backends to compare
+        reference: Backend whose transcript the others are compared against
+        model_name: Whisper model size used by every backend
         
-        # Transcribe the audio
-        result = await transcribe_audio(audio_path)
+    Returns:
+        dict: Per-backend load time, real-time factor and word error rate against the reference
+    """
+    audio = await extract_audio_from_video(audio_path)
+    duration = len(audio) / SAMPLE_RATE
+    
+    transcripts = {}
+    report = {}
+    for name in backends:
+        try:
+            start = time.perf_counter()
+            pool = WhisperModelPool(model_name=model_name, size=1, backend=name)
+            pool.warm_up()
+            load_seconds = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            with pool.acquire() as model:
+                result = model.transcribe(audio)
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            report[name] = {"error": str(e)}
+            continue
         
-        return result
-    finally:
-        # Clean up temporary files
-        if audio_path and os.path.exists(audio_path):
-            os.unlink(audio_path) 
\ No newline at end of file
+        transcripts[name] = _normalize_words(result["text"])
+        report[name] = {
+            "load_seconds": round(load_seconds, 2),
+            "real_time_factor": round(elapsed / duration, 3) if duration else None
+        }
+    
+    if reference in transcripts:
+        reference_words = transcripts[reference]
+        for name, words in transcripts.items():
+            errors = _word_errors(reference_words, words)
+            report[name]["word_differences"] = errors
+            report[name]["word_error_rate"] = round(errors / max(1, len(reference_words)), 4)
+    
+    return report
+
+if __name__ == "__main__":
+    # Usage: python -m app.services.speech_to_text <audio_or_video_fixture> [backend ...]
+    selected = tuple(sys.argv[2:]) or ("whisper", "whisper-int8", "faster-whisper")
+    for name, stats in asyncio.run(benchmark_transcription_backends(sys.argv[1], backends=selected)).items():
+        print(f"{name}: {stats}")
@@ -1,10 +1,20 @@
 import os
+import re
 import logging
 import json
+import asyncio
 from langchain.prompts import PromptTemplate
-from langchain.llms import OpenAI
-from langchain.chains import LLMChain
 from dotenv import load_dotenv
+from app.services.llm_cache import get_llm_cache, run_cached_completion
+from app.services.llm_service import get_llm_service
+from app.services.frame_results import FrameResults, iter_frame_dicts
+from app.services.prompt_compaction import (
+    PROMPT_TRANSCRIPT_SHARE,
+    compact_prompt_inputs,
+    compact_transcript,
+    estimate_tokens,
+    prompt_token_budget,
+)
 
 # Load environment variables
 load_dotenv()
@@ -13,18 +23,34 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("test_extractor")
 
-# LLM setup
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Recordings longer than this (seconds) are extracted in overlapping time windows
+EXTRACTION_WINDOWED_MIN_SECONDS = float(os.getenv("EXTRACTION_WINDOWED_MIN_SECONDS", "600"))
+
+# Length and overlap of extraction windows in seconds
+EXTRACTION_WINDOW_SECONDS = float(os.getenv("EXTRACTION_WINDOW_SECONDS", "300"))
+EXTRACTION_WINDOW_OVERLAP_SECONDS = float(os.getenv("EXTRACTION_WINDOW_OVERLAP_SECONDS", "30"))
+
+# Maximum number of windows extracted concurrently
+EXTRACTION_MAX_CONCURRENCY = int(os.getenv("EXTRACTION_MAX_CONCURRENCY", "4"))
+
+# Steps from overlapping windows at most this many seconds apart, whose actions share
+# at least this fraction of their words, are merged into one step
+STEP_MERGE_SECONDS = float(os.getenv("STEP_MERGE_SECONDS", "5"))
+STEP_MERGE_SIMILARITY = float(os.getenv("STEP_MERGE_SIMILARITY", "0.5"))
 
 class TestStepExtractor:
     """Class for extracting test steps from video analysis"""
     
-    def __init__(self):
-        if not OPENAI_API_KEY:
-            logger.warning("OpenAI API key not found. Test extraction will not work.")
-            self.llm = None
-        else:
-            self.llm = OpenAI(temperature=0.2, api_key=OPENAI_API_KEY)
+    def __init__(self, service=None, cache=None, token_budget=None):
+        # Shared LLM client, concurrency limit and retry policy
+        self.service = service or get_llm_service()
+        
+        # Cache of LLM responses, pass False to disable it
+        self.cache = get_llm_cache() if cache is None else (cache or None)
+        
+        # Tokens the transcript and UI data may take up in the prompt, derived from the
+        # model's context once the template is known
+        self.token_budget = token_budget
         
         # Prompt template for extracting test steps
         self.test_step_template = PromptTemplate(
@@ -71,75 +97,284 @@ class TestStepExtractor:
             Ensure the output is valid JSON.
             """
         )
+        if self.token_budget is None:
+            self.token_budget = prompt_token_budget(self.service, self.test_step_template.template)
+    
+    def _parse_test_steps(self, result):
+        # Extract JSON from the result
+        json_start = result.find('```json') + 7
+        json_end = result.find('```', json_start)
+        
+        if json_start > 7 and json_end > json_start:
+            json_str = result[json_start:json_end].strip()
+        else:
+            json_str = result.strip()
         
-        if self.llm:
-            self.test_chain = LLMChain(llm=self.llm, prompt=self.test_step_template)
+        # Parse the JSON
+        return json.loads(json_str)
     
-    async def extract_test_steps(self, transcript, ui_elements):
+    async def extract_test_steps(self, transcript, ui_elements, bypass_cache=None):
         """
         Extract test steps from transcript and UI elements
         
         Args:
             transcript: Transcript data from speech-to-text
             ui_elements: UI elements data from video analysis
+            bypass_cache: Skip the LLM response cache lookup for this call
             
         Returns:
             dict: Extracted test steps in structured format
         """
-        if not self.llm:
+        if not self.service.available:
             raise RuntimeError("LLM not initialized. Check OpenAI API key.")
         
         try:
-            # Format transcript for prompt
-            full_text = transcript.get("full_text", "")
-            segments = transcript.get("segments", [])
+            # Format transcript and deduplicated UI elements for prompt within the token budget
+            formatted_transcript, formatted_ui = compact_prompt_inputs(transcript, ui_elements, self.token_budget)
             
-            formatted_transcript = full_text + "\n\nDetailed segments with timestamps:\n"
-            for segment in segments:
-                formatted_transcript += f"{segment.get('timestamp', '00:00')}: {segment.get('text', '')}\n"
-            
-            # Format UI elements for prompt
-            formatted_ui = json.dumps(ui_elements, indent=2)
-            
-            # Run the LLM chain
-            result = await self.test_chain.arun(
-                transcript=formatted_transcript,
-                ui_elements=formatted_ui
+            # Run the prompt, reusing the response to identical prompts
+            return await run_cached_completion(
+                self.service,
+                self.test_step_template,
+                {"transcript": formatted_transcript, "ui_elements": formatted_ui},
+                self._parse_test_steps,
+                cache=self.cache,
+                bypass=bypass_cache
             )
             
-            # Extract JSON from the result
-            json_start = result.find('```json') + 7
-            json_end = result.find('```', json_start)
-            
-            if json_start > 7 and json_end > json_start:
-                json_str = result[json_start:json_end].strip()
-            else:
-                json_str = result.strip()
-            
-            # Parse the JSON
-            test_steps = json.loads(json_str)
-            return test_steps
-            
         except Exception as e:
             logger.error(f"Error extracting test steps: {e}")
             raise
 
-async def extract_test_cases(transcript_data, ui_data):
+# Process-wide extractor, created on first use
+_extractor = None
+
+def get_test_step_extractor():
+    """Get the shared test step extractor"""
+    global _extractor
+    
+    if _extractor is None:
+        _extractor = TestStepExtractor()
+    return _extractor
+
+def _recording_duration(transcript_data, ui_data):
+    # End of the last transcript segment or analyzed frame, whichever is later
+    ends = [segment.get("end", segment.get("start", 0.0)) for segment in transcript_data.get("segments", [])]
+    if isinstance(ui_data, FrameResults):
+        ends += ui_data.frames["timestamp"][-1:].tolist()
+    elif isinstance(ui_data, dict):
+        ends += [frame.get("timestamp", 0.0) for frame in ui_data.get("results", [])]
+    return max(ends, default=0.0)
+
+def window_bounds(transcript_data, ui_data, window_seconds=EXTRACTION_WINDOW_SECONDS,
+                  overlap_seconds=EXTRACTION_WINDOW_OVERLAP_SECONDS):
+    """
+    Start and end times of the overlapping windows covering a recording
+    
+    Args:
+        transcript_data: Transcript data from speech-to-text
+        ui_data: UI elements data from video analysis, as a dict or FrameResults
+        window_seconds: Length of each window in seconds
+        overlap_seconds: Seconds shared by consecutive windows
+        
+    Returns:
+        list: (start, end) pairs in seconds
+    """
+    duration = _recording_duration(transcript_data, ui_data)
+    step = max(window_seconds - overlap_seconds, 1.0)
+    bounds = []
+    start = 0.0
+    while True:
+        end = start + window_seconds
+        bounds.append((start, end))
+        if end >= duration:
+            return bounds
+        start += step
+
+def split_time_windows(transcript_data, ui_data, window_seconds=EXTRACTION_WINDOW_SECONDS,
+                       overlap_seconds=EXTRACTION_WINDOW_OVERLAP_SECONDS):
+    """
+    Split transcript and UI analysis data into overlapping time windows
+    
+    Args:
+        transcript_data: Transcript data from speech-to-text
+        ui_data: UI elements data from video analysis, as a dict or FrameResults
+        window_seconds: Length of each window in seconds
+        overlap_seconds: Seconds shared by consecutive windows
+        
+    Returns:
+        list: (transcript_data, ui_data) pairs covering each window
+    """
+    segments = transcript_data.get("segments", [])
+    frames = ui_data.get("results", []) if isinstance(ui_data, dict) else []
+    
+    def window_ui(start, end):
+        if isinstance(ui_data, FrameResults):
+            return ui_data.between(start, end)
+        window_frames = [frame for frame in frames if start <= frame.get("timestamp", 0.0) < end]
+        return {"frame_count": len(window_frames), "results": window_frames}
+    
+    windows = []
+    for start, end in window_bounds(transcript_data, ui_data, window_seconds, overlap_seconds):
+        window_segments = [
+            segment for segment in segments
+            if segment.get("start", 0.0) < end and segment.get("end", segment.get("start", 0.0)) >= start
+        ]
+        windows.append((
+            {
+                "full_text": " ".join(segment.get("text", "").strip() for segment in window_segments),
+                "segments": window_segments
+            },
+            window_ui(start, end)
+        ))
+    return windows
+
+def _timestamp_seconds(timestamp):
+    # Parse "mm:ss" or "hh:mm:ss" timestamps from LLM output, unknown ones sort last
+    parts = re.findall(r"\d+(?:\.\d+)?", str(timestamp or ""))
+    if not parts:
+        return float("inf")
+    seconds = 0.0
+    for part in parts[-3:]:
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+def _normalize_text(text):
+    return " ".join(str(text or "").lower().split())
+
+def _action_words(action):
+    return set(re.findall(r"[a-z0-9]+", _normalize_text(action)))
+
+def _same_step(a, b, bounds):
+    # Exact repeats are always merged, reworded steps only when two windows saw them
+    # close together inside the stretch both windows cover; unknown timestamps never
+    # count as close
+    if a["key"] == b["key"]:
+        return True
+    if a["window"] == b["window"] or not abs(a["time"] - b["time"]) <= STEP_MERGE_SECONDS:
+        return False
+    if bounds:
+        first, second = sorted((a["window"], b["window"]))
+        overlap_start = bounds[second][0] - STEP_MERGE_SECONDS
+        overlap_end = bounds[first][1] + STEP_MERGE_SECONDS
+        if not all(overlap_start <= step["time"] <= overlap_end for step in (a, b)):
+            return False
+    union = a["words"] | b["words"]
+    return bool(union) and len(a["words"] & b["words"]) / len(union) >= STEP_MERGE_SIMILARITY
+
+def merge_test_cases(partials, bounds=None):
+    """
+    Merge test cases extracted from consecutive time windows
+    
+    A step reported by two overlapping windows at nearly the same time with similar
+    wording is kept once, taking the copy from the window where it lies further from
+    the edge, since that window saw what led up to it and what followed. Bugs with
+    the same description are kept once, and steps are renumbered in timestamp order.
+    
+    Args:
+        partials: Test case dicts in window order
+        bounds: (start, end) seconds of the window each partial was extracted from
+        
+    Returns:
+        dict: Single test case covering all windows
+    """
+    merged = {"test_name": "", "app_url": "", "steps": [], "bugs": []}
+    kept_steps = []
+    seen_bugs = set()
+    
+    for index, partial in enumerate(partials):
+        merged["test_name"] = merged["test_name"] or partial.get("test_name", "")
+        merged["app_url"] = merged["app_url"] or partial.get("app_url", "")
+        
+        for step in partial.get("steps", []):
+            seconds = _timestamp_seconds(step.get("timestamp"))
+            candidate = {
+                "step": dict(step),
+                "window": index,
+                "time": seconds,
+                "key": (_normalize_text(step.get("action")), seconds),
+                "words": _action_words(step.get("action")),
+                "margin": min(seconds - bounds[index][0], bounds[index][1] - seconds) if bounds else 0.0,
+            }
+            duplicate = next((kept for kept in kept_steps if _same_step(kept, candidate, bounds)), None)
+            if duplicate is None:
+                kept_steps.append(candidate)
+            elif candidate["margin"] > duplicate["margin"]:
+                kept_steps[kept_steps.index(duplicate)] = candidate
+        
+        for bug in partial.get("bugs", []):
+            key = _normalize_text(bug.get("description"))
+            if key not in seen_bugs:
+                seen_bugs.add(key)
+                merged["bugs"].append(dict(bug))
+    
+    merged["steps"] = sorted((kept["step"] for kept in kept_steps),
+                             key=lambda step: _timestamp_seconds(step.get("timestamp")))
+    for number, step in enumerate(merged["steps"], 1):
+        step["step_number"] = number
+    
+    return merged
+
+async def extract_test_cases_windowed(extractor, transcript_data, ui_data, bypass_cache=None,
+                                      max_concurrency=EXTRACTION_MAX_CONCURRENCY):
+    """
+    Extract test cases window by window and merge the results
+    
+    Args:
+        extractor: TestStepExtractor to run on each window
+        transcript_data: Transcript data from speech-to-text
+        ui_data: UI elements data from video analysis
+        bypass_cache: Skip the LLM response cache lookup for this call
+        max_concurrency: Maximum number of windows extracted at once
+        
+    Returns:
+        dict: Merged test cases
+    """
+    windows = [
+        (window, bounds)
+        for window, bounds in zip(split_time_windows(transcript_data, ui_data), window_bounds(transcript_data, ui_data))
+        if window[0]["segments"] or next(iter_frame_dicts(window[1]), None) is not None
+    ]
+    logger.info(f"Extracting test cases from {len(windows)} time windows")
+    
+    limiter = asyncio.Semaphore(max_concurrency)
+    
+    async def extract_window(window_transcript, window_ui):
+        async with limiter:
+            return await extractor.extract_test_steps(window_transcript, window_ui, bypass_cache=bypass_cache)
+    
+    partials = await asyncio.gather(*(extract_window(*window) for window, _ in windows))
+    return merge_test_cases(partials, [bounds for _, bounds in windows])
+
+async def extract_test_cases(transcript_data, ui_data, bypass_cache=None, windowed=None):
     """
     Extract test cases from video analysis data
     
     Args:
         transcript_data: Transcript data from speech-to-text
         ui_data: UI elements data from video analysis
+        bypass_cache: Skip the LLM response cache lookup for this call
+        windowed: Force (True) or disable (False) extraction in overlapping time windows,
+            by default it is used for recordings longer than EXTRACTION_WINDOWED_MIN_SECONDS
+            or whose transcript does not fit its share of the prompt
         
     Returns:
         dict: Extracted test cases
     """
-    extractor = TestStepExtractor()
+    extractor = get_test_step_extractor()
+    
+    if windowed is None:
+        windowed = (
+            _recording_duration(transcript_data, ui_data) > EXTRACTION_WINDOWED_MIN_SECONDS
+            or estimate_tokens(compact_transcript(transcript_data)) > extractor.token_budget * PROMPT_TRANSCRIPT_SHARE
+        )
     
     try:
-        test_steps = await extractor.extract_test_steps(transcript_data, ui_data)
+        if windowed:
+            return await extract_test_cases_windowed(extractor, transcript_data, ui_data, bypass_cache=bypass_cache)
+        
+        test_steps = await extractor.extract_test_steps(transcript_data, ui_data, bypass_cache=bypass_cache)
         return test_steps
     except Exception as e:
         logger.error(f"Error in test case extraction: {e}")
-        raise 
\ No newline at end of file
+        raise
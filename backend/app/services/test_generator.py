@@ -2,9 +2,10 @@ import os
 import logging
 import json
 from langchain.prompts import PromptTemplate
-from langchain.llms import OpenAI
-from langchain.chains import LLMChain
 from dotenv import load_dotenv
+from app.services.llm_cache import get_llm_cache, run_cached_completion
+from app.services.llm_service import get_llm_service
+from app.services.playwright_codegen import map_step, render_test, split_step_snippets
 
 # Load environment variables
 load_dotenv()
@@ -13,18 +14,20 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("test_generator")
 
-# LLM setup
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Translate recognized steps into code directly, using the LLM only for the others
+TEMPLATE_CODEGEN = os.getenv("TEMPLATE_CODEGEN", "1") == "1"
 
 class PlaywrightTestGenerator:
     """Class for generating Playwright test automation code"""
     
-    def __init__(self):
-        if not OPENAI_API_KEY:
-            logger.warning("OpenAI API key not found. Test generation will not work.")
-            self.llm = None
-        else:
-            self.llm = OpenAI(temperature=0.2, api_key=OPENAI_API_KEY)
+    def __init__(self, service=None, cache=None, template_codegen=TEMPLATE_CODEGEN):
+        # Shared LLM client, concurrency limit and retry policy
+        self.service = service or get_llm_service()
+        
+        # Cache of LLM responses, pass False to disable it
+        self.cache = get_llm_cache() if cache is None else (cache or None)
+        
+        self.template_codegen = template_codegen
         
         # Prompt template for generating Playwright test code
         self.test_code_template = PromptTemplate(
@@ -53,72 +56,153 @@ class PlaywrightTestGenerator:
             """
         )
         
-        if self.llm:
-            self.code_chain = LLMChain(llm=self.llm, prompt=self.test_code_template)
+        # Prompt template for the steps the template code generator cannot translate
+        self.step_code_template = PromptTemplate(
+            input_variables=["test_steps", "app_url"],
+            template="""
+            You are an AI assistant that specializes in Playwright test automation.
+            
+            The following steps are part of a Playwright test in TypeScript for the app at {app_url}:
+            
+            {test_steps}
+            
+            For each step, write only the statements that perform it and verify its expected result,
+            using the `page` and `expect` variables already in scope. Do not include imports, test
+            declarations or statements for other steps.
+            
+            Start the statements of each step with a comment line of the form `// Step <step_number>`
+            and return all of them in a single ```typescript code block.
+            """
+        )
+    
+    def _parse_code(self, result):
+        # Extract code from the result
+        code_start = result.find('```typescript')
+        if code_start == -1:
+            code_start = result.find('```ts')
+        if code_start == -1:
+            code_start = result.find('```')
+            
+        if code_start != -1:
+            # Find the end of the code block
+            code_start = result.find('\n', code_start) + 1
+            code_end = result.find('```', code_start)
+            if code_end != -1:
+                return result[code_start:code_end].strip()
+            return result[code_start:].strip()
+        return result
+    
+    async def _generate_full_test(self, test_data, bypass_cache=None):
+        # Format test steps for prompt
+        test_steps_str = json.dumps(test_data, indent=2)
+        app_url = test_data.get("app_url", "https://example.com")
+        
+        # Run the prompt, reusing the response to identical prompts
+        return await run_cached_completion(
+            self.service,
+            self.test_code_template,
+            {"test_steps": test_steps_str, "app_url": app_url},
+            self._parse_code,
+            cache=self.cache,
+            bypass=bypass_cache
+        )
+    
+    async def _generate_step_code(self, test_data, steps, bypass_cache=None):
+        # Generate the statements of the given steps in one prompt
+        step_numbers = [step.get("step_number") for step in steps]
+        
+        def parse(result):
+            snippets = split_step_snippets(self._parse_code(result), step_numbers)
+            if snippets is None:
+                raise ValueError("Generated code does not cover every step")
+            return snippets
+        
+        return await run_cached_completion(
+            self.service,
+            self.step_code_template,
+            {
+                "test_steps": json.dumps(steps, separators=(",", ":")),
+                "app_url": test_data.get("app_url") or "https://example.com"
+            },
+            parse,
+            cache=self.cache,
+            bypass=bypass_cache
+        )
     
-    async def generate_test_code(self, test_data):
+    async def generate_test_code(self, test_data, bypass_cache=None):
         """
         Generate Playwright test code from test data
         
         Args:
             test_data: Extracted test steps data
+            bypass_cache: Skip the LLM response cache lookup for this call
             
         Returns:
             str: Generated Playwright test code
         """
-        if not self.llm:
-            raise RuntimeError("LLM not initialized. Check OpenAI API key.")
-        
         try:
-            # Format test steps for prompt
-            test_steps_str = json.dumps(test_data, indent=2)
-            app_url = test_data.get("app_url", "https://example.com")
-            
-            # Run the LLM chain
-            result = await self.code_chain.arun(
-                test_steps=test_steps_str,
-                app_url=app_url
-            )
-            
-            # Extract code from the result
-            code_start = result.find('```typescript')
-            if code_start == -1:
-                code_start = result.find('```ts')
-            if code_start == -1:
-                code_start = result.find('```')
-                
-            if code_start != -1:
-                # Find the end of the code block
-                code_start = result.find('\n', code_start) + 1
-                code_end = result.find('```', code_start)
-                if code_end != -1:
-                    code = result[code_start:code_end].strip()
+            if not self.template_codegen:
+                if not self.service.available:
+                    raise RuntimeError("LLM not initialized. Check OpenAI API key.")
+                return await self._generate_full_test(test_data, bypass_cache)
+            
+            # Translate recognized steps directly
+            app_url = test_data.get("app_url") or "https://example.com"
+            steps = test_data.get("steps", [])
+            step_code = {}
+            unmapped = []
+            for step in steps:
+                lines = map_step(step, app_url)
+                if lines is None:
+                    unmapped.append(step)
                 else:
-                    code = result[code_start:].strip()
-            else:
-                code = result
-                
-            return code
+                    step_code[step.get("step_number")] = lines
+            
+            logger.info(f"Translated {len(steps) - len(unmapped)} of {len(steps)} test steps without the LLM")
+            
+            if unmapped:
+                if not self.service.available:
+                    raise RuntimeError("LLM not initialized. Check OpenAI API key.")
+                try:
+                    step_code.update(await self._generate_step_code(test_data, unmapped, bypass_cache))
+                except ValueError as e:
+                    # Fall back to generating the whole test when the step code cannot be split
+                    logger.warning(f"Generating the whole test with the LLM: {e}")
+                    return await self._generate_full_test(test_data, bypass_cache)
+            
+            return render_test(test_data, step_code)
             
         except Exception as e:
             logger.error(f"Error generating test code: {e}")
             raise
 
-async def generate_test_automation(test_steps_data):
+# Process-wide generator, created on first use
+_generator = None
+
+def get_test_generator():
+    """Get the shared Playwright test generator"""
+    global _generator
+    
+    if _generator is None:
+        _generator = PlaywrightTestGenerator()
+    return _generator
+
+async def generate_test_automation(test_steps_data, bypass_cache=None):
     """
     Generate Playwright test automation code from test steps
     
     Args:
         test_steps_data: Extracted test steps data
+        bypass_cache: Skip the LLM response cache lookup for this call
         
     Returns:
         dict: Generated test code and metadata
     """
-    generator = PlaywrightTestGenerator()
+    generator = get_test_generator()
     
     try:
         # Generate test code
-        test_code = await generator.generate_test_code(test_steps_data)
+        test_code = await generator.generate_test_code(test_steps_data, bypass_cache=bypass_cache)
         
         # Generate test configuration
         test_name = test_steps_data.get("test_name", "Automated Test")
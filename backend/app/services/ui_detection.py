@@ -1,105 +1,388 @@
 import os
 import cv2
 import numpy as np
-import pytesseract
 import logging
 import tempfile
 import json
+import queue
+import asyncio
+import threading
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
 from pathlib import Path
+from app.services.ocr_backends import OCR_BACKEND, get_ocr_backend
+from app.services.analysis_cache import get_analysis_cache, frame_content_hash
+from app.services.ui_elements import detect_ui_element_table
+from app.services.frame_results import FrameResultsBuilder
+from app.services.frame_sampling import ADAPTIVE_SAMPLING, AdaptiveFrameSampler
+from app.services.ocr_preprocessing import OCR_ADAPTIVE_PREPROCESSING, adaptive_image_to_data, binarize, ocr_scale
+from app.services.roi_ocr import compute_changed_regions, merge_text_regions, offset_text_regions
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("ui_detection")
 
-# Default Tesseract path, may need configuration
-pytesseract.pytesseract.tesseract_cmd = r'/usr/bin/tesseract'  # Update with your Tesseract path
+# Number of decoded frames allowed to wait ahead of the analysis loop
+FRAME_LOOKAHEAD = int(os.getenv("FRAME_LOOKAHEAD", "4"))
+
+# Fraction of signature pixels that must change for a frame to be re-analyzed. A single
+# edited character changes only a handful of signature pixels, so by default any changed
+# pixel re-runs OCR rather than carrying stale text forward.
+FRAME_CHANGE_THRESHOLD = float(os.getenv("FRAME_CHANGE_THRESHOLD", "0"))
+
+# Size of the downscaled grayscale signature used for change detection, fine enough that
+# one changed glyph of 1080p UI text moves at least one signature pixel
+SIGNATURE_SIZE = (480, 270)
+
+# Minimum grayscale difference for a signature pixel to count as changed
+SIGNATURE_PIXEL_DELTA = 12
+
+# Re-OCR only the regions that changed since the last analyzed frame
+DIFFERENTIAL_OCR = os.getenv("DIFFERENTIAL_OCR", "1") == "1"
+
+# Reuse detection results for frames whose content was analyzed before
+ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "1") == "1"
+
+# Number of worker processes used for frame analysis (1 analyzes in a background thread)
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", str(os.cpu_count() or 1)))
+
+class FrameSource:
+    """Sequentially decoded, bounded-memory stream of sampled video frames
+    
+    Frames are decoded in order with grab()/retrieve() on a background thread, so
+    no keyframe re-seeking happens, and only sampled frames are converted to images.
+    At most `lookahead` frames wait in the queue, which keeps memory flat regardless
+    of the video length.
+    
+    With a sampler, frames are sampled where it decides instead of at a fixed rate.
+    """
+    
+    _DONE = object()
+    
+    def __init__(self, video_path, sample_rate=1, lookahead=FRAME_LOOKAHEAD, sampler=None):
+        self.video_path = video_path
+        self.lookahead = max(1, int(lookahead))
+        
+        self._cap = cv2.VideoCapture(video_path)
+        if not self._cap.isOpened():
+            raise ValueError(f"Could not open video file: {video_path}")
+        
+        # Get video properties
+        self.fps = self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.duration = self.frame_count / self.fps
+        
+        logger.info(f"Video: {self.frame_count} frames, {self.fps} fps, {self.duration:.2f} seconds")
+        
+        # Calculate frame extraction interval
+        self.interval = max(1, int(self.fps / sample_rate))
+        
+        # Adaptive sampling needs the video length, which some containers do not report
+        self.sampler = None
+        if sampler is not None:
+            if self.duration > 0:
+                self.sampler = sampler(self.fps, self.duration)
+            else:
+                logger.warning(f"Unknown length of {video_path}, sampling at a fixed rate")
+        
+        self._queue = queue.Queue(maxsize=self.lookahead)
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def __iter__(self):
+        if self._thread is not None:
+            raise RuntimeError("FrameSource can only be iterated once")
+        
+        self._thread = threading.Thread(target=self._decode, name="frame-decoder", daemon=True)
+        self._thread.start()
+        
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self.close()
+    
+    def _put(self, item):
+        # Block while the consumer is behind, but give up if the source is closed
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _decode(self):
+        try:
+            position = 0
+            while not self._stop.is_set():
+                if not self._cap.grab():
+                    break
+                
+                if self.sampler is not None:
+                    action = self.sampler.action(position)
+                    if action is not None:
+                        ret, frame = self._cap.retrieve()
+                        if (ret and self.sampler.accept(position, frame, action)
+                                and not self._put({"frame": frame, "timestamp": position / self.fps})):
+                            break
+                elif position % self.interval == 0:
+                    ret, frame = self._cap.retrieve()
+                    if ret and not self._put({"frame": frame, "timestamp": position / self.fps}):
+                        break
+                
+                position += 1
+            
+            if self.sampler is not None:
+                logger.info(f"Adaptive sampling: {self.sampler.stats}")
+            self._put(self._DONE)
+        except Exception as e:
+            logger.error(f"Error decoding frames: {e}")
+            self._put(e)
+    
+    def close(self):
+        """Stop decoding and release the video capture"""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+class FrameChangeGate:
+    """Decides whether a frame differs enough from the last analyzed frame to re-run OCR
+    
+    Frames are compared through a small downscaled grayscale signature by counting the
+    pixels that changed noticeably, which is cheap enough to run on every sampled frame
+    and, unlike a mean difference, is not diluted when only a few characters change.
+    """
+    
+    def __init__(self, threshold=FRAME_CHANGE_THRESHOLD, size=SIGNATURE_SIZE):
+        self.threshold = threshold
+        self.size = size
+        self._last_signature = None
+    
+    def signature(self, frame):
+        """Compute the downscaled grayscale signature of a frame"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA)
+    
+    def difference(self, signature):
+        """Fraction of pixels changed since the last analyzed frame (inf if there is none)"""
+        if self._last_signature is None:
+            return float("inf")
+        changed = cv2.absdiff(signature, self._last_signature) > SIGNATURE_PIXEL_DELTA
+        return float(np.count_nonzero(changed)) / changed.size
+    
+    def has_changed(self, frame):
+        """
+        Check a frame against the last analyzed frame
+        
+        The frame becomes the new reference only when it has changed, so slow drifts
+        still accumulate until they cross the threshold.
+        
+        Args:
+            frame: Frame image as numpy array
+            
+        Returns:
+            bool: True if the frame should be analyzed, False if results can be carried forward
+        """
+        signature = self.signature(frame)
+        if self.difference(signature) <= self.threshold:
+            return False
+        self._last_signature = signature
+        return True
 
 class UIElementDetector:
     """Class for detecting UI elements in video frames"""
     
-    def __init__(self):
+    def __init__(self, ocr_backend=OCR_BACKEND, cache=None, adaptive_ocr=OCR_ADAPTIVE_PREPROCESSING):
         # Common UI element templates (could be expanded)
         self.templates = {}
         
-    async def extract_frames(self, video_path, sample_rate=1):
+        # OCR engine name, the engine itself is created once per worker thread
+        self.ocr_backend = ocr_backend
+        
+        # Normalize the text size and tile large frames before OCR
+        self.adaptive_ocr = adaptive_ocr
+        
+        # Resize factor of the video's text for adaptive OCR, estimated from the first frame with text
+        self.video_ocr_scale = None
+        
+        # Optional AnalysisCache in front of detect_text and detect_ui_elements
+        self.cache = cache
+    
+    def cache_key(self, kind, frame_hash):
+        """Build the cache key of a detection kind ("text" or "ui") for a frame hash"""
+        if kind == "text":
+            mode = "adaptive" if self.adaptive_ocr else "full"
+            return f"text:{self.ocr_backend}:{mode}:{frame_hash}"
+        return f"{kind}:{frame_hash}"
+        
+    def iter_frames(self, video_path, sample_rate=1, lookahead=FRAME_LOOKAHEAD, sampler=None):
+        """
+        Stream frames from the video at specified sample rate
+        
+        Args:
+            video_path: Path to the video file
+            sample_rate: Number of frames to extract per second
+            lookahead: Maximum number of decoded frames buffered ahead of the consumer
+            sampler: Optional factory taking the fps and duration and returning an
+                AdaptiveFrameSampler-like object, used instead of the sample rate
+            
+        Returns:
+            FrameSource: Iterable yielding frame dicts one at a time
+        """
+        return FrameSource(video_path, sample_rate=sample_rate, lookahead=lookahead, sampler=sampler)
+    
+    async def extract_frames(self, video_path, sample_rate=1, sampler=None):
         """
         Extract frames from the video at specified sample rate
         
+        Prefer iter_frames for long videos, this keeps every sampled frame in memory.
+        
         Args:
             video_path: Path to the video file
             sample_rate: Number of frames to extract per second
+            sampler: Optional adaptive sampler factory, see iter_frames
             
         Returns:
             list: List of extracted frames as numpy arrays
         """
-        frames = []
         try:
-            # Open the video file
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                raise ValueError(f"Could not open video file: {video_path}")
-            
-            # Get video properties
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            duration = frame_count / fps
-            
-            logger.info(f"Video: {frame_count} frames, {fps} fps, {duration:.2f} seconds")
-            
-            # Calculate frame extraction interval
-            interval = int(fps / sample_rate)
-            if interval < 1:
-                interval = 1
-                
-            # Extract frames at the specified interval
-            frame_positions = []
-            current_position = 0
-            
-            while current_position < frame_count:
-                frame_positions.append(current_position)
-                current_position += interval
-                
-            for pos in frame_positions:
-                cap.set(cv2.CAP_PROP_POS_FRAMES, pos)
-                ret, frame = cap.read()
-                if ret:
-                    frames.append({
-                        "frame": frame,
-                        "timestamp": pos / fps
-                    })
-                
-            cap.release()
+            with self.iter_frames(video_path, sample_rate=sample_rate, sampler=sampler) as source:
+                frames = list(source)
             logger.info(f"Extracted {len(frames)} frames for analysis")
             return frames
         
         except Exception as e:
             logger.error(f"Error extracting frames: {e}")
-            if 'cap' in locals() and cap is not None:
-                cap.release()
             raise
     
-    async def detect_text(self, frame):
+    def text_scale(self, frame):
         """
-        Detect text in a frame using Tesseract OCR
+        Get the adaptive OCR resize factor of the video a frame belongs to
+        
+        The factor is estimated once, from the first frame with text, and reused
+        for the rest of the video.
         
         Args:
             frame: Frame image as numpy array
             
         Returns:
-            list: Detected text regions with coordinates and content
+            float: Resize factor, 1.0 until a frame with text is seen, or None without adaptive OCR
         """
-        try:
-            # Convert to grayscale for better OCR
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if not self.adaptive_ocr:
+            return None
+        if self.video_ocr_scale is None:
+            self.video_ocr_scale = ocr_scale(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), default=None)
+        return self.video_ocr_scale or 1.0
+    
+    def analyze_frame(self, frame, text_boxes=None, scale=None):
+        """
+        Run text and UI element detection on a frame synchronously
+        
+        This is the CPU-bound unit of work dispatched to analysis workers.
+        
+        Args:
+            frame: Frame image as numpy array
+            text_boxes: Optional (x, y, width, height) regions to restrict OCR to
+            scale: Adaptive OCR resize factor of the video, None estimates it from the frame
             
-            # Apply some preprocessing to improve OCR accuracy
-            gray = cv2.GaussianBlur(gray, (5, 5), 0)
+        Returns:
+            dict: Detected text regions and UI elements, plus the OCR'd regions (None for the full frame)
+        """
+        if text_boxes is None:
+            text_regions = self._detect_text(frame, scale)
+        else:
+            text_regions = self._detect_text_in_regions(frame, text_boxes, scale)
+        
+        return {
+            "text_regions": text_regions,
+            "ui_elements": self._detect_ui_elements(frame),
+            "text_boxes": text_boxes
+        }
+    
+    async def detect_text(self, frame, previous_frame=None, previous_regions=None):
+        """
+        Detect text in a frame using Tesseract OCR
+        
+        When the previous analyzed frame and its text regions are given, only the
+        regions that changed are OCR'd and the unchanged text is carried over.
+        
+        Args:
+            frame: Frame image as numpy array
+            previous_frame: Optional previous analyzed frame for differential OCR
+            previous_regions: Text regions detected in previous_frame
             
-            # Apply threshold to get black and white image
-            _, binary = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        Returns:
+            list: Detected text regions with coordinates and content
+        """
+        key = self.cache_key("text", frame_content_hash(frame)) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        changed_boxes = None
+        if previous_frame is not None and previous_regions is not None:
+            changed_boxes = compute_changed_regions(previous_frame, frame, previous_regions=previous_regions)
+        
+        scale = self.text_scale(frame)
+        if changed_boxes is None:
+            text_regions = self._detect_text(frame, scale)
+        else:
+            new_regions = self._detect_text_in_regions(frame, changed_boxes, scale)
+            text_regions = merge_text_regions(previous_regions, new_regions, changed_boxes)
+        
+        if key is not None:
+            self.cache.put(key, text_regions)
+        return text_regions
+    
+    def _detect_text_in_regions(self, frame, boxes, scale=None):
+        # Crops are too small to estimate the text size from, so they share the video's
+        if scale is None and self.adaptive_ocr:
+            scale = ocr_scale(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+        
+        text_regions = []
+        for x, y, w, h in boxes:
+            crop = frame[y:y + h, x:x + w]
+            text_regions.extend(offset_text_regions(self._detect_text(crop, scale), x, y))
+        return text_regions
+    
+    def preprocess_for_ocr(self, frame):
+        """
+        Convert a frame into the binary image passed to the OCR engine
+        
+        Args:
+            frame: Frame image as numpy array
             
+        Returns:
+            numpy.ndarray: Single channel binary image
+        """
+        # Convert to grayscale, blur and threshold to a black and white image
+        return binarize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    
+    def _detect_text(self, frame, scale=None):
+        try:
             # Get OCR data including bounding boxes
-            ocr_data = pytesseract.image_to_data(binary, output_type=pytesseract.Output.DICT)
+            if self.adaptive_ocr:
+                ocr_data = adaptive_image_to_data(frame, self.ocr_backend, scale=scale)
+            else:
+                ocr_data = get_ocr_backend(self.ocr_backend).image_to_data(self.preprocess_for_ocr(frame))
             
             text_regions = []
             n_boxes = len(ocr_data['text'])
@@ -136,103 +419,305 @@ class UIElementDetector:
         Returns:
             list: Detected UI elements
         """
+        key = self.cache_key("ui", frame_content_hash(frame)) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        ui_elements = self._detect_ui_elements(frame)
+        
+        if key is not None:
+            self.cache.put(key, ui_elements)
+        return ui_elements
+    
+    def _detect_ui_elements(self, frame):
         try:
-            # Convert to grayscale
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Detect edges
-            edges = cv2.Canny(gray, 50, 150)
-            
-            # Find contours
-            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            # Filter contours to find potential UI elements (buttons, textboxes, etc.)
-            ui_elements = []
-            
-            for contour in contours:
-                # Calculate contour area and perimeter
-                area = cv2.contourArea(contour)
-                perimeter = cv2.arcLength(contour, True)
-                
-                # Filter out very small contours
-                if area < 100:
-                    continue
-                
-                # Approximate the contour shape
-                approx = cv2.approxPolyDP(contour, 0.02 * perimeter, True)
-                
-                # Get bounding rectangle
-                x, y, w, h = cv2.boundingRect(contour)
-                
-                # Determine element type based on shape
-                if len(approx) == 4:  # Rectangular elements (likely buttons, text fields)
-                    aspect_ratio = float(w) / h
-                    
-                    if 0.9 <= aspect_ratio <= 1.1:  # Square - could be a button
-                        element_type = "button"
-                    elif aspect_ratio > 2:  # Wide rectangle - could be a text field
-                        element_type = "text_field"
-                    else:
-                        element_type = "rectangle"
-                        
-                    ui_elements.append({
-                        "type": element_type,
-                        "position": {
-                            "x": x,
-                            "y": y,
-                            "width": w,
-                            "height": h
-                        }
-                    })
-            
-            return ui_elements
+            # Edge contours are filtered and classified in batch into an array-backed table
+            return detect_ui_element_table(frame).to_list()
             
         except Exception as e:
             logger.error(f"Error detecting UI elements: {e}")
             raise
 
-async def analyze_video_ui(video_path):
+
+# Per-process detector used by analysis workers
+_worker_detector = None
+
+# Process-wide pool shared by all analyses, created on first use
+_analysis_executor = None
+_analysis_executor_workers = None
+_analysis_executor_lock = threading.Lock()
+
+
+def _init_analysis_worker():
+    global _worker_detector
+    _worker_detector = UIElementDetector()
+
+
+def _init_analysis_process():
+    # Frames are already spread over the worker processes, so Tesseract's OpenMP
+    # threads would only oversubscribe the CPU. Set before any engine is loaded.
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    _init_analysis_worker()
+
+
+def _analyze_frame(frame, text_boxes=None, scale=None):
+    if _worker_detector is None:
+        _init_analysis_worker()
+    return _worker_detector.analyze_frame(frame, text_boxes, scale)
+
+
+def _analyze_shared_frame(shm_name, shape, dtype, text_boxes=None, scale=None):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        frame = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        try:
+            return _analyze_frame(frame, text_boxes, scale)
+        finally:
+            del frame
+    finally:
+        shm.close()
+
+
+def get_analysis_executor(workers=ANALYSIS_WORKERS):
+    """
+    Get the shared frame analysis executor, creating it on first use
+    
+    Args:
+        workers: Number of worker processes, 1 uses a single background thread
+        
+    Returns:
+        Executor: Process pool (or thread pool) running frame analysis
+    """
+    global _analysis_executor, _analysis_executor_workers
+    
+    workers = max(1, int(workers))
+    with _analysis_executor_lock:
+        if _analysis_executor is not None and _analysis_executor_workers != workers:
+            _analysis_executor.shutdown(wait=True)
+            _analysis_executor = None
+        
+        if _analysis_executor is None:
+            if workers == 1:
+                _analysis_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="frame-analysis")
+            else:
+                _analysis_executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_analysis_process
+                )
+            _analysis_executor_workers = workers
+            logger.info(f"Started frame analysis executor with {workers} workers")
+        
+        return _analysis_executor
+
+
+def shutdown_analysis_workers():
+    """Shut down the shared frame analysis executor"""
+    global _analysis_executor, _analysis_executor_workers
+    
+    with _analysis_executor_lock:
+        if _analysis_executor is not None:
+            _analysis_executor.shutdown(wait=True, cancel_futures=True)
+            _analysis_executor = None
+            _analysis_executor_workers = None
+
+
+class ParallelFrameAnalyzer:
+    """Dispatches frame analysis to the worker pool without blocking the event loop
+    
+    Frames are copied once into a shared memory block that workers attach to, rather
+    than pickling the full array. The number of frames in flight is bounded so memory
+    stays flat while the decoder keeps the pool busy.
+    """
+    
+    def __init__(self, workers=ANALYSIS_WORKERS, max_in_flight=None):
+        self.workers = max(1, int(workers))
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self._executor = get_analysis_executor(self.workers)
+        self._pending = set()
+    
+    async def submit(self, frame, text_boxes=None, scale=None):
+        """
+        Schedule a frame for analysis, waiting while too many frames are in flight
+        
+        Args:
+            frame: Frame image as numpy array
+            text_boxes: Optional (x, y, width, height) regions to restrict OCR to
+            scale: Adaptive OCR resize factor of the video
+            
+        Returns:
+            asyncio.Task: Task resolving to the frame's detection results
+        """
+        while len(self._pending) >= self.max_in_flight:
+            await asyncio.wait(self._pending, return_when=asyncio.FIRST_COMPLETED)
+        
+        task = asyncio.ensure_future(self._run(frame, text_boxes, scale))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return task
+    
+    async def _run(self, frame, text_boxes, scale):
+        loop = asyncio.get_running_loop()
+        
+        if self.workers == 1:
+            return await loop.run_in_executor(self._executor, _analyze_frame, frame, text_boxes, scale)
+        
+        shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        try:
+            np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)[:] = frame
+            return await loop.run_in_executor(
+                self._executor, _analyze_shared_frame, shm.name, frame.shape, frame.dtype.str, text_boxes, scale
+            )
+        finally:
+            shm.close()
+            shm.unlink()
+    
+    def cancel(self):
+        """Cancel all frames still waiting for analysis"""
+        for task in list(self._pending):
+            task.cancel()
+
+
+def _get_cached_detection(detector, frame_hash):
+    text_regions = detector.cache.get(detector.cache_key("text", frame_hash))
+    if text_regions is None:
+        return None
+    ui_elements = detector.cache.get(detector.cache_key("ui", frame_hash))
+    if ui_elements is None:
+        return None
+    return {"text_regions": text_regions, "ui_elements": ui_elements, "text_boxes": None}
+
+
+def _lookup_frame(detector, frame):
+    # Hash a frame and look it up, run off the event loop as the disk tier may block
+    frame_hash = frame_content_hash(frame)
+    return frame_hash, _get_cached_detection(detector, frame_hash)
+
+
+def _store_detection(detector, frame_hash, text_regions, ui_elements):
+    detector.cache.put(detector.cache_key("text", frame_hash), text_regions)
+    detector.cache.put(detector.cache_key("ui", frame_hash), ui_elements)
+
+
+async def analyze_video_ui(video_path, change_threshold=FRAME_CHANGE_THRESHOLD, workers=ANALYSIS_WORKERS,
+                           differential=DIFFERENTIAL_OCR, use_cache=ANALYSIS_CACHE_ENABLED, columnar=False,
+                           adaptive=ADAPTIVE_SAMPLING, speech_segments=None):
     """
     Analyze a video to detect UI elements and text
     
+    Frames that are visually unchanged since the last analyzed frame reuse its
+    results and are marked as carried forward. The remaining frames are analyzed
+    in parallel by the worker pool and collected back in timestamp order. With
+    differential OCR, only the regions that changed since the previous analyzed
+    frame are OCR'd and merged with the text carried over from it. Frames whose
+    content is already in the analysis cache skip detection entirely.
+    
+    With adaptive sampling, frames are sampled densely around narrated actions and
+    visual changes and sparsely elsewhere, under a per-video frame budget, instead
+    of once per second.
+    
     Args:
         video_path: Path to the video file
+        change_threshold: Fraction of changed signature pixels needed to re-analyze a frame, None analyzes every frame
+        workers: Number of analysis worker processes
+        differential: Whether to OCR only changed regions between analyzed frames
+        use_cache: Whether to look up and store results in the shared analysis cache
+        columnar: Return columnar FrameResults instead of a dict of per-frame dicts
+        adaptive: Whether to sample frames adaptively instead of once per second
+        speech_segments: Transcript segments guiding adaptive sampling, None samples by visual change only
         
     Returns:
-        dict: Analysis results with detected UI elements and text
+        dict: Analysis results with detected UI elements and text, or FrameResults if columnar
     """
-    detector = UIElementDetector()
+    cache = get_analysis_cache() if use_cache else None
+    detector = UIElementDetector(cache=cache)
+    gate = FrameChangeGate(threshold=change_threshold) if change_threshold is not None else None
+    analyzer = ParallelFrameAnalyzer(workers=workers)
+    sampler = partial(AdaptiveFrameSampler, segments=speech_segments) if adaptive else None
+    loop = asyncio.get_running_loop()
     
     try:
-        # Extract frames from the video (1 frame per second)
-        frames = await detector.extract_frames(video_path, sample_rate=1)
+        entries = []
+        analysis = None
+        reference_frame = None
+        analyzed_count = 0
         
-        results = []
+        # Stream frames from the video (adaptively or 1 frame per second), one at a time
+        with detector.iter_frames(video_path, sample_rate=1, sampler=sampler) as frames:
+            frame_iter = iter(frames)
+            while True:
+                frame_data = await asyncio.to_thread(next, frame_iter, None)
+                if frame_data is None:
+                    break
+                
+                frame = frame_data["frame"]
+                timestamp = frame_data["timestamp"]
+                
+                # Skip detection when nothing changed since the last analyzed frame
+                carried_forward = gate is not None and not gate.has_changed(frame)
+                
+                frame_hash = None
+                if not carried_forward:
+                    cached = None
+                    if cache is not None:
+                        frame_hash, cached = await asyncio.to_thread(_lookup_frame, detector, frame)
+                    
+                    if cached is not None:
+                        analysis = loop.create_future()
+                        analysis.set_result(cached)
+                        frame_hash = None
+                    else:
+                        text_boxes = compute_changed_regions(reference_frame, frame) if differential else None
+                        analysis = await analyzer.submit(frame, text_boxes, detector.text_scale(frame))
+                        analyzed_count += 1
+                    reference_frame = frame
+                
+                entries.append((timestamp, analysis, carried_forward, frame_hash))
         
-        # Process each frame
-        for frame_data in frames:
-            frame = frame_data["frame"]
-            timestamp = frame_data["timestamp"]
-            
-            # Detect text
-            text_regions = await detector.detect_text(frame)
+        results = []
+        builder = FrameResultsBuilder() if columnar else None
+        text_regions = []
+        for timestamp, analysis, carried_forward, frame_hash in entries:
+            detection = await analysis
             
-            # Detect UI elements
-            ui_elements = await detector.detect_ui_elements(frame)
+            # Merge patch OCR results with the text of the previous analyzed frame
+            if not carried_forward:
+                if detection["text_boxes"] is None:
+                    text_regions = detection["text_regions"]
+                else:
+                    text_regions = merge_text_regions(text_regions, detection["text_regions"], detection["text_boxes"])
+                
+                # Only freshly analyzed frames have a hash to store
+                if frame_hash is not None:
+                    await asyncio.to_thread(_store_detection, detector, frame_hash, text_regions,
+                                            detection["ui_elements"])
             
-            # Save results for this frame
+            # Save results for this frame, carried-forward frames share the rows of the previous one
+            if builder is not None:
+                builder.add_frame(timestamp, text_regions, detection["ui_elements"], carried_forward)
+                continue
             results.append({
                 "timestamp": timestamp,
                 "timestamp_formatted": f"{int(timestamp // 60):02d}:{int(timestamp % 60):02d}",
                 "text_regions": text_regions,
-                "ui_elements": ui_elements
+                "ui_elements": detection["ui_elements"],
+                "carried_forward": carried_forward
             })
         
+        logger.info(f"Analyzed {analyzed_count} of {len(entries)} frames, the rest were unchanged or cached")
+        if cache is not None:
+            logger.info(f"Analysis cache: {cache.stats()}")
+        
+        if builder is not None:
+            return builder.build()
         return {
-            "frame_count": len(frames),
+            "frame_count": len(results),
             "results": results
         }
         
     except Exception as e:
         logger.error(f"Error analyzing video: {e}")
-        raise 
\ No newline at end of file
+        analyzer.cancel()
+        raise
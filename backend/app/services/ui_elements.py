@@ -0,0 +1,243 @@
+import sys
+import time
+import logging
+import cv2
+import numpy as np
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("ui_elements")
+
+# Contours enclosing fewer pixels are ignored
+MIN_ELEMENT_AREA = 100
+
+# Polygon approximation tolerance as a fraction of the contour perimeter
+APPROX_EPSILON = 0.02
+
+# Element types by their code in an element table
+ELEMENT_TYPES = ("button", "text_field", "rectangle")
+BUTTON, TEXT_FIELD, RECTANGLE = range(len(ELEMENT_TYPES))
+
+
+class UIElementTable:
+    """Detected UI elements as parallel arrays
+
+    `types` holds a code into ELEMENT_TYPES per element and `boxes` the
+    (x, y, width, height) of each element, so large detections stay compact
+    and can be filtered with NumPy without building a dict per element.
+    """
+
+    __slots__ = ("types", "boxes")
+
+    def __init__(self, types=None, boxes=None):
+        self.types = np.zeros(0, dtype=np.uint8) if types is None else types
+        self.boxes = np.zeros((0, 4), dtype=np.int32) if boxes is None else boxes
+
+    def __len__(self):
+        return len(self.types)
+
+    def to_list(self):
+        """
+        Convert to the element dicts used in analysis results
+
+        Returns:
+            list: Dicts with the element type and position
+        """
+        return [
+            {
+                "type": ELEMENT_TYPES[code],
+                "position": {"x": x, "y": y, "width": w, "height": h}
+            }
+            for code, (x, y, w, h) in zip(self.types.tolist(), self.boxes.tolist())
+        ]
+
+
+def contour_boxes(contours):
+    """
+    Compute the point counts and bounding boxes of many contours at once
+
+    All contour points are concatenated into one array and reduced per contour, so
+    the extents of every contour come from a few NumPy calls instead of one OpenCV
+    call per contour.
+
+    Args:
+        contours: Contours from cv2.findContours
+
+    Returns:
+        tuple: Point counts and (x, y, width, height) boxes as arrays
+    """
+    if len(contours) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 4), dtype=np.int32)
+
+    counts = np.fromiter(map(len, contours), dtype=np.int64, count=len(contours))
+    points = np.concatenate(contours).reshape(-1, 2)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    x, y = points[:, 0], points[:, 1]
+    left, top = np.minimum.reduceat(x, starts), np.minimum.reduceat(y, starts)
+    right, bottom = np.maximum.reduceat(x, starts), np.maximum.reduceat(y, starts)
+    boxes = np.stack([left, top, right - left + 1, bottom - top + 1], axis=1).astype(np.int32)
+
+    return counts, boxes
+
+
+def classify_contours(contours, min_area=MIN_ELEMENT_AREA):
+    """
+    Classify contours into UI elements with vectorized filters
+
+    A contour encloses less area than its bounding box, so contours whose box is
+    smaller than `min_area`, or that have too few points to form a quadrilateral,
+    are dropped with array masks. Area, perimeter and polygon approximation then
+    only run on the survivors, and the aspect-ratio rules are applied as masks.
+
+    Args:
+        contours: Contours from cv2.findContours
+        min_area: Minimum contour area in pixels
+
+    Returns:
+        UIElementTable: Rectangular elements in contour order
+    """
+    counts, boxes = contour_boxes(contours)
+
+    box_areas = boxes[:, 2].astype(np.int64) * boxes[:, 3]
+    candidates = np.flatnonzero((counts >= 4) & (box_areas >= min_area)).tolist()
+
+    quads = []
+    for i in candidates:
+        contour = contours[i]
+        if cv2.contourArea(contour) < min_area:
+            continue
+        approx = cv2.approxPolyDP(contour, APPROX_EPSILON * cv2.arcLength(contour, True), True)
+        if len(approx) == 4:
+            quads.append(i)
+
+    boxes = boxes[np.array(quads, dtype=np.int64)]
+    aspect = boxes[:, 2] / boxes[:, 3]
+    types = np.full(len(quads), RECTANGLE, dtype=np.uint8)
+    types[aspect > 2] = TEXT_FIELD
+    types[(aspect >= 0.9) & (aspect <= 1.1)] = BUTTON
+
+    return UIElementTable(types, boxes)
+
+
+def find_ui_contours(frame):
+    """Find the external edge contours of a frame"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    edges = cv2.Canny(gray, 50, 150)
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return contours
+
+
+def detect_ui_element_table(frame, min_area=MIN_ELEMENT_AREA):
+    """
+    Detect rectangular UI elements (buttons, text fields, boxes) in a frame
+
+    Args:
+        frame: Frame image as numpy array
+        min_area: Minimum contour area in pixels
+
+    Returns:
+        UIElementTable: The detected elements
+    """
+    return classify_contours(find_ui_contours(frame), min_area)
+
+
+def classify_contours_loop(contours, min_area=MIN_ELEMENT_AREA):
+    """Reference per-contour implementation of classify_contours, used for benchmarking"""
+    ui_elements = []
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        perimeter = cv2.arcLength(contour, True)
+        if area < min_area:
+            continue
+
+        approx = cv2.approxPolyDP(contour, APPROX_EPSILON * perimeter, True)
+        x, y, w, h = cv2.boundingRect(contour)
+        if len(approx) == 4:
+            aspect_ratio = float(w) / h
+            if 0.9 <= aspect_ratio <= 1.1:
+                element_type = "button"
+            elif aspect_ratio > 2:
+                element_type = "text_field"
+            else:
+                element_type = "rectangle"
+            ui_elements.append({
+                "type": element_type,
+                "position": {"x": x, "y": y, "width": w, "height": h}
+            })
+    return ui_elements
+
+
+def synthetic_ui_frame(seed=0, width=1920, height=1080, widgets=400):
+    """
+    Draw a busy synthetic UI screenshot of buttons, fields, labels and noise
+
+    Args:
+        seed: Random seed
+        width: Frame width in pixels
+        height: Frame height in pixels
+        widgets: Number of widgets to draw
+
+    Returns:
+        numpy.ndarray: BGR frame
+    """
+    rng = np.random.default_rng(seed)
+    frame = np.full((height, width, 3), 245, dtype=np.uint8)
+
+    for _ in range(widgets):
+        x, y = int(rng.integers(0, width - 200)), int(rng.integers(0, height - 60))
+        kind = rng.integers(0, 3)
+        if kind == 0:
+            size = int(rng.integers(20, 60))
+            cv2.rectangle(frame, (x, y), (x + size, y + size), (90, 90, 200), -1)
+        elif kind == 1:
+            cv2.rectangle(frame, (x, y), (x + int(rng.integers(120, 200)), y + 30), (60, 60, 60), 1)
+        else:
+            cv2.putText(frame, "Label %d" % rng.integers(1000), (x, y + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
+                        (20, 20, 20), 1)
+
+    # Sensor-like noise produces many tiny contours, as in screen recordings
+    noise = rng.integers(0, 2, size=(height, width), dtype=np.uint8) * rng.integers(0, 60, size=(height, width),
+                                                                                       dtype=np.uint8)
+    frame = cv2.subtract(frame, cv2.merge([noise, noise, noise]))
+    return frame
+
+
+def benchmark_ui_element_detection(frames, repeat=5):
+    """
+    Compare the vectorized contour classification with the per-contour loop
+
+    Args:
+        frames: Frame images as numpy arrays
+        repeat: Number of passes over the frames per implementation
+
+    Returns:
+        dict: Contours per frame, ms per frame of each implementation and whether they agree
+    """
+    contour_sets = [find_ui_contours(frame) for frame in frames]
+
+    timings = {}
+    for name, classify in (("loop", classify_contours_loop),
+                           ("vectorized", lambda contours: classify_contours(contours).to_list())):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            results = [classify(contours) for contours in contour_sets]
+        timings[name] = (time.perf_counter() - start) * 1000 / max(1, repeat * len(frames))
+        timings[name + "_results"] = results
+
+    return {
+        "contours_per_frame": round(sum(map(len, contour_sets)) / max(1, len(frames)), 1),
+        "loop_ms_per_frame": round(timings["loop"], 3),
+        "vectorized_ms_per_frame": round(timings["vectorized"], 3),
+        "speedup": round(timings["loop"] / max(timings["vectorized"], 1e-9), 2),
+        "identical": timings["loop_results"] == timings["vectorized_results"]
+    }
+
+
+if __name__ == "__main__":
+    # Usage: python -m app.services.ui_elements [frames] [widgets]
+    frame_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    widgets = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+
+    frames = [synthetic_ui_frame(seed, widgets=widgets) for seed in range(frame_count)]
+    print(benchmark_ui_element_detection(frames))
@@ -0,0 +1,38 @@
+import cv2
+import numpy as np
+from app.services import analysis_cache
+from app.services.analysis_cache import AnalysisCache, frame_content_hash
+
+
+def ui_frame(label):
+    frame = np.full((1080, 1920, 3), 245, dtype=np.uint8)
+    cv2.putText(frame, label, (600, 500), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (30, 30, 30), 1, cv2.LINE_AA)
+    return frame
+
+
+def test_frames_differing_by_one_word_have_different_keys():
+    for before, after in [("john", "jane"), ("2024-01-01", "2024-07-01"), ("Amount: 1200", "Amount: 1700")]:
+        assert frame_content_hash(ui_frame(before)) != frame_content_hash(ui_frame(after))
+    assert frame_content_hash(ui_frame("john")) == frame_content_hash(ui_frame("john"))
+
+
+def test_background_noise_does_not_change_the_key():
+    frame = ui_frame("Account settings")
+    noisy = frame.astype(np.int16)
+    noisy[:400] += np.random.default_rng(0).integers(-6, 7, noisy[:400].shape, dtype=np.int16)
+
+    assert frame_content_hash(noisy.astype(np.uint8)) == frame_content_hash(frame)
+
+
+def test_disk_tier_evicts_least_recently_used_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis_cache, "DISK_EVICTION_CHECK_INTERVAL", 10)
+    cache = AnalysisCache(max_bytes=0, path=str(tmp_path / "cache.sqlite3"), disk_max_entries=20)
+
+    for i in range(30):
+        cache.put(f"key{i}", [i])
+
+    disk = cache._disk()
+    keys = {row[0] for row in disk.execute("SELECT key FROM analysis_cache")}
+    assert len(keys) == 18
+    assert "key0" not in keys and "key29" in keys
+    assert cache.get("key29") == [29]
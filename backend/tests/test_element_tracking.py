@@ -0,0 +1,56 @@
+from app.services.element_tracking import ElementTracker
+
+
+def text(label, x, y, width=100, height=20):
+    return {"text": label, "confidence": 0.9, "position": {"x": x, "y": y, "width": width, "height": height}}
+
+
+def elements_by_id(tracker):
+    return {element["id"]: element for element in tracker.result()["elements"]}
+
+
+def test_small_moves_keep_the_id():
+    tracker = ElementTracker(position_tolerance=4)
+    tracker.update(0.0, [text("Login", 100, 100)], [])
+    tracker.update(1.0, [text("Login", 102, 101)], [])
+    tracker.update(2.0, [text("Login", 110, 100)], [])
+
+    elements = tracker.result()["elements"]
+    assert len(elements) == 1
+    assert elements[0]["first_seen"] == 0.0 and elements[0]["last_seen"] == 2.0
+    # Only the move beyond the tolerance is recorded
+    assert [change["position"]["x"] for change in elements[0]["position_changes"]] == [110]
+
+
+def test_new_elements_get_new_ids():
+    tracker = ElementTracker()
+    tracker.update(0.0, [text("Login", 100, 100)], [])
+    tracker.update(1.0, [text("Login", 100, 100), text("Login", 100, 300), text("Sign up", 100, 100)],
+                   [{"type": "button", "position": {"x": 100, "y": 100, "width": 100, "height": 20}}])
+
+    elements = elements_by_id(tracker)
+    assert len(elements) == 4
+    assert elements[0]["text"] == "Login" and elements[0]["first_seen"] == 0.0
+    assert all(element["first_seen"] == 1.0 for element in list(elements.values())[1:])
+
+
+def test_overlapping_candidates_are_not_swapped():
+    tracker = ElementTracker()
+    tracker.update(0.0, [text("Save", 0, 0), text("Save", 20, 0)], [])
+    # Each detection overlaps both tracks above the threshold, listed in the opposite order
+    tracker.update(1.0, [text("Save", 22, 0), text("Save", 2, 0)], [])
+
+    elements = elements_by_id(tracker)
+    assert len(elements) == 2
+    assert elements[0]["position"]["x"] == 0 and elements[1]["position"]["x"] == 20
+    assert all(element["last_seen"] == 1.0 for element in elements.values())
+
+
+def test_tracks_end_after_the_gap():
+    tracker = ElementTracker(max_gap_seconds=2)
+    tracker.update(0.0, [text("Login", 100, 100)], [])
+    tracker.update(1.0, [], [])
+    tracker.update(5.0, [], [])
+    tracker.update(6.0, [text("Login", 100, 100)], [])
+
+    assert [element["first_seen"] for element in tracker.result()["elements"]] == [0.0, 6.0]
@@ -0,0 +1,62 @@
+import cv2
+import numpy as np
+import pytest
+from app.services.ui_detection import FrameChangeGate
+
+
+def ui_frame(label):
+    frame = np.full((1080, 1920, 3), 245, dtype=np.uint8)
+    cv2.putText(frame, "Account settings", (40, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+    cv2.putText(frame, label, (600, 500), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (30, 30, 30), 1, cv2.LINE_AA)
+    return frame
+
+
+@pytest.mark.parametrize("before, after", [
+    ("john", "jane"),
+    ("Amount: 1200", "Amount: 1700"),
+    ("2024-01-01", "2024-07-01"),
+    ("$10.00", "$70.00"),
+    ("", "ab"),
+])
+def test_single_edited_label_reruns_ocr(before, after):
+    gate = FrameChangeGate()
+    assert gate.has_changed(ui_frame(before))
+    assert gate.has_changed(ui_frame(after))
+
+
+def test_identical_frame_is_carried_forward():
+    gate = FrameChangeGate()
+    assert gate.has_changed(ui_frame("john"))
+    assert not gate.has_changed(ui_frame("john"))
+
+
+def test_changes_within_threshold_are_carried_forward():
+    gate = FrameChangeGate(threshold=0.01)
+    assert gate.has_changed(ui_frame("john"))
+    assert not gate.has_changed(ui_frame("jane"))
+
+
+def test_changes_above_threshold_rerun_ocr():
+    gate = FrameChangeGate(threshold=0.01)
+    frame = ui_frame("john")
+    assert gate.has_changed(frame)
+
+    # A dialog covering a fifth of the screen
+    dialog = frame.copy()
+    dialog[300:700, 600:1400] = 80
+    assert gate.has_changed(dialog)
+
+
+def test_slow_drift_accumulates_against_the_last_analyzed_frame():
+    gate = FrameChangeGate(threshold=0.01)
+    frame = ui_frame("")
+    assert gate.has_changed(frame)
+
+    # Each step changes a little under the threshold, the total does not
+    results = []
+    for step in range(1, 6):
+        drifted = frame.copy()
+        drifted[:, :step * 4] = 0
+        results.append(gate.has_changed(drifted))
+    assert results[0] is False
+    assert True in results
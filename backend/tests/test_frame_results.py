@@ -0,0 +1,60 @@
+import json
+import os
+import pytest
+from app.models import VideoAnalysisResult
+from app.services import frame_results
+from app.services.frame_results import FrameResults, FrameResultsBuilder
+
+
+def build(text, frames=1):
+    builder = FrameResultsBuilder()
+    for index in range(frames):
+        region = {"text": text, "confidence": 90.0, "position": {"x": 1, "y": 2, "width": 3, "height": 4}}
+        builder.add_frame(float(index), [region], [])
+    return builder.build()
+
+
+def texts(results):
+    return [region["text"] for frame in results.iter_frames() for region in frame["text_regions"]]
+
+
+def test_save_replaces_previous_results(tmp_path):
+    path = str(tmp_path / "ui_analysis.frames")
+    build("old", frames=2).save(path)
+    build("new").save(path)
+
+    assert texts(FrameResults.load(path)) == ["new"]
+    assert os.listdir(tmp_path) == ["ui_analysis.frames"]
+
+
+def test_failed_swap_keeps_previous_results(tmp_path, monkeypatch):
+    path = str(tmp_path / "ui_analysis.frames")
+    build("old").save(path)
+
+    real_replace = os.replace
+    calls = []
+
+    def crash_on_second_replace(src, dst):
+        calls.append(src)
+        if len(calls) == 2:
+            raise OSError("crashed")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(frame_results.os, "replace", crash_on_second_replace)
+    with pytest.raises(OSError):
+        build("new").save(path)
+
+    aside = [name for name in os.listdir(tmp_path) if name.endswith(".old")]
+    assert len(aside) == 1
+    assert texts(FrameResults.load(str(tmp_path / aside[0]))) == ["old"]
+
+
+def test_result_serializes_frame_results_lazily():
+    results = build("hello", frames=2)
+    result = VideoAnalysisResult(id="job", video_url="file:///video.mp4")
+    result.ui_analysis = results
+
+    assert result.ui_analysis is results
+    dumped = json.loads(result.model_dump_json())
+    assert dumped["ui_analysis"] == json.loads(results.to_model().model_dump_json())
+    assert VideoAnalysisResult.model_validate(dumped).ui_analysis.frame_count == 2
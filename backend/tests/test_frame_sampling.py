@@ -0,0 +1,58 @@
+import numpy as np
+from app.services.frame_sampling import AdaptiveFrameSampler, frame_budget, plan_sample_times
+
+SEGMENTS = [{"start": 10.0, "end": 12.0}, {"start": 30.0, "end": 31.0}, {"start": 31.5, "end": 40.0}]
+
+
+def frame(value):
+    return np.full((36, 64, 3), value, dtype=np.uint8)
+
+
+def test_frame_budget_scales_with_duration():
+    assert frame_budget(10, max_frames=900, rate=0.75) == 7
+    assert frame_budget(3600, max_frames=900, rate=0.75) == 900
+    assert frame_budget(0.5, max_frames=900, rate=0.75) == 1
+
+
+def test_schedule_is_dense_around_speech_and_within_budget():
+    times = plan_sample_times(60.0, SEGMENTS, budget=1000, speech_rate=2, idle_rate=0.2, lead=1, tail=2)
+
+    assert times[0] == 0.0
+    assert times == sorted(times)
+    in_speech = [t for t in times if 9 <= t <= 14 or 29 <= t <= 42]
+    # 5 + 13 seconds of speech at 2 fps, the remaining 42 seconds at 0.2 fps
+    assert len(in_speech) >= 34
+    assert len(times) - len(in_speech) <= 10
+
+
+def test_schedule_is_scaled_down_to_the_budget():
+    for budget in (1, 5, 20):
+        times = plan_sample_times(600.0, SEGMENTS, budget=budget)
+        assert times[0] == 0.0
+        assert 1 <= len(times) <= budget
+    assert plan_sample_times(0.0, SEGMENTS, budget=10) == []
+
+
+def test_sampler_samples_the_first_frame_and_uses_up_change_probes():
+    fps, duration, budget = 10, 60.0, 10
+    sampler = AdaptiveFrameSampler(fps, duration, budget=budget, probe_rate=4)
+    assert sampler.action(0) == "sample"
+
+    sampled = []
+    actions = []
+    for position in range(int(fps * duration)):
+        action = sampler.action(position)
+        actions.append(action)
+        # Every frame differs from the one before, so every probe finds a change
+        if action is not None and sampler.accept(position, frame(255 * (position % 4 == 0)), action):
+            sampled.append(position)
+
+    assert sampled[0] == 0
+    assert len(sampled) <= budget
+    assert sampler.stats["changes"] > 0
+    assert sampler.stats["scheduled"] + sampler.stats["changes"] == len(sampled)
+
+    # Once the change budget is spent no more frames are probed
+    last_change = max(position for position in sampled if position not in sampler._scheduled)
+    assert sampler._changes_left == 0
+    assert "probe" not in actions[last_change + 1:]
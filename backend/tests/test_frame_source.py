@@ -0,0 +1,49 @@
+import time
+import cv2
+import numpy as np
+import pytest
+from app.services.ui_detection import FrameSource
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    # Ten seconds at 10 fps, every frame filled with its own index
+    path = str(tmp_path / "video.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for index in range(100):
+        writer.write(np.full((48, 64, 3), index * 2, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_samples_one_frame_per_second(video_path):
+    with FrameSource(video_path, sample_rate=1) as source:
+        frames = list(source)
+
+    assert [frame["timestamp"] for frame in frames] == [float(second) for second in range(10)]
+    assert [int(frame["frame"].mean()) // 20 for frame in frames] == list(range(10))
+
+
+def test_decoder_stays_within_lookahead(video_path):
+    source = FrameSource(video_path, sample_rate=10, lookahead=3)
+    frames = iter(source)
+    next(frames)
+    time.sleep(0.3)
+
+    assert source._queue.qsize() <= 3
+    source.close()
+
+
+def test_closing_early_stops_the_decoder(video_path):
+    source = FrameSource(video_path, sample_rate=10, lookahead=2)
+    for frame in source:
+        break
+    source.close()
+
+    assert not source._thread.is_alive()
+    assert source._cap is None
+
+
+def test_missing_video_raises(tmp_path):
+    with pytest.raises(ValueError):
+        FrameSource(str(tmp_path / "missing.avi"))
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import pytest
+from app.services import ingest
+from app.services.ingest import ingest_upload
+
+
+class StubUpload:
+    """Stands in for an UploadFile, returning its body in small reads"""
+
+    def __init__(self, data, filename="video.mp4"):
+        self.data = data
+        self.filename = filename
+        self.offset = 0
+
+    async def read(self, size):
+        chunk = self.data[self.offset:self.offset + min(size, 1000)]
+        self.offset += len(chunk)
+        return chunk
+
+
+class StubS3:
+    """Records multipart calls, failing the upload of the given part numbers"""
+
+    def __init__(self, failing_parts=()):
+        self.failing_parts = set(failing_parts)
+        self.uploaded = {}
+        self.completed = None
+        self.aborted = False
+
+    def create_multipart_upload(self, Bucket, Key):
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if PartNumber in self.failing_parts:
+            raise ConnectionError(f"part {PartNumber} failed")
+        self.uploaded[PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.completed = MultipartUpload["Parts"]
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted = True
+
+
+@pytest.fixture(autouse=True)
+def small_parts(monkeypatch):
+    monkeypatch.setattr(ingest, "S3_PART_SIZE", 4000)
+    monkeypatch.setattr(ingest, "INGEST_CHUNK_SIZE", 1000)
+
+
+def upload(s3, data, tmp_path):
+    return asyncio.run(ingest_upload(StubUpload(data), s3, "bucket", "videos/a.mp4", spool_dir=str(tmp_path)))
+
+
+def test_parts_are_completed_in_order(tmp_path):
+    s3 = StubS3()
+    data = os.urandom(10000)
+    result = upload(s3, data, tmp_path)
+
+    assert [part["PartNumber"] for part in s3.completed] == [1, 2, 3]
+    assert b"".join(s3.uploaded[number] for number in (1, 2, 3)) == data
+    with open(result["spool_path"], "rb") as f:
+        assert f.read() == data
+
+
+def test_failed_part_below_capacity_aborts_the_upload(tmp_path):
+    s3 = StubS3(failing_parts={2})
+
+    with pytest.raises(ConnectionError):
+        upload(s3, os.urandom(10000), tmp_path)
+
+    assert s3.completed is None
+    assert s3.aborted
+    assert os.listdir(tmp_path) == []
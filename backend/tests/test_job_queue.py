@@ -0,0 +1,26 @@
+import asyncio
+from app.services.jobs import SQLiteJobQueue
+
+
+def test_claims_expire_and_acked_jobs_are_removed(tmp_path):
+    async def scenario():
+        queue = SQLiteJobQueue(path=str(tmp_path / "jobs.sqlite3"), poll_interval=0.01, visibility_timeout=0.2)
+        await queue.put({"job_id": "a"})
+
+        job = await queue.get()
+        assert job["job_id"] == "a"
+        assert queue._claim() is None
+
+        # The worker died without acking, so the job is redelivered once the claim expires
+        await asyncio.sleep(0.25)
+        job = await queue.get()
+        assert job["job_id"] == "a"
+
+        await queue.renew(job)
+        assert queue._claim() is None
+
+        await queue.ack(job)
+        await asyncio.sleep(0.25)
+        assert queue._claim() is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+from app.services import jobs
+from app.services.jobs import JobManager, InMemoryJobQueue
+from app.services.pipeline import Stage, StageGraph
+from app.services.checkpoints import CheckpointStore
+from app.services.results_store import ResultsStore
+
+TRANSCRIPT = {"full_text": "click login", "segments": [{"start": 0.0, "end": 1.0, "text": "click login", "timestamp": "00:00"}]}
+
+
+def make_manager(tmp_path, transcript=TRANSCRIPT, fail_notes=False):
+    async def run_transcript(inputs, context):
+        return transcript
+
+    async def run_notes(inputs, context):
+        if fail_notes:
+            raise RuntimeError("notes failed")
+        return {"words": len(inputs["transcript"]["full_text"].split())}
+
+    pipeline = StageGraph([
+        Stage("transcript", run_transcript),
+        Stage("notes", run_notes, depends_on=("transcript",)),
+    ])
+    return JobManager(job_queue=InMemoryJobQueue(), pipeline=pipeline, results_store=ResultsStore(path=""),
+                      checkpoints=CheckpointStore(str(tmp_path / "checkpoints")))
+
+
+def run_job(manager, video_path, content_hash=None, cleanup=False):
+    async def scenario():
+        result = await manager.submit(str(video_path), "s3://videos/a.mp4", cleanup=cleanup,
+                                      content_hash=content_hash)
+        return await manager.run(manager._jobs[result.id])
+
+    return asyncio.run(scenario())
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"video")
+    return path
+
+
+def test_completed_job_deletes_its_checkpoints(tmp_path, video):
+    manager = make_manager(tmp_path)
+    result = run_job(manager, video)
+
+    assert result.status == "completed"
+    assert result.transcript.full_text == "click login"
+    assert manager.checkpoints.load(result.id) == {}
+
+
+def test_invalid_output_is_not_checkpointed(tmp_path, video):
+    manager = make_manager(tmp_path, transcript={"full_text": "no segments"})
+    result = run_job(manager, video)
+
+    assert result.status == "failed"
+    assert result.stage == "transcript"
+    assert manager.checkpoints.load(result.id) == {}
+
+
+def test_unusable_checkpoint_fails_the_job_and_is_deleted(tmp_path, video):
+    manager = make_manager(tmp_path, fail_notes=True)
+    result = run_job(manager, video, content_hash="a" * 64)
+    assert result.status == "failed"
+    assert set(manager.checkpoints.load(result.id)) == {"transcript"}
+
+    # Written by an older version whose transcript had a different shape
+    manager.checkpoints.save(result.id, "transcript", {"text": "click login"})
+    asyncio.run(manager.run(manager._jobs[result.id]))
+
+    assert result.status == "failed"
+    assert result.stage == "transcript"
+    assert manager.checkpoints.load(result.id) == {}
+    assert manager._in_flight == {}
+
+
+def test_only_the_latest_failed_jobs_keep_checkpoints_and_video(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_FAILED_MAX_ENTRIES", 1)
+    manager = make_manager(tmp_path, fail_notes=True)
+
+    videos = [tmp_path / "first.mp4", tmp_path / "second.mp4"]
+    for path in videos:
+        path.write_bytes(b"video")
+    first = run_job(manager, videos[0], cleanup=True)
+    second = run_job(manager, videos[1], cleanup=True)
+
+    assert first.id not in manager.results
+    assert manager.checkpoints.load(first.id) == {}
+    assert not videos[0].exists()
+
+    assert manager.results[second.id].status == "failed"
+    assert set(manager.checkpoints.load(second.id)) == {"transcript"}
+    assert videos[1].exists()
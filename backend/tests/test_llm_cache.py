@@ -0,0 +1,87 @@
+import asyncio
+import json
+from app.services import llm_cache
+from app.services.llm_cache import LLMResponseCache, prompt_cache_key, run_cached_completion
+
+
+class StubPrompt:
+    template = "Summarize {transcript}"
+
+
+class StubLLMService:
+    """Stands in for LLMService, counting the completions it is asked for"""
+
+    def __init__(self, model_name="stub-model", temperature=0.2):
+        self.model_name = model_name
+        self.temperature = temperature
+        self.calls = 0
+
+    async def complete(self, prompt, inputs):
+        self.calls += 1
+        return json.dumps({"summary": inputs["transcript"], "call": self.calls})
+
+
+def complete(service, cache, inputs, bypass=None):
+    return asyncio.run(run_cached_completion(service, StubPrompt(), inputs, json.loads, cache=cache, bypass=bypass))
+
+
+def test_miss_then_hit(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "llm.sqlite3"))
+    service = StubLLMService()
+
+    first = complete(service, cache, {"transcript": "click login"})
+    second = complete(service, cache, {"transcript": "click login"})
+
+    assert first == second == {"summary": "click login", "call": 1}
+    assert service.calls == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_whitespace_does_not_change_the_key(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "llm.sqlite3"))
+    service = StubLLMService()
+
+    complete(service, cache, {"transcript": "click login"})
+    complete(service, cache, {"transcript": "  click login  \n"})
+    assert service.calls == 1
+
+
+def test_ttl_expiry(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = LLMResponseCache(path=str(tmp_path / "llm.sqlite3"), ttl_seconds=60)
+    service = StubLLMService()
+
+    complete(service, cache, {"transcript": "click login"})
+    now[0] += 30
+    complete(service, cache, {"transcript": "click login"})
+    assert service.calls == 1
+
+    now[0] += 61
+    assert complete(service, cache, {"transcript": "click login"})["call"] == 2
+
+
+def test_key_depends_on_model_and_parameters(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "llm.sqlite3"))
+    inputs = {"transcript": "click login"}
+
+    complete(StubLLMService(), cache, inputs)
+    for service in (StubLLMService(model_name="other-model"), StubLLMService(temperature=0.7)):
+        assert complete(service, cache, inputs)["call"] == 1
+        assert service.calls == 1
+
+    key = prompt_cache_key("stub-model", 0.2, StubPrompt.template, inputs)
+    assert key != prompt_cache_key("stub-model", 0.2, "Describe {transcript}", inputs)
+    assert key != prompt_cache_key("stub-model", 0.2, StubPrompt.template, {"transcript": "click logout"})
+
+
+def test_bypass_and_unparseable_entries_call_the_llm(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "llm.sqlite3"))
+    service = StubLLMService()
+    inputs = {"transcript": "click login"}
+
+    complete(service, cache, inputs)
+    assert complete(service, cache, inputs, bypass=True)["call"] == 2
+
+    cache.put(prompt_cache_key("stub-model", 0.2, StubPrompt.template, inputs), "not json")
+    assert complete(service, cache, inputs)["call"] == 3
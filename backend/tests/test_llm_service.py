@@ -0,0 +1,138 @@
+import json
+import asyncio
+import threading
+import pytest
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.services import llm_service
+from app.services.llm_cache import LLMResponseCache, run_cached_completion
+from app.services.llm_service import LLMService
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class StubPrompt:
+    def format(self, **inputs):
+        return inputs["text"]
+
+
+class StubLLM:
+    """Fails the first request for "slow" with a rate limit, answers everything else"""
+
+    model_name = "stub-model"
+
+    def __init__(self):
+        self.failed = False
+        self.finished = []
+
+    async def agenerate(self, texts):
+        text = texts[0]
+        if text == "slow" and not self.failed:
+            self.failed = True
+            raise RateLimited("rate limited")
+        await asyncio.sleep(0.01)
+        self.finished.append(text)
+        return SimpleNamespace(llm_output={}, generations=[[SimpleNamespace(text=text)]])
+
+
+def test_backoff_does_not_hold_the_concurrency_slot():
+    llm = StubLLM()
+    service = LLMService(llm=llm, max_concurrency=1, backoff_seconds=0.5, max_backoff_seconds=0.5)
+
+    async def run():
+        slow = asyncio.create_task(service.complete(StubPrompt(), {"text": "slow"}))
+        await asyncio.sleep(0)
+        fast = asyncio.create_task(service.complete(StubPrompt(), {"text": "fast"}))
+        return await asyncio.gather(slow, fast)
+
+    assert asyncio.run(run()) == ["slow", "fast"]
+    assert llm.finished == ["fast", "slow"]
+    assert service.stats()["retries"] == 1
+
+
+def test_non_retryable_error_is_raised():
+    class Rejected(Exception):
+        status_code = 400
+
+    class RejectingLLM:
+        async def agenerate(self, texts):
+            raise Rejected("bad request")
+
+    service = LLMService(llm=RejectingLLM(), max_retries=3)
+
+    with pytest.raises(Rejected):
+        asyncio.run(service.complete(StubPrompt(), {"text": "x"}))
+    assert service.stats()["failures"] == 1 and service.stats()["retries"] == 0
+
+
+class CompletionsHandler(BaseHTTPRequestHandler):
+    """Answers OpenAI completion requests with the prompt echoed back as JSON"""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, body))
+        prompt = body["prompt"][0] if isinstance(body["prompt"], list) else body["prompt"]
+
+        payload = json.dumps({
+            "id": f"cmpl-{len(self.server.requests)}",
+            "object": "text_completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{"text": json.dumps({"prompt": prompt}), "index": 0, "logprobs": None,
+                         "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 7, "total_tokens": 12},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def completions_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CompletionsHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(llm_service, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(llm_service, "LLM_API_BASE", f"http://127.0.0.1:{server.server_port}/v1")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_openai_client_against_stub_server(completions_server, tmp_path, monkeypatch):
+    pytest.importorskip("openai")
+    from langchain.prompts import PromptTemplate
+
+    prompt = PromptTemplate(input_variables=["transcript"], template="Summarize {transcript}")
+    cache = LLMResponseCache(path=str(tmp_path / "llm.sqlite3"))
+
+    def complete(service):
+        return asyncio.run(run_cached_completion(service, prompt, {"transcript": "click login"}, json.loads,
+                                                 cache=cache))
+
+    service = LLMService()
+    assert complete(service) == {"prompt": "Summarize click login"}
+    assert complete(service) == {"prompt": "Summarize click login"}
+
+    path, body = completions_server.requests[0]
+    assert len(completions_server.requests) == 1
+    assert path == "/v1/completions"
+    assert body["model"] == llm_service.LLM_MODEL
+    assert body["temperature"] == llm_service.LLM_TEMPERATURE
+    assert body["max_tokens"] == llm_service.LLM_MAX_TOKENS
+    assert service.stats()["prompt_tokens"] == 5 and service.stats()["completion_tokens"] == 7
+
+    # A different sampling temperature is a different request, so it misses the cache
+    monkeypatch.setattr(llm_service, "LLM_TEMPERATURE", 0.7)
+    assert complete(LLMService()) == {"prompt": "Summarize click login"}
+    assert len(completions_server.requests) == 2
+    assert completions_server.requests[1][1]["temperature"] == 0.7
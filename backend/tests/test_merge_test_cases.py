@@ -0,0 +1,63 @@
+from app.services.test_extractor import merge_test_cases
+
+BOUNDS = [(0.0, 300.0), (270.0, 570.0)]
+
+
+def step(action, timestamp, expected=""):
+    return {"step_number": 1, "action": action, "timestamp": timestamp, "expected_result": expected}
+
+
+def test_reworded_step_in_overlap_is_kept_once():
+    partials = [
+        {"steps": [step("Open the login page", "00:05"), step("Click the Submit button", "04:45")]},
+        {"steps": [step("Click on Submit button", "04:47"), step("Log out", "07:00")]},
+    ]
+
+    merged = merge_test_cases(partials, BOUNDS)
+
+    assert [s["action"] for s in merged["steps"]] == ["Open the login page", "Click on Submit button", "Log out"]
+    assert [s["step_number"] for s in merged["steps"]] == [1, 2, 3]
+
+
+def test_prefers_copy_away_from_window_edge():
+    # 04:58 is two seconds from the end of the first window but 28 seconds into the second
+    partials = [
+        {"steps": [step("Click Save", "04:58", "truncated")]},
+        {"steps": [step("Click the Save button", "04:56", "Settings are saved")]},
+    ]
+
+    merged = merge_test_cases(partials, BOUNDS)
+
+    assert len(merged["steps"]) == 1
+    assert merged["steps"][0]["expected_result"] == "Settings are saved"
+
+
+def test_distinct_steps_are_not_merged():
+    partials = [
+        {"steps": [step("Click the Submit button", "04:40")]},
+        {"steps": [
+            step("Type the password", "04:42"),
+            step("Click the Submit button", "04:52"),
+        ]},
+    ]
+
+    merged = merge_test_cases(partials, BOUNDS)
+
+    assert len(merged["steps"]) == 3
+
+
+def test_similar_steps_outside_overlap_are_not_merged():
+    partials = [
+        {"steps": [step("Click Next", "01:00")]},
+        {"steps": [step("Click Next", "01:02"), step("Click the Next button", "01:03")]},
+    ]
+
+    merged = merge_test_cases(partials, BOUNDS)
+
+    assert len(merged["steps"]) == 3
+
+
+def test_repeated_step_within_one_window_is_kept():
+    partials = [{"steps": [step("Click Next", "01:00"), step("Click Next", "01:03")]}]
+
+    assert len(merge_test_cases(partials)["steps"]) == 2
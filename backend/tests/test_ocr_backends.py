@@ -0,0 +1,50 @@
+import threading
+import pytest
+from app.services import ocr_backends
+from app.services.ocr_backends import OCRBackend, PytesseractBackend, create_ocr_backend, get_ocr_backend
+
+
+class StubBackend(OCRBackend):
+    name = "stub"
+
+    def image_to_data(self, image):
+        return {"text": [], "conf": [], "left": [], "top": [], "width": [], "height": []}
+
+
+class BrokenBackend(OCRBackend):
+    name = "broken"
+
+    def __init__(self):
+        raise ImportError("engine not installed")
+
+
+@pytest.fixture(autouse=True)
+def backends(monkeypatch):
+    monkeypatch.setattr(ocr_backends, "_local", threading.local())
+    monkeypatch.setitem(ocr_backends.BACKENDS, "stub", StubBackend)
+    monkeypatch.setitem(ocr_backends.BACKENDS, "broken", BrokenBackend)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_ocr_backend("easyocr")
+
+
+def test_auto_falls_back_to_pytesseract(monkeypatch):
+    monkeypatch.setattr(ocr_backends, "TesserocrBackend", BrokenBackend)
+    assert isinstance(create_ocr_backend("auto"), PytesseractBackend)
+
+
+def test_failing_backend_falls_back_to_pytesseract():
+    assert isinstance(create_ocr_backend("broken"), PytesseractBackend)
+
+
+def test_backend_is_reused_within_a_thread_only():
+    first = get_ocr_backend("stub")
+    assert get_ocr_backend("stub") is first
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(get_ocr_backend("stub")))
+    thread.start()
+    thread.join()
+    assert isinstance(other[0], StubBackend) and other[0] is not first
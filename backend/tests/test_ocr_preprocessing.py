@@ -0,0 +1,52 @@
+import cv2
+import numpy as np
+import pytest
+from app.services.ocr_preprocessing import ocr_scale
+from app.services.ui_detection import UIElementDetector
+
+
+def text_frame(width, height, font_scale):
+    frame = np.full((height, width, 3), 255, np.uint8)
+    line_height = int(30 * font_scale) + 10
+    for y in range(40, height, line_height):
+        cv2.putText(frame, "search settings account", (20, y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 0, 0), 1)
+    return frame
+
+
+def gray(frame):
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+@pytest.mark.parametrize("width, height, font_scale", [(1920, 1080, 0.5), (3840, 2160, 0.5)])
+def test_frames_of_1080p_or_more_are_not_upscaled(width, height, font_scale):
+    assert ocr_scale(gray(text_frame(width, height, font_scale))) <= 1.0
+
+
+def test_upscaling_stops_at_the_pixel_cap():
+    scale = ocr_scale(gray(text_frame(1280, 720, 0.4)))
+
+    assert scale > 1.0
+    assert (1280 * scale) * (720 * scale) <= 1920 * 1080 + 1
+
+
+def test_no_text_returns_the_default():
+    blank = np.full((360, 640), 255, np.uint8)
+
+    assert ocr_scale(blank) == 1.0
+    assert ocr_scale(blank, default=None) is None
+
+
+def test_scale_is_estimated_once_per_video():
+    detector = UIElementDetector(adaptive_ocr=True)
+    blank = np.full((720, 1280, 3), 255, np.uint8)
+
+    assert detector.text_scale(blank) == 1.0
+    assert detector.video_ocr_scale is None
+
+    scale = detector.text_scale(text_frame(1280, 720, 0.4))
+    assert scale == ocr_scale(gray(text_frame(1280, 720, 0.4)))
+    assert detector.text_scale(text_frame(1280, 720, 1.5)) == scale
+
+
+def test_no_scale_without_adaptive_ocr():
+    assert UIElementDetector(adaptive_ocr=False).text_scale(text_frame(1280, 720, 0.4)) is None
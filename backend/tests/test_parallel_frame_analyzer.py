@@ -0,0 +1,51 @@
+import asyncio
+import cv2
+import numpy as np
+import pytest
+from app.services import ui_detection
+from app.services.ui_detection import ParallelFrameAnalyzer, UIElementDetector
+
+
+def boxes_frame(count):
+    # A frame with `count` outlined boxes, so each frame's detections differ
+    frame = np.full((360, 640, 3), 255, dtype=np.uint8)
+    for index in range(count):
+        x, y = 20 + (index % 5) * 120, 20 + (index // 5) * 80
+        cv2.rectangle(frame, (x, y), (x + 90, y + 50), (0, 0, 0), 2)
+    return frame
+
+
+@pytest.fixture(autouse=True)
+def shutdown_executor():
+    yield
+    if ui_detection._analysis_executor is not None:
+        ui_detection._analysis_executor.shutdown(wait=True)
+        ui_detection._analysis_executor = None
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_results_come_back_in_submission_order(workers):
+    frames = [boxes_frame(count) for count in (7, 1, 10, 3, 0, 5)]
+    expected = [UIElementDetector().analyze_frame(frame)["ui_elements"] for frame in frames]
+
+    async def run():
+        analyzer = ParallelFrameAnalyzer(workers=workers, max_in_flight=3)
+        tasks = [await analyzer.submit(frame) for frame in frames]
+        return [(await task)["ui_elements"] for task in tasks]
+
+    assert asyncio.run(run()) == expected
+    assert len({len(elements) for elements in expected}) > 1
+
+
+def test_in_flight_frames_are_bounded():
+    async def run():
+        analyzer = ParallelFrameAnalyzer(workers=1, max_in_flight=2)
+        peak = 0
+        tasks = []
+        for count in range(6):
+            tasks.append(await analyzer.submit(boxes_frame(count)))
+            peak = max(peak, len(analyzer._pending))
+        await asyncio.gather(*tasks)
+        return peak
+
+    assert asyncio.run(run()) <= 2
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.services.pipeline import Stage, StageError, StageGraph
+
+
+def run(graph, context=None, **kwargs):
+    return asyncio.run(graph.run(context if context is not None else {}, **kwargs))
+
+
+def test_independent_stages_run_concurrently():
+    async def slow(inputs, context):
+        await asyncio.sleep(0.2)
+        return 1
+
+    async def total(inputs, context):
+        return inputs["a"] + inputs["b"]
+
+    graph = StageGraph([
+        Stage("a", slow, executor="test"),
+        Stage("b", slow),
+        Stage("total", total, depends_on=("a", "b")),
+    ])
+    started = time.perf_counter()
+    outputs, timings = run(graph)
+
+    assert outputs["total"] == 2
+    assert time.perf_counter() - started < 0.35
+    assert set(timings) == {"a", "b", "total"}
+
+
+def test_failure_names_the_stage_and_skips_dependents():
+    started = []
+
+    async def fail(inputs, context):
+        raise ValueError("no audio track")
+
+    async def record(inputs, context):
+        started.append("after")
+
+    graph = StageGraph([Stage("transcript", fail), Stage("after", record, depends_on=("transcript",))])
+    with pytest.raises(StageError) as error:
+        run(graph)
+
+    assert error.value.stage == "transcript"
+    assert isinstance(error.value.error, ValueError)
+    assert started == []
+
+
+def test_failure_cancels_stages_running_on_executors():
+    stopped = threading.Event()
+    finished = []
+
+    async def long_running(inputs, context):
+        try:
+            for _ in range(50):
+                await asyncio.sleep(0.1)
+            finished.append(True)
+        except asyncio.CancelledError:
+            stopped.set()
+            raise
+
+    async def fail(inputs, context):
+        await asyncio.sleep(0.1)
+        raise RuntimeError("LLM unavailable")
+
+    graph = StageGraph([Stage("ui_analysis", long_running, executor="test"), Stage("test_case", fail)])
+    with pytest.raises(StageError):
+        run(graph)
+
+    assert stopped.wait(2)
+    assert finished == []
+
+
+def test_completed_outputs_are_not_rerun():
+    calls = []
+
+    async def stage(inputs, context):
+        calls.append(inputs)
+        return "fresh"
+
+    graph = StageGraph([Stage("a", stage), Stage("b", stage, depends_on=("a",))])
+    outputs, _ = run(graph, outputs={"a": "cached"})
+
+    assert calls == [{"a": "cached"}]
+    assert outputs == {"a": "cached", "b": "fresh"}
+
+
+def test_invalid_graphs_are_rejected():
+    async def stage(inputs, context):
+        return None
+
+    with pytest.raises(ValueError):
+        StageGraph([Stage("a", stage, depends_on=("missing",))])
+    with pytest.raises(ValueError):
+        StageGraph([Stage("a", stage, depends_on=("b",)), Stage("b", stage, depends_on=("a",))])
@@ -0,0 +1,32 @@
+import pytest
+from app.services.playwright_codegen import map_step
+
+APP_URL = "https://example.com"
+
+
+@pytest.mark.parametrize("action, statement", [
+    ("Press Enter", "await page.keyboard.press('Enter');"),
+    ("Press the Escape key", "await page.keyboard.press('Escape');"),
+    ("Hit Tab", "await page.keyboard.press('Tab');"),
+    ("Press the down arrow key", "await page.keyboard.press('ArrowDown');"),
+    ("Press Ctrl+S", "await page.keyboard.press('Control+S');"),
+    ("Press Cmd + Shift + Z.", "await page.keyboard.press('Meta+Shift+Z');"),
+])
+def test_key_presses(action, statement):
+    assert map_step({"action": action}, APP_URL) == [statement]
+
+
+@pytest.mark.parametrize("action", [
+    "Press Enter to submit the form",
+    "Press the Submit button",
+    "Press A",
+])
+def test_unrecognized_presses_are_left_to_the_llm(action):
+    assert map_step({"action": action}, APP_URL) is None
+
+
+def test_clicks_still_map():
+    assert map_step({"action": "Click the Save button"}, APP_URL) == [
+        "await page.getByRole('button', { name: 'Save' }).click();"
+    ]
+    assert map_step({"action": "Tap on Settings"}, APP_URL) == ["await page.getByText('Settings').click();"]
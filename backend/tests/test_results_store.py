@@ -0,0 +1,14 @@
+from app.models import VideoAnalysisResult
+from app.services.results_store import ResultsStore
+
+
+def test_memory_tier_is_not_changed_through_the_live_result():
+    store = ResultsStore()
+    result = VideoAnalysisResult(id="job", video_url="video.mp4", status="completed", content_hash="hash")
+    store.put("hash", result)
+
+    result.status = "queued"
+    store.get("hash").status = "failed"
+
+    assert store.get("hash").status == "completed"
+    assert store.get_job("job").status == "completed"
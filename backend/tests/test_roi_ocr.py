@@ -0,0 +1,69 @@
+import cv2
+import numpy as np
+from app.services.roi_ocr import compute_changed_regions, merge_text_regions
+
+
+def ui_frame(line):
+    frame = np.full((1080, 1920, 3), 245, dtype=np.uint8)
+    cv2.putText(frame, line, (600, 500), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (30, 30, 30), 1, cv2.LINE_AA)
+    return frame
+
+
+def test_changed_region_covers_the_whole_line():
+    boxes = compute_changed_regions(ui_frame("Total amount due: 1200 dollars"),
+                                    ui_frame("Total amount due: 1700 dollars"))
+    (x, y, w, h), = boxes
+    (text_w, text_h), _ = cv2.getTextSize("Total amount due: 1700 dollars", cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)
+    assert x <= 600 and x + w >= 600 + text_w
+    assert y <= 500 - text_h and y + h >= 500
+
+
+def test_changed_region_covers_intersecting_previous_words():
+    previous = [{"text": "1200", "confidence": 90, "position": {"x": 700, "y": 300, "width": 300, "height": 40}}]
+    frame = ui_frame("")
+    changed = frame.copy()
+    cv2.rectangle(changed, (710, 310), (720, 320), (0, 0, 0), -1)
+
+    (x, y, w, h), = compute_changed_regions(frame, changed, previous_regions=previous)
+    assert x <= 700 and x + w >= 1000
+    assert merge_text_regions(previous, [], [(x, y, w, h)]) == []
+
+
+def lines_frame(middle):
+    frame = np.full((1080, 1920, 3), 245, dtype=np.uint8)
+    for y, text in ((475, "First name"), (500, middle), (525, "Last name")):
+        cv2.putText(frame, text, (600, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (30, 30, 30), 1, cv2.LINE_AA)
+    return frame
+
+
+def text_region(text, y):
+    (w, h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)
+    return {"text": text, "confidence": 90, "position": {"x": 600, "y": y - h, "width": w, "height": h + baseline}}
+
+
+def test_adjacent_lines_are_not_clipped():
+    previous = [text_region("First name", 475), text_region("john", 500), text_region("Last name", 525)]
+    boxes = compute_changed_regions(lines_frame("john"), lines_frame("jane"), previous_regions=previous)
+
+    for region in previous:
+        position = region["position"]
+        region_box = (position["x"], position["y"], position["width"], position["height"])
+        for x, y, w, h in boxes:
+            inside = (x <= region_box[0] and y <= region_box[1] and region_box[0] + region_box[2] <= x + w
+                      and region_box[1] + region_box[3] <= y + h)
+            overlaps = (x < region_box[0] + region_box[2] and region_box[0] < x + w
+                        and y < region_box[1] + region_box[3] and region_box[1] < y + h)
+            assert inside or not overlaps
+
+
+def test_merge_keeps_text_a_box_only_clips():
+    previous = [text_region("First name", 475), text_region("john", 500), text_region("Last name", 525)]
+    middle = previous[1]["position"]
+    box = (middle["x"] - 4, middle["y"] - 4, middle["width"] + 8, middle["height"] + 12)
+    truncated = {"text": "Las", "confidence": 70,
+                 "position": {"x": 600, "y": box[1] + box[3] - 3, "width": 30, "height": 3}}
+    jane = text_region("jane", 500)
+
+    merged = merge_text_regions(previous, [jane, truncated], [box])
+
+    assert [region["text"] for region in merged] == ["First name", "Last name", "jane"]
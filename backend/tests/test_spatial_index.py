@@ -0,0 +1,24 @@
+from app.services.spatial_index import GridIndex
+
+
+def test_query_finds_boxes_spanning_cells():
+    index = GridIndex(cell=64)
+    index.insert("wide", (10, 10, 200, 20))
+    index.insert("tall", (300, 0, 20, 200))
+    index.insert("far", (1000, 1000, 10, 10))
+
+    assert index.query((180, 20, 10, 10)) == {"wide"}
+    assert index.query((310, 150, 5, 5)) == {"tall"}
+    assert index.query((0, 0, 400, 30)) == {"wide", "tall"}
+
+
+def test_moved_and_removed_boxes_leave_their_cells():
+    index = GridIndex(cell=64)
+    index.insert("a", (0, 0, 10, 10))
+    index.insert("a", (500, 500, 10, 10))
+    assert index.query((0, 0, 10, 10)) == set()
+    assert index.query((505, 505, 1, 1)) == {"a"}
+
+    index.remove("a")
+    assert index.query((505, 505, 1, 1)) == set()
+    assert index._cells == {}
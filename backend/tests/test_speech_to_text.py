@@ -0,0 +1,199 @@
+import asyncio
+import queue
+import shutil
+import sys
+import threading
+import wave
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from app.services import speech_to_text
+from app.services.speech_to_text import (
+    FasterWhisperModel,
+    SAMPLE_RATE,
+    VAD_MAX_MERGE_GAP_SECONDS,
+    WhisperModelPool,
+    extract_audio_from_video,
+    _normalize_words,
+    _word_errors,
+    find_speech_chunks,
+)
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+
+
+def write_wav(path, samples, rate):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes((samples * 32767).astype(np.int16).tobytes())
+
+
+@requires_ffmpeg
+def test_audio_is_piped_as_16khz_float_pcm(tmp_path):
+    rate = 44100
+    t = np.arange(rate * 2) / rate
+    write_wav(tmp_path / "tone.wav", 0.5 * np.sin(2 * np.pi * 440 * t), rate)
+
+    audio = asyncio.run(extract_audio_from_video(str(tmp_path / "tone.wav")))
+
+    assert audio.dtype == np.float32
+    assert abs(len(audio) - 2 * SAMPLE_RATE) <= SAMPLE_RATE // 100
+    assert 0.45 < np.abs(audio).max() < 0.55
+
+
+@requires_ffmpeg
+def test_unreadable_input_raises(tmp_path):
+    with pytest.raises(speech_to_text.ffmpeg.Error):
+        asyncio.run(extract_audio_from_video(str(tmp_path / "missing.mp4")))
+
+
+def speech(*spans, total):
+    # Noise bursts standing in for speech over (start, end) seconds, silence elsewhere
+    audio = np.zeros(int(total * SAMPLE_RATE), dtype=np.float32)
+    rng = np.random.default_rng(0)
+    for start, end in spans:
+        a, b = int(start * SAMPLE_RATE), int(end * SAMPLE_RATE)
+        audio[a:b] = rng.uniform(-0.3, 0.3, b - a)
+    return audio
+
+
+def seconds(chunks):
+    return [(start / SAMPLE_RATE, end / SAMPLE_RATE) for start, end in chunks]
+
+
+def test_short_pauses_stay_in_one_chunk():
+    chunks = seconds(find_speech_chunks(speech((1, 3), (3.3, 5), (6, 8), total=10)))
+
+    assert len(chunks) == 1
+    assert chunks[0][0] == pytest.approx(0.8, abs=0.05) and chunks[0][1] == pytest.approx(8.2, abs=0.05)
+
+
+def test_long_silences_are_skipped():
+    gap = VAD_MAX_MERGE_GAP_SECONDS + 3
+    chunks = seconds(find_speech_chunks(speech((1, 3), (3 + gap, 5 + gap), total=8 + gap)))
+
+    assert len(chunks) == 2
+    assert chunks[0][1] < 3.5 and chunks[1][0] > 2.5 + gap
+
+
+def test_chunks_respect_the_maximum_length():
+    chunks = seconds(find_speech_chunks(speech((0, 25), total=25), max_chunk_seconds=10))
+
+    assert all(end - start <= 10 + 1e-6 for start, end in chunks)
+    assert chunks[0][0] == 0 and chunks[-1][1] == 25
+
+
+def test_silence_has_no_chunks():
+    assert find_speech_chunks(np.zeros(SAMPLE_RATE * 5, dtype=np.float32)) == []
+
+
+class CountingLoader:
+    """Stands in for a model loader, counting the models it creates"""
+
+    def __init__(self, failures=0):
+        self.loaded = []
+        self.failures = failures
+
+    def __call__(self, model_name):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("weights not found")
+        model = object()
+        self.loaded.append(model)
+        return model
+
+
+def stub_pool(monkeypatch, size, failures=0):
+    loader = CountingLoader(failures)
+    monkeypatch.setitem(speech_to_text.TRANSCRIPTION_BACKENDS, "stub", loader)
+    return WhisperModelPool(model_name="tiny", size=size, backend="stub"), loader
+
+
+def test_models_load_on_first_use(monkeypatch):
+    pool, loader = stub_pool(monkeypatch, size=2)
+    assert loader.loaded == []
+
+    with pool.acquire() as model:
+        assert loader.loaded == [model]
+    with pool.acquire() as again:
+        assert again is model
+    assert len(loader.loaded) == 1
+
+
+def test_pool_never_exceeds_its_size(monkeypatch):
+    pool, loader = stub_pool(monkeypatch, size=2)
+    held = threading.Barrier(3)
+    release = threading.Event()
+
+    def borrow():
+        with pool.acquire(timeout=5):
+            held.wait()
+            release.wait()
+
+    threads = [threading.Thread(target=borrow) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    held.wait()
+
+    with pytest.raises(queue.Empty):
+        with pool.acquire(timeout=0.1):
+            pass
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(loader.loaded) == 2
+
+
+def test_warm_up_is_capped_by_the_size(monkeypatch):
+    pool, loader = stub_pool(monkeypatch, size=2)
+    pool.warm_up(5)
+    with pool.acquire():
+        pass
+
+    assert len(loader.loaded) == 2
+
+
+def test_failed_load_does_not_use_up_the_pool(monkeypatch):
+    pool, loader = stub_pool(monkeypatch, size=1, failures=1)
+    with pytest.raises(RuntimeError):
+        with pool.acquire():
+            pass
+    with pool.acquire() as model:
+        assert loader.loaded == [model]
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        WhisperModelPool(backend="onnx")
+
+
+def test_faster_whisper_results_use_the_whisper_format(monkeypatch):
+    class StubWhisperModel:
+        def __init__(self, model_name, device, compute_type):
+            assert (device, compute_type) == ("cpu", "int8")
+
+        def transcribe(self, audio):
+            segments = (SimpleNamespace(text=text, start=start, end=end)
+                        for text, start, end in [(" Click login.", 0.0, 1.5), (" Enter the password.", 1.5, 3.0)])
+            return segments, SimpleNamespace(language="en")
+
+    monkeypatch.setitem(sys.modules, "faster_whisper", SimpleNamespace(WhisperModel=StubWhisperModel))
+
+    result = FasterWhisperModel("tiny").transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32))
+
+    assert result == {
+        "text": " Click login. Enter the password.",
+        "segments": [
+            {"text": " Click login.", "start": 0.0, "end": 1.5},
+            {"text": " Enter the password.", "start": 1.5, "end": 3.0},
+        ],
+    }
+
+
+def test_word_differences_between_backends():
+    reference = _normalize_words("Click the Login button, then enter the password.")
+
+    assert _word_errors(reference, _normalize_words("click the login button then enter the password")) == 0
+    assert _word_errors(reference, _normalize_words("Click the log in button then enter password")) == 3